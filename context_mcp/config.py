@@ -3,6 +3,7 @@
 Loads configuration from environment variables with validation.
 """
 
+import codecs
 import os
 import logging
 from pathlib import Path
@@ -19,6 +20,22 @@ class ProjectConfig:
         log_retention_days: Log file retention period
         log_level: Logging level (integer constant from logging module)
         enable_file_log: Whether to enable file logging (default: False)
+        search_index: Whether to maintain the on-disk trigram search index
+        cache_dir: Directory for persistent caches (None = ~/.cache/context-mcp)
+        watch_mode: Filesystem watcher backend: auto, inotify, poll, or off
+            (started only when file_catalog or search_index is enabled)
+        watch_poll_interval: Seconds between snapshots for the polling watcher
+        search_workers: Worker processes for the Python search engine (0 = CPU count)
+        encoding_detection: How read tools pick a file encoding: fast, accurate, or fixed
+        default_encoding: Encoding used in fixed mode and when detection gives up
+        read_max_bytes: Maximum bytes returned for one file by read_entire_file
+        read_workers: Threads reading files concurrently for read_files
+        read_batch_max_files: Maximum files read by one read_files call
+        read_batch_max_bytes: Maximum bytes read by one read_files call
+        file_catalog: Whether to keep a resident catalog of file paths
+        git_index: Whether to enumerate tracked files from the git index
+        git_untracked: Whether file listings in a git work tree include
+            untracked files (include) or only tracked ones (exclude)
     """
 
     root_path: Path
@@ -26,6 +43,20 @@ class ProjectConfig:
     log_retention_days: int = 7
     log_level: int = logging.WARNING
     enable_file_log: bool = False
+    search_index: bool = False
+    cache_dir: Path | None = None
+    watch_mode: str = "auto"
+    watch_poll_interval: float = 2.0
+    search_workers: int = 0
+    encoding_detection: str = "fast"
+    default_encoding: str = "utf-8"
+    read_max_bytes: int = 10 * 1024 * 1024
+    read_workers: int = 8
+    read_batch_max_files: int = 500
+    read_batch_max_bytes: int = 64 * 1024 * 1024
+    file_catalog: bool = True
+    git_index: bool = True
+    git_untracked: str = "include"
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -45,6 +76,51 @@ class ProjectConfig:
                 f"log_retention_days must be >= 1: {self.log_retention_days}"
             )
 
+        # Validate watcher settings
+        if self.watch_mode not in ("auto", "inotify", "poll", "off"):
+            raise ValueError(
+                f"watch_mode must be one of auto, inotify, poll, off: {self.watch_mode}"
+            )
+        if self.watch_poll_interval <= 0:
+            raise ValueError(
+                f"watch_poll_interval must be positive: {self.watch_poll_interval}"
+            )
+
+        # Validate search_workers
+        if self.search_workers < 0:
+            raise ValueError(f"search_workers must be >= 0: {self.search_workers}")
+
+        # Validate encoding settings
+        if self.encoding_detection not in ("fast", "accurate", "fixed"):
+            raise ValueError(
+                "encoding_detection must be one of fast, accurate, fixed: "
+                f"{self.encoding_detection}"
+            )
+        try:
+            codecs.lookup(self.default_encoding)
+        except LookupError:
+            raise ValueError(f"default_encoding is not a known codec: {self.default_encoding}")
+
+        # Validate read limits
+        if self.read_max_bytes < 1:
+            raise ValueError(f"read_max_bytes must be >= 1: {self.read_max_bytes}")
+        if self.read_workers < 1:
+            raise ValueError(f"read_workers must be >= 1: {self.read_workers}")
+        if self.read_batch_max_files < 1:
+            raise ValueError(
+                f"read_batch_max_files must be >= 1: {self.read_batch_max_files}"
+            )
+        if self.read_batch_max_bytes < 1:
+            raise ValueError(
+                f"read_batch_max_bytes must be >= 1: {self.read_batch_max_bytes}"
+            )
+
+        # Validate git_untracked
+        if self.git_untracked not in ("include", "exclude"):
+            raise ValueError(
+                f"git_untracked must be one of include, exclude: {self.git_untracked}"
+            )
+
         # Validate log_level
         valid_levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL]
         if self.log_level not in valid_levels:
@@ -93,6 +169,73 @@ def load_config() -> ProjectConfig:
     # ENABLE_FILE_LOG is optional (default: False)
     enable_file_log = os.getenv("ENABLE_FILE_LOG", "false").lower() in ("true", "1", "yes")
 
+    # SEARCH_INDEX is optional (default: False)
+    search_index = os.getenv("SEARCH_INDEX", "false").lower() in ("true", "1", "yes")
+
+    # CACHE_DIR is optional (default: ~/.cache/context-mcp)
+    cache_dir_str = os.getenv("CACHE_DIR")
+    cache_dir = Path(cache_dir_str).expanduser().resolve() if cache_dir_str else None
+
+    # WATCH_MODE is optional (default: auto)
+    watch_mode = os.getenv("WATCH_MODE", "auto").lower()
+
+    # WATCH_POLL_INTERVAL is optional (default: 2.0)
+    interval_str = os.getenv("WATCH_POLL_INTERVAL", "2.0")
+    try:
+        watch_poll_interval = float(interval_str)
+    except ValueError:
+        raise ValueError(f"WATCH_POLL_INTERVAL must be a number: {interval_str}")
+
+    # SEARCH_WORKERS is optional (default: 0 = CPU count)
+    workers_str = os.getenv("SEARCH_WORKERS", "0")
+    try:
+        search_workers = int(workers_str)
+    except ValueError:
+        raise ValueError(f"SEARCH_WORKERS must be an integer: {workers_str}")
+
+    # ENCODING_DETECTION is optional (default: fast)
+    encoding_detection = os.getenv("ENCODING_DETECTION", "fast").lower()
+
+    # DEFAULT_ENCODING is optional (default: utf-8)
+    default_encoding = os.getenv("DEFAULT_ENCODING", "utf-8")
+
+    # READ_MAX_BYTES is optional (default: 10 MB)
+    read_max_str = os.getenv("READ_MAX_BYTES", str(10 * 1024 * 1024))
+    try:
+        read_max_bytes = int(read_max_str)
+    except ValueError:
+        raise ValueError(f"READ_MAX_BYTES must be an integer: {read_max_str}")
+
+    # READ_WORKERS is optional (default: 8)
+    read_workers_str = os.getenv("READ_WORKERS", "8")
+    try:
+        read_workers = int(read_workers_str)
+    except ValueError:
+        raise ValueError(f"READ_WORKERS must be an integer: {read_workers_str}")
+
+    # READ_BATCH_MAX_FILES is optional (default: 500)
+    max_files_str = os.getenv("READ_BATCH_MAX_FILES", "500")
+    try:
+        read_batch_max_files = int(max_files_str)
+    except ValueError:
+        raise ValueError(f"READ_BATCH_MAX_FILES must be an integer: {max_files_str}")
+
+    # READ_BATCH_MAX_BYTES is optional (default: 64 MB)
+    max_bytes_str = os.getenv("READ_BATCH_MAX_BYTES", str(64 * 1024 * 1024))
+    try:
+        read_batch_max_bytes = int(max_bytes_str)
+    except ValueError:
+        raise ValueError(f"READ_BATCH_MAX_BYTES must be an integer: {max_bytes_str}")
+
+    # FILE_CATALOG is optional (default: True)
+    file_catalog = os.getenv("FILE_CATALOG", "true").lower() in ("true", "1", "yes")
+
+    # GIT_INDEX is optional (default: True)
+    git_index = os.getenv("GIT_INDEX", "true").lower() in ("true", "1", "yes")
+
+    # GIT_UNTRACKED is optional (default: include)
+    git_untracked = os.getenv("GIT_UNTRACKED", "include").lower()
+
     # Create and validate config
     return ProjectConfig(
         root_path=root_path,
@@ -100,6 +243,20 @@ def load_config() -> ProjectConfig:
         log_retention_days=7,  # Fixed per requirements
         log_level=log_level,
         enable_file_log=enable_file_log,
+        search_index=search_index,
+        cache_dir=cache_dir,
+        watch_mode=watch_mode,
+        watch_poll_interval=watch_poll_interval,
+        search_workers=search_workers,
+        encoding_detection=encoding_detection,
+        default_encoding=default_encoding,
+        read_max_bytes=read_max_bytes,
+        read_workers=read_workers,
+        read_batch_max_files=read_batch_max_files,
+        read_batch_max_bytes=read_batch_max_bytes,
+        file_catalog=file_catalog,
+        git_index=git_index,
+        git_untracked=git_untracked,
     )
 
 
@@ -1,6 +1,6 @@
 """FastMCP server entry point for Context MCP.
 
-Registers all 11 MCP tools and starts the server.
+Registers all MCP tools and starts the server.
 """
 
 import logging
@@ -13,11 +13,14 @@ from context_mcp.tools.search import (
     search_in_file,
     search_in_files,
     find_files_by_name,
+    fuzzy_find_files,
     find_recently_modified_files,
+    find_changed_files,
 )
 from context_mcp.tools.read import (
     read_entire_file,
     read_file_lines,
+    read_file_ranges,
     read_file_tail,
     read_files,
 )
@@ -52,7 +55,11 @@ else:
 
 @mcp.tool()
 def list_directory(
-    path: str = ".", sort_by: str = "name", order: str = "asc", limit: int = -1
+    path: str = ".",
+    sort_by: str = "name",
+    order: str = "asc",
+    limit: int = -1,
+    respect_gitignore: bool = True,
 ) -> dict:
     """List directory contents with sorting and limiting.
 
@@ -61,6 +68,7 @@ def list_directory(
         sort_by: Sort field: name, size, or time (default: "name")
         order: Sort order: asc or desc (default: "asc")
         limit: Maximum entries to return, -1 for unlimited (default: -1)
+        respect_gitignore: Hide entries excluded by .gitignore/.ignore (default: True)
 
     Returns:
         dict: entries (list), total (int), truncated (bool)
@@ -73,22 +81,48 @@ def list_directory(
         cast(Literal["name", "size", "time"], sort_by),
         cast(Literal["asc", "desc"], order),
         limit,
+        respect_gitignore,
     )
 
 
 @mcp.tool()
-def show_tree(path: str = ".", max_depth: int = 3) -> dict:
+def show_tree(
+    path: str = ".",
+    max_depth: int = 3,
+    max_entries: int = 1000,
+    max_children_per_dir: int = 100,
+    ignore_patterns: list[str] | None = None,
+    respect_gitignore: bool = True,
+) -> dict:
     """Show directory tree structure.
 
+    Walks breadth first and stops once max_entries nodes are produced. Directories
+    with hidden children are marked truncated (omitted = how many); directories
+    matching ignore_patterns (default: .git, node_modules, build dirs, ...) are
+    marked pruned and not expanded.
+
     Args:
         path: Starting directory path (default: ".")
         max_depth: Maximum depth to traverse, 1-10 (default: 3)
+        max_entries: Maximum nodes in the tree (default: 1000)
+        max_children_per_dir: Maximum children shown per directory (default: 100)
+        ignore_patterns: Directory name globs not to expand (default: None = built-in
+            list; [] expands everything)
+        respect_gitignore: Leave out entries excluded by .gitignore/.ignore (default: True)
 
     Returns:
-        dict: tree (TreeNode), max_depth_reached (bool)
+        dict: tree (TreeNode), max_depth_reached (bool), truncated (bool),
+        total_entries (int)
     """
     from context_mcp.tools.navigation import show_tree as show_tree_impl
-    return show_tree_impl(path, max_depth)
+    return show_tree_impl(
+        path,
+        max_depth,
+        max_entries,
+        max_children_per_dir,
+        ignore_patterns,
+        respect_gitignore,
+    )
 
 
 @mcp.tool()
@@ -118,19 +152,40 @@ def read_project_context() -> dict:
 
 
 @mcp.tool()
-def search_in_file(query: str, file_path: str, use_regex: bool = False) -> dict:
+def search_in_file(
+    query: str,
+    file_path: str,
+    use_regex: bool = False,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+) -> dict:
     """Search for text in a single file.
 
     Args:
         query: Search text or regex pattern
         file_path: File path relative to project root
         use_regex: Whether to treat query as regex (default: False)
+        ignore_case: Case-insensitive matching (default: False)
+        multiline: Allow matches to span lines (default: False)
+        context_before: Lines of context before each match (default: 0)
+        context_after: Lines of context after each match (default: 0)
 
     Returns:
-        dict: matches (list), total_matches (int)
+        dict: matches (list), total_matches (int); with context, each match also
+        has context_before and context_after (lists of lines, never repeated)
     """
     from context_mcp.tools.search import search_in_file as search_file_impl
-    return search_file_impl(query, file_path, use_regex)
+    return search_file_impl(
+        query,
+        file_path,
+        use_regex,
+        ignore_case,
+        multiline,
+        context_before,
+        context_after,
+    )
 
 
 @mcp.tool()
@@ -141,9 +196,18 @@ def search_in_files(
     use_regex: bool = False,
     exclude_query: str = "",
     timeout: int = 60,
+    max_results: int = 500,
+    cursor: str = "",
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
 ) -> dict:
     """Search for text across multiple files.
 
+    Results are paged in (file path, line number) order; pass next_cursor back
+    as cursor to fetch the following page.
+
     Args:
         query: Search text or regex pattern
         file_pattern: File name glob pattern (default: "*")
@@ -151,12 +215,33 @@ def search_in_files(
         use_regex: Whether to treat query as regex (default: False)
         exclude_query: Exclude matches containing this pattern (default: "")
         timeout: Timeout in seconds (default: 60)
+        max_results: Maximum matches per page (default: 500)
+        cursor: Continuation token from a previous page (default: "")
+        ignore_case: Case-insensitive matching (default: False)
+        multiline: Allow matches to span lines (default: False)
+        context_before: Lines of context before each match (default: 0)
+        context_after: Lines of context after each match (default: 0)
 
     Returns:
-        dict: matches (list), total_matches (int), timed_out (bool)
+        dict: matches (list), total_matches (int), timed_out (bool), index_used (bool),
+        has_more (bool), next_cursor (str | None); with context, each match also
+        has context_before and context_after (lists of lines, never repeated)
     """
     from context_mcp.tools.search import search_in_files as search_files_impl
-    return search_files_impl(query, file_pattern, path, use_regex, exclude_query, timeout)
+    return search_files_impl(
+        query,
+        file_pattern,
+        path,
+        use_regex,
+        exclude_query,
+        timeout,
+        max_results,
+        cursor,
+        ignore_case,
+        multiline,
+        context_before,
+        context_after,
+    )
 
 
 @mcp.tool()
@@ -174,22 +259,67 @@ def find_files_by_name(name_pattern: str, path: str = ".") -> dict:
     return find_files_impl(name_pattern, path)
 
 
+@mcp.tool()
+def fuzzy_find_files(query: str, path: str = ".", max_results: int = 20) -> dict:
+    """Find files by fuzzy path match, ranked best first (fzf-style).
+
+    Every whitespace-separated term must appear in the path in order, not
+    necessarily contiguously; "usr svc test" finds "user_service_test.py".
+    Terms are case-insensitive unless they contain an uppercase letter.
+
+    Args:
+        query: Whitespace-separated terms
+        path: Starting directory (default: ".")
+        max_results: Maximum matches to return (default: 20)
+
+    Returns:
+        dict: matches (list[dict] with path, score), total_matched (int)
+    """
+    from context_mcp.tools.search import fuzzy_find_files as fuzzy_find_impl
+    return fuzzy_find_impl(query, path, max_results)
+
+
 @mcp.tool()
 def find_recently_modified_files(
-    hours_ago: int, path: str = ".", file_pattern: str = "*"
+    hours_ago: float,
+    path: str = ".",
+    file_pattern: str = "*",
+    max_results: int | None = None,
 ) -> dict:
-    """Find files modified within the last N hours.
+    """Find files modified within the last N hours, most recent first.
 
     Args:
-        hours_ago: Number of hours to look back (minimum: 1)
+        hours_ago: Hours to look back; fractions allowed (0.25 = 15 minutes)
         path: Starting directory (default: ".")
         file_pattern: File name pattern (default: "*")
+        max_results: Maximum files to return, newest first (default: all)
 
     Returns:
-        dict: files (list[dict]), total_found (int)
+        dict: files (list[dict] with path, mtime), total_found (int),
+        truncated (bool)
     """
     from context_mcp.tools.search import find_recently_modified_files as find_recent_impl
-    return find_recent_impl(hours_ago, path, file_pattern)
+    return find_recent_impl(hours_ago, path, file_pattern, max_results)
+
+
+@mcp.tool()
+def find_changed_files(ref: str, path: str = ".", include_untracked: bool = False) -> dict:
+    """Find files changed in the working tree since a git revision.
+
+    Compares the working tree (staged and unstaged changes) with the tree of
+    a branch, tag or commit, e.g. "main", "origin/main", "HEAD~3" or "v1.2".
+
+    Args:
+        ref: Revision to compare against
+        path: Starting directory (default: ".")
+        include_untracked: Also list untracked, non-ignored files (default: False)
+
+    Returns:
+        dict: ref (str), commit (str), files (list[dict] with path, change:
+        added/modified/deleted/untracked), total_found (int)
+    """
+    from context_mcp.tools.search import find_changed_files as find_changed_impl
+    return find_changed_impl(ref, path, include_untracked)
 
 
 # ============================================================================
@@ -198,17 +328,29 @@ def find_recently_modified_files(
 
 
 @mcp.tool()
-def read_entire_file(file_path: str) -> dict:
-    """Read complete file content.
+def read_entire_file(
+    file_path: str,
+    max_bytes: int | None = None,
+    max_lines: int | None = None,
+    offset: int = 0,
+) -> dict:
+    """Read complete file content, up to a byte and line budget.
+
+    Truncated responses end on a line break when possible; continue with
+    offset=next_offset, or read_file_lines from next_line.
 
     Args:
         file_path: File path relative to project root
+        max_bytes: Maximum bytes to return (default and upper bound: server cap)
+        max_lines: Maximum lines to return (default: unlimited)
+        offset: Byte offset to start reading from (default: 0)
 
     Returns:
-        dict: content, encoding, line_count, file_path
+        dict: content, encoding, encoding_detection, line_count, file_path,
+        truncated, total_bytes, next_offset (int | None), next_line (int | None)
     """
     from context_mcp.tools.read import read_entire_file as read_file_impl
-    return read_file_impl(file_path)
+    return read_file_impl(file_path, max_bytes, max_lines, offset)
 
 
 @mcp.tool()
@@ -221,39 +363,85 @@ def read_file_lines(file_path: str, start_line: int, end_line: int) -> dict:
         end_line: Ending line number (inclusive)
 
     Returns:
-        dict: content, encoding, line_count, file_path, is_partial, total_lines
+        dict: content, encoding, encoding_detection, line_count, file_path,
+        is_partial, total_lines
     """
     from context_mcp.tools.read import read_file_lines as read_lines_impl
     return read_lines_impl(file_path, start_line, end_line)
 
 
 @mcp.tool()
-def read_file_tail(file_path: str, num_lines: int = 10) -> dict:
+def read_file_ranges(ranges: list[dict]) -> dict:
+    """Read many line windows, across one or more files, in one call.
+
+    Windows of the same file are merged when they overlap or touch, and each
+    file is opened once. Use it to follow up on several search hits.
+
+    Args:
+        ranges: List of {"file_path": str, "start_line": int, "end_line": int}
+            (1-indexed, inclusive)
+
+    Returns:
+        dict: files (list of file_path, encoding, total_lines, ranges or error),
+        success_count (int), error_count (int)
+    """
+    from context_mcp.tools.read import read_file_ranges as read_ranges_impl
+    return read_ranges_impl(ranges)
+
+
+@mcp.tool()
+def read_file_tail(file_path: str, num_lines: int = 10, count_lines: bool = True) -> dict:
     """Read last N lines of file.
 
     Args:
         file_path: File path relative to project root
         num_lines: Number of lines to read from end (default: 10)
+        count_lines: Compute total_lines even if it needs a full scan (default: True)
 
     Returns:
-        dict: content, encoding, line_count, file_path, is_partial, total_lines
+        dict: content, encoding, encoding_detection, line_count, file_path,
+        is_partial, total_lines (None when not counted)
     """
     from context_mcp.tools.read import read_file_tail as read_tail_impl
-    return read_tail_impl(file_path, num_lines)
+    return read_tail_impl(file_path, num_lines, count_lines)
 
 
 @mcp.tool()
-def read_files(file_paths: list[str]) -> dict:
+def read_files(
+    file_paths: list[str], max_bytes: int | None = None, max_lines: int | None = None
+) -> dict:
     """Batch read multiple files.
 
+    Files are read concurrently and returned in input order. The batch shares
+    one byte budget: the file that exhausts it is truncated, and later files
+    (or files beyond the per-call file limit) get error code BATCH_LIMIT_EXCEEDED.
+
     Args:
         file_paths: List of file paths relative to project root
+        max_bytes: Byte budget for the whole batch (default: server batch limit)
+        max_lines: Maximum lines returned per file (default: unlimited)
 
     Returns:
         dict: files (list), success_count (int), error_count (int)
     """
     from context_mcp.tools.read import read_files as read_files_impl
-    return read_files_impl(file_paths)
+    return read_files_impl(file_paths, max_bytes, max_lines)
+
+
+# ============================================================================
+# Register Status Tools
+# ============================================================================
+
+
+@mcp.tool()
+def get_server_metrics() -> dict:
+    """Report health metrics of background subsystems (watcher, index, caches).
+
+    Returns:
+        dict: metrics (dict keyed by subsystem), generated_at (float)
+    """
+    from context_mcp.tools.status import get_server_metrics as metrics_impl
+    return metrics_impl()
 
 
 # ============================================================================
@@ -284,6 +472,48 @@ async def get_tool_usage_guide(tool_names: list[str] | None = None) -> dict:
 # ============================================================================
 
 
+def _start_background_services(cfg, logger_instance) -> None:
+    """Start the file watcher and the indexes that consume its events.
+
+    Args:
+        cfg: Loaded ProjectConfig
+        logger_instance: Configured logger
+    """
+    from context_mcp.tools import search as search_module
+    from context_mcp.utils.metrics import register_metrics_provider
+    from context_mcp.utils.trigram_index import ensure_index_in_background
+    from context_mcp.utils.watcher import start_watcher
+
+    catalog = search_module.file_catalog
+    index = search_module.search_index
+
+    # Only the catalog and the search index consume watcher events
+    watcher = None
+    if cfg.watch_mode != "off" and (catalog is not None or index is not None):
+        try:
+            watcher = start_watcher(cfg.root_path, cfg.watch_mode, cfg.watch_poll_interval)
+        except OSError as e:
+            logger_instance.warning(f"File watcher unavailable: {e}")
+
+    tracked = search_module.tracked_files
+    if tracked is not None:
+        logger_instance.info(f"Git work tree: {tracked.work_tree}")
+        register_metrics_provider("git_index", tracked.stats)
+
+    if catalog is not None:
+        register_metrics_provider("file_catalog", catalog.stats)
+        if watcher is not None:
+            catalog.attach(watcher)
+        catalog.build_in_background()
+
+    if index is not None:
+        logger_instance.info(f"Search index: {index.db_path}")
+        register_metrics_provider("search_index", index.stats)
+        if watcher is not None:
+            index.attach(watcher)
+        ensure_index_in_background(index)
+
+
 def main():
     """Main entry point for uvx execution."""
     logger_instance = None
@@ -301,6 +531,11 @@ def main():
         logger_instance.info(f"Log level: {logging.getLevelName(cfg.log_level)}")
         logger_instance.info(f"File logging: {'enabled' if cfg.enable_file_log else 'disabled'}")
 
+        logger_instance.info(f"File watcher: {cfg.watch_mode}")
+
+        # Start background subsystems without delaying startup
+        _start_background_services(cfg, logger_instance)
+
         # Run MCP server
         mcp.run()
 
@@ -3,12 +3,20 @@
 Provides directory listing and tree visualization capabilities.
 """
 
+import fnmatch
+import heapq
+import os
+import re
+from collections import deque
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Literal, Optional
 from context_mcp.config import config
 from context_mcp.validators.path_validator import PathValidator
 from context_mcp import FileEntry
+from context_mcp.utils.git_index import TrackedFiles, tracked_files_for
+from context_mcp.utils.gitignore import IGNORE_FILES, IgnoreMatcher, RuleChain
 from context_mcp.utils.logger import logger
+from context_mcp.utils.walker import rel_dir_prefix
 
 
 # Initialize path validator with project root
@@ -18,20 +26,131 @@ if config:
 else:
     validator = None
 
+# Initialize git index reader (None outside a git work tree)
+tracked_files: TrackedFiles | None
+if config and config.git_index:
+    tracked_files = tracked_files_for(
+        config.root_path, config.git_untracked == "include"
+    )
+else:
+    tracked_files = None
+
+# Directory names show_tree lists but does not expand unless told otherwise
+DEFAULT_TREE_IGNORE = (
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".venv",
+    "venv",
+    ".tox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    "build",
+    "dist",
+    "target",
+    "*.egg-info",
+)
+
+# Default node budgets for show_tree
+DEFAULT_TREE_MAX_ENTRIES = 1000
+DEFAULT_TREE_MAX_CHILDREN = 100
+
+
+def _entry_stat(item: os.DirEntry) -> os.stat_result:
+    """Stat a directory entry, following symlinks; a broken link reports itself."""
+    try:
+        return item.stat()
+    except OSError:
+        return item.stat(follow_symlinks=False)
+
+
+def _file_size(item: os.DirEntry) -> int:
+    """Size of a file entry (0 for directories), from the entry's cached stat."""
+    return _entry_stat(item).st_size if item.is_file() else 0
+
+
+def _select(
+    items: list[os.DirEntry],
+    key: Callable[[os.DirEntry], object],
+    descending: bool,
+    limit: int,
+) -> list[os.DirEntry]:
+    """Return items ordered by key, keeping only the first limit (-1 = all).
+
+    With a limit only a heap of that size is maintained (heapq.nsmallest /
+    nlargest), so picking 50 of 100k entries does not sort them all; ties
+    keep scandir order either way, as a stable sort would.
+    """
+    if limit < 0:
+        return sorted(items, key=key, reverse=descending)  # type: ignore[arg-type]
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return select(limit, items, key=key)  # type: ignore[arg-type]
+
+
+def _tracked_for(root_path: Path) -> Optional[TrackedFiles]:
+    """Git index reader for a project root, if it is the configured one."""
+    if tracked_files is not None and tracked_files.root == root_path:
+        return tracked_files
+    return None
+
+
+def _visible(
+    items: list[os.DirEntry],
+    matcher: IgnoreMatcher,
+    chain: Optional[RuleChain],
+    rel_prefix: str,
+    tracked: Optional[TrackedFiles] = None,
+) -> list[os.DirEntry]:
+    """Drop the entries of one directory that its ignore rules exclude.
+
+    Tracked files, and directories holding them, are always kept; nothing
+    else is when untracked files are excluded or when chain is None (an
+    ignored directory shown only for its tracked files).
+    """
+    tracked_paths = tracked.entries() if tracked is not None else {}
+    tracked_dirs = tracked.dirs() if tracked is not None else frozenset()
+    untracked = tracked is None or tracked.include_untracked
+    visible = []
+    for item in items:
+        try:
+            is_dir = item.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+        rel = rel_prefix + item.name
+        if rel in (tracked_dirs if is_dir else tracked_paths):
+            visible.append(item)
+        elif (
+            untracked
+            and chain is not None
+            and not matcher.ignored(chain, rel, item.name, is_dir)
+        ):
+            visible.append(item)
+    return visible
+
 
 def list_directory(
     path: str = ".",
     sort_by: Literal["name", "size", "time"] = "name",
     order: Literal["asc", "desc"] = "asc",
     limit: int = -1,
+    respect_gitignore: bool = True,
 ) -> dict:
     """List directory contents with sorting and limiting.
 
+    Entries come from a single os.scandir pass, whose cached type information
+    answers file/dir checks without extra syscalls. Each entry is stat()ed
+    at most once, and only when needed: every entry when sorting by size or
+    time, otherwise just the entries returned.
+
     Args:
         path: Directory path relative to project root
         sort_by: Sort field (name, size, time)
         order: Sort order (asc, desc)
         limit: Maximum entries to return (-1 = unlimited)
+        respect_gitignore: Hide entries excluded by .gitignore/.ignore files
 
     Returns:
         dict with keys: entries (list[FileEntry]), total (int), truncated (bool)
@@ -59,41 +178,56 @@ def list_directory(
         raise NotADirectoryError(f"Path is not a directory: {path}")
 
     # List directory contents
-    entries = []
     try:
-        for item in abs_path.iterdir():
-            stat = item.stat()
-            entry = FileEntry(
-                name=item.name,
-                type="dir" if item.is_dir() else "file",
-                size=stat.st_size if item.is_file() else 0,
-                mtime=stat.st_mtime,
-                path=str(item.relative_to(config.root_path)),
-            )
-            entries.append(entry)
+        with os.scandir(abs_path) as it:
+            items = list(it)
     except PermissionError as e:
         raise PermissionError(
             f"PERMISSION_DENIED: Cannot list directory: {path}"
         ) from e
 
-    # Sort entries
+    if respect_gitignore:
+        matcher = IgnoreMatcher(config.root_path)
+        prefix = rel_dir_prefix(abs_path, config.root_path)
+        items = _visible(
+            items,
+            matcher,
+            matcher.chain_for(prefix),
+            prefix,
+            _tracked_for(config.root_path),
+        )
+
+    total = len(items)
+    # limit=0 returns empty list but preserves total count
+    truncated = limit == 0 or 0 < limit < total
+
+    # Sort entries, keeping only the first `limit`
+    descending = order == "desc"
     if sort_by == "name":
-        entries.sort(key=lambda e: e.name, reverse=(order == "desc"))
+        items = _select(items, lambda item: item.name, descending, limit)
     elif sort_by == "size":
-        entries.sort(key=lambda e: e.size, reverse=(order == "desc"))
+        items = _select(items, _file_size, descending, limit)
     elif sort_by == "time":
-        entries.sort(key=lambda e: e.mtime, reverse=(order == "desc"))
+        items = _select(
+            items, lambda item: _entry_stat(item).st_mtime, descending, limit
+        )
+    elif limit >= 0:
+        items = items[:limit]
 
-    # Apply limit
-    total = len(entries)
-    truncated = False
-    if limit == 0:
-        # limit=0 returns empty list but preserves total count
-        entries = []
-        truncated = True
-    elif limit > 0 and len(entries) > limit:
-        entries = entries[:limit]
-        truncated = True
+    rel_dir = abs_path.relative_to(config.root_path)
+    entries = []
+    for item in items:
+        # DirEntry caches its stat, so entries stat()ed for sorting are not re-read
+        stat = _entry_stat(item)
+        entries.append(
+            FileEntry(
+                name=item.name,
+                type="dir" if item.is_dir() else "file",
+                size=stat.st_size if item.is_file() else 0,
+                mtime=stat.st_mtime,
+                path=str(rel_dir / item.name),
+            )
+        )
 
     return {
         "entries": [
@@ -111,28 +245,67 @@ def list_directory(
     }
 
 
-def show_tree(path: str = ".", max_depth: int = 3) -> dict:
+def _is_dir(item: os.DirEntry) -> bool:
+    """Whether an entry is a directory (following symlinks), False if unreadable."""
+    try:
+        return item.is_dir()
+    except OSError:
+        return False
+
+
+def show_tree(
+    path: str = ".",
+    max_depth: int = 3,
+    max_entries: int = DEFAULT_TREE_MAX_ENTRIES,
+    max_children_per_dir: int = DEFAULT_TREE_MAX_CHILDREN,
+    ignore_patterns: Optional[list[str]] = None,
+    respect_gitignore: bool = True,
+) -> dict:
     """Show directory tree structure.
 
+    The tree is walked breadth first with os.scandir, so shallow levels are
+    filled before deep ones and the walk stops scanning as soon as
+    max_entries nodes have been produced. Each directory shows at most
+    max_children_per_dir children (the first by name, picked with a heap
+    rather than a full sort); a directory with hidden children is marked
+    truncated, with omitted giving how many were left out, or without
+    omitted when the budget ran out before it was scanned. Directories
+    matching ignore_patterns are listed with pruned set but not expanded;
+    symlinked directories are not expanded either. Entries excluded by
+    .gitignore/.ignore files are left out entirely.
+
     Args:
         path: Starting directory path relative to project root
         max_depth: Maximum depth to traverse (1-10)
+        max_entries: Maximum nodes in the tree, excluding the root (>= 1)
+        max_children_per_dir: Maximum children shown per directory (>= 1)
+        ignore_patterns: Directory name globs not to expand
+            (None = DEFAULT_TREE_IGNORE, [] = expand everything)
+        respect_gitignore: Leave out entries excluded by .gitignore/.ignore files
 
     Returns:
-        dict with keys: tree (TreeNode), max_depth_reached (bool)
+        dict with keys: tree (TreeNode), max_depth_reached (bool),
+        truncated (bool), total_entries (int)
 
     Raises:
         PathSecurityError: If path is outside project root
         FileNotFoundError: If directory doesn't exist
+        ValueError: If a limit is out of range
     """
     if not validator:
         raise RuntimeError("Configuration not loaded")
 
-    logger.info(f"show_tree: path={path}, max_depth={max_depth}")
+    logger.info(
+        f"show_tree: path={path}, max_depth={max_depth}, max_entries={max_entries}"
+    )
 
     # Validate inputs
     if max_depth < 1 or max_depth > 10:
         raise ValueError("max_depth must be between 1 and 10")
+    if max_entries < 1:
+        raise ValueError(f"max_entries must be >= 1: {max_entries}")
+    if max_children_per_dir < 1:
+        raise ValueError(f"max_children_per_dir must be >= 1: {max_children_per_dir}")
 
     # Validate path
     abs_path = validator.validate(path)
@@ -143,38 +316,104 @@ def show_tree(path: str = ".", max_depth: int = 3) -> dict:
     if not abs_path.is_dir():
         raise NotADirectoryError(f"Path is not a directory: {path}")
 
-    # Build tree recursively
-    max_depth_reached = False
-
-    def build_tree_node(current_path: Path, current_depth: int) -> dict:
-        nonlocal max_depth_reached
-
-        node: dict[str, object] = {
-            "name": current_path.name if current_path != abs_path else ".",
-            "type": "dir" if current_path.is_dir() else "file",
-            "depth": current_depth,
-        }
-
-        # Add children if directory and not at max depth
-        if current_path.is_dir() and current_depth < max_depth:
-            children = []
-            try:
-                for item in sorted(current_path.iterdir(), key=lambda p: p.name):
-                    child_node = build_tree_node(item, current_depth + 1)
-                    children.append(child_node)
-            except PermissionError:
-                pass  # Skip inaccessible directories
+    patterns = DEFAULT_TREE_IGNORE if ignore_patterns is None else ignore_patterns
+    ignored = (
+        re.compile("|".join(fnmatch.translate(p) for p in patterns))
+        if patterns
+        else None
+    )
 
-            if children:
-                node["children"] = children
-        elif current_path.is_dir() and current_depth >= max_depth:
-            max_depth_reached = True
+    matcher = IgnoreMatcher(validator.root) if respect_gitignore else None
+    prefix = rel_dir_prefix(abs_path, validator.root)
+    chain: Optional[RuleChain] = (
+        matcher.chain_for(prefix) if matcher is not None else ()
+    )
+    tracked = _tracked_for(validator.root)
 
-        return node
+    tree: dict[str, object] = {"name": ".", "type": "dir", "depth": 0}
+    max_depth_reached = False
+    truncated = False
+    budget = max_entries
+    # A None chain marks an ignored directory shown only for its tracked files
+    pending: deque[tuple[dict, str, str, int, Optional[RuleChain]]] = deque(
+        [(tree, str(abs_path), prefix, 0, chain)]
+    )
 
-    tree = build_tree_node(abs_path, 0)
+    while pending:
+        node, dir_path, rel_prefix, depth, chain = pending.popleft()
+        if budget <= 0:
+            # Out of budget: remaining directories are not scanned
+            node["truncated"] = True
+            truncated = True
+            continue
+
+        try:
+            with os.scandir(dir_path) as it:
+                items = list(it)
+        except OSError:
+            continue  # Skip inaccessible directories
+        if matcher is not None:
+            if (
+                chain is not None
+                and depth > 0
+                and any(item.name in IGNORE_FILES for item in items)
+            ):
+                chain = matcher.extend(chain, dir_path, rel_prefix)
+            items = _visible(items, matcher, chain, rel_prefix, tracked)
+
+        limit = min(max_children_per_dir, budget)
+        if limit < len(items):
+            shown = heapq.nsmallest(limit, items, key=lambda item: item.name)
+            node["truncated"] = True
+            node["omitted"] = len(items) - limit
+            truncated = True
+        else:
+            shown = sorted(items, key=lambda item: item.name)
+        budget -= len(shown)
+
+        children = []
+        for item in shown:
+            is_dir = _is_dir(item)
+            child: dict[str, object] = {
+                "name": item.name,
+                "type": "dir" if is_dir else "file",
+                "depth": depth + 1,
+            }
+            children.append(child)
+            if not is_dir:
+                continue
+            if ignored is not None and ignored.match(item.name):
+                child["pruned"] = True
+            elif depth + 1 >= max_depth:
+                max_depth_reached = True
+            elif not item.is_symlink():
+                child_chain = chain
+                if (
+                    tracked is not None
+                    and chain is not None
+                    and matcher is not None
+                    and matcher.ignored(chain, rel_prefix + item.name, item.name, True)
+                ):
+                    child_chain = None  # Visible only through its tracked files
+                pending.append(
+                    (
+                        child,
+                        item.path,
+                        f"{rel_prefix}{item.name}/",
+                        depth + 1,
+                        child_chain,
+                    )
+                )
+
+        if children:
+            node["children"] = children
 
-    return {"tree": tree, "max_depth_reached": max_depth_reached}
+    return {
+        "tree": tree,
+        "max_depth_reached": max_depth_reached,
+        "truncated": truncated,
+        "total_entries": max_entries - budget,
+    }
 
 
 def _discover_context_file(filename: str, project_root: Path) -> dict:
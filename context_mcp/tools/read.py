@@ -1,13 +1,28 @@
-"""Read tools: read_entire_file, read_file_lines, read_file_tail, read_files.
+"""Read tools: read_entire_file, read_file_lines, read_file_ranges, read_file_tail, read_files.
 
 Provides file reading capabilities with encoding detection and partial reading support.
 """
 
-import chardet
+import codecs
+import io
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO, Callable, Generator, Iterator, Optional, TypeVar
 from context_mcp.config import config
 from context_mcp.validators.path_validator import PathValidator
-from context_mcp.utils.file_detector import assert_text_file
+from context_mcp.utils.file_detector import (
+    BinaryFileError,
+    FilePreflight,
+    cached_preflight,
+    preflight_file,
+)
+from context_mcp.utils.file_metadata import file_metadata_cache
+from context_mcp.utils.line_index import is_index_compatible
 from context_mcp.utils.logger import logger
 
 
@@ -18,6 +33,24 @@ if config:
 else:
     validator = None
 
+# Encoding detection settings (fast: strict ASCII/UTF-8 check before chardet)
+encoding_detection = config.encoding_detection if config else "fast"
+default_encoding = config.default_encoding if config else "utf-8"
+
+# Server-wide cap on bytes returned for one file
+read_max_bytes = config.read_max_bytes if config else 10 * 1024 * 1024
+
+# read_files concurrency and per-call limits
+read_workers = config.read_workers if config else 8
+read_batch_max_files = config.read_batch_max_files if config else 500
+read_batch_max_bytes = config.read_batch_max_bytes if config else 64 * 1024 * 1024
+
+T = TypeVar("T")
+
+# Thread pool shared by all read_files calls, created on first use
+_read_pool: Optional[ThreadPoolExecutor] = None
+_read_pool_lock = threading.Lock()
+
 
 def detect_encoding(file_path: Path) -> str:
     """Detect file encoding using chardet.
@@ -30,33 +63,40 @@ def detect_encoding(file_path: Path) -> str:
     """
     try:
         with open(file_path, "rb") as f:
-            raw_data = f.read(10000)  # Read first 10KB for detection
-            result = chardet.detect(raw_data)
-            return result["encoding"] or "utf-8"
+            preflight = preflight_file(
+                f, mode=encoding_detection, default_encoding=default_encoding
+            )
+            return preflight.encoding
     except Exception:
-        return "utf-8"  # Default fallback
+        return default_encoding  # Default fallback
 
 
-def _prepare_file_read(file_path: str) -> tuple[Path, str]:
+@contextmanager
+def _open_text_file(file_path: str) -> Iterator[tuple[Path, BinaryIO, FilePreflight]]:
     """Shared file read preparation logic.
 
     Performs common validation and setup for all read operations:
     - Path security validation
     - File existence check
-    - Binary file detection
-    - Encoding detection
+    - Binary file detection and encoding detection, from one prefix read
+
+    The file is opened once. The preflight prefix is the start of the
+    content, so callers reading sequentially continue from the current
+    position instead of re-reading it. For a file version seen before the
+    preflight comes from the metadata cache, with an empty prefix.
 
     Args:
         file_path: File path relative to project root
 
-    Returns:
-        Tuple of (absolute_path, encoding)
+    Yields:
+        Tuple of (absolute_path, binary file positioned after the prefix, preflight)
 
     Raises:
         RuntimeError: If configuration not loaded
         FileNotFoundError: If file doesn't exist
         ValueError: If path is not a file or is binary
         PathSecurityError: If path is outside project root
+        PermissionError: If the file cannot be read (also raised for the body)
     """
     if not validator:
         raise RuntimeError("Configuration not loaded")
@@ -70,45 +110,125 @@ def _prepare_file_read(file_path: str) -> tuple[Path, str]:
     if not abs_path.is_file():
         raise ValueError(f"Path is not a file: {file_path}")
 
-    # Check if binary
-    assert_text_file(abs_path)
+    try:
+        with open(abs_path, "rb") as f:
+            preflight = cached_preflight(
+                abs_path, f, mode=encoding_detection, default_encoding=default_encoding
+            )
+            if preflight.is_binary:
+                raise BinaryFileError(str(abs_path))
+            yield abs_path, f, preflight
+    except PermissionError:
+        raise PermissionError(f"PERMISSION_DENIED: Cannot read {file_path}")
+
+
+def _decode_lines(raw: bytes, encoding: str) -> str:
+    """Decode raw line bytes, normalizing newlines as text-mode reading does."""
+    text = raw.decode(encoding, errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
 
-    # Detect encoding
-    encoding = detect_encoding(abs_path)
+def _has_bare_cr(text: str) -> bool:
+    """Whether decoded text has a "\r" line end not followed by "\n"."""
+    return text.count("\r") != text.count("\r\n")
 
-    return abs_path, encoding
 
+def read_entire_file(
+    file_path: str,
+    max_bytes: Optional[int] = None,
+    max_lines: Optional[int] = None,
+    offset: int = 0,
+) -> dict:
+    """Read complete file content, up to a byte and line budget.
 
-def read_entire_file(file_path: str) -> dict:
-    """Read complete file content.
+    At most max_bytes bytes (never more than the server-wide cap) and
+    max_lines lines are returned. A truncated response ends on a line break
+    when one fits and reports where to continue: pass next_offset back as
+    offset, or next_line to read_file_lines.
 
     Args:
         file_path: File path relative to project root
+        max_bytes: Maximum bytes to return (default and upper bound: server cap)
+        max_lines: Maximum lines to return (default: unlimited)
+        offset: Byte offset to start reading from (default: 0)
 
     Returns:
-        dict with keys: content, encoding, line_count, file_path
+        dict with keys: content, encoding, encoding_detection, line_count, file_path,
+        truncated, total_bytes, next_offset (int or None), next_line (int or None)
     """
     logger.info(f"read_entire_file: {file_path}")
+    result, _ = _read_entire_file(file_path, max_bytes, max_lines, offset)
+    return result
 
-    # Use shared preparation logic
-    abs_path, encoding = _prepare_file_read(file_path)
 
-    # Read file
-    try:
-        with open(abs_path, "r", encoding=encoding, errors="replace") as f:
-            content = f.read()
-            line_count = content.count("\n") + (
-                1 if content and not content.endswith("\n") else 0
+def _read_entire_file(
+    file_path: str,
+    max_bytes: Optional[int] = None,
+    max_lines: Optional[int] = None,
+    offset: int = 0,
+) -> tuple[dict, int]:
+    """Read file content within limits and report the number of bytes returned.
+
+    Args:
+        file_path: File path relative to project root
+        max_bytes: Maximum bytes to return (clamped to the server cap)
+        max_lines: Maximum lines to return
+        offset: Byte offset to start reading from
+
+    Returns:
+        Tuple of (read_entire_file result, bytes returned)
+    """
+    if max_bytes is not None and max_bytes < 1:
+        raise ValueError(f"max_bytes must be >= 1: {max_bytes}")
+    if max_lines is not None and max_lines < 1:
+        raise ValueError(f"max_lines must be >= 1: {max_lines}")
+    if offset < 0:
+        raise ValueError(f"offset must be >= 0: {offset}")
+    limit = read_max_bytes if max_bytes is None else min(max_bytes, read_max_bytes)
+
+    # Use shared preparation logic; the preflight prefix starts the content
+    with _open_text_file(file_path) as (abs_path, f, preflight):
+        encoding = preflight.encoding
+        size = os.fstat(f.fileno()).st_size
+        if offset > size:
+            raise ValueError(
+                f"INVALID_OFFSET: offset {offset} is past the end ({size} bytes)"
             )
-    except PermissionError:
-        raise PermissionError(f"PERMISSION_DENIED: Cannot read {file_path}")
 
-    return {
+        layout = _newline_layout(_file_head(f, preflight), encoding)
+        codec, newline, unit, text_start = layout or (encoding, b"\n", 1, 0)
+
+        raw = _read_bounded(f, preflight, offset, limit, max_lines, newline)
+        at_end = offset + len(raw) >= size
+        cut = _cut_point(
+            raw, offset, newline, unit, text_start, limit, max_lines, at_end, codec
+        )
+        raw = raw[:cut]
+        truncated = offset + cut < size
+
+        # The codec of a BOM-aware encoding strips the BOM from the start only
+        content = _decode_lines(raw, encoding if offset == 0 else codec)
+        line_count = content.count("\n") + (
+            1 if content and not content.endswith("\n") else 0
+        )
+
+        next_line: Optional[int] = None
+        if truncated:
+            first_line = _line_number_at(abs_path, f, offset, layout, encoding)
+            next_line = first_line + content.count("\n")
+
+    result = {
         "content": content,
         "encoding": encoding,
+        "encoding_detection": preflight.detection,
         "line_count": line_count,
         "file_path": file_path,
+        "truncated": truncated,
+        "total_bytes": size,
+        "next_offset": offset + cut if truncated else None,
+        "next_line": next_line,
     }
+    return result, cut
 
 
 def read_file_lines(file_path: str, start_line: int, end_line: int) -> dict:
@@ -120,7 +240,8 @@ def read_file_lines(file_path: str, start_line: int, end_line: int) -> dict:
         end_line: Ending line number (inclusive)
 
     Returns:
-        dict with keys: content, encoding, line_count, file_path, is_partial, total_lines
+        dict with keys: content, encoding, encoding_detection, line_count, file_path,
+        is_partial, total_lines
     """
     logger.info(f"read_file_lines: {file_path}, lines {start_line}-{end_line}")
 
@@ -133,77 +254,379 @@ def read_file_lines(file_path: str, start_line: int, end_line: int) -> dict:
         )
 
     # Use shared preparation logic
-    abs_path, encoding = _prepare_file_read(file_path)
+    with _open_text_file(file_path) as (abs_path, f, preflight):
+        total_lines, windows = _read_line_windows(
+            abs_path, f, preflight, [(start_line, end_line)]
+        )
+
+    # Check if range is valid
+    if start_line > total_lines:
+        raise ValueError(f"INVALID_LINE_RANGE: File has only {total_lines} lines")
+
+    _, actual_end, content = windows[0]
+    return {
+        "content": content,
+        "encoding": preflight.encoding,
+        "encoding_detection": preflight.detection,
+        "line_count": actual_end - start_line + 1,
+        "file_path": file_path,
+        "is_partial": True,
+        "total_lines": total_lines,
+    }
 
-    # Read lines
-    try:
-        with open(abs_path, "r", encoding=encoding, errors="replace") as f:
-            all_lines = f.readlines()
-            total_lines = len(all_lines)
-
-            # Check if range is valid
-            if start_line > total_lines:
-                raise ValueError(
-                    f"INVALID_LINE_RANGE: File has only {total_lines} lines"
-                )
 
-            # Extract requested lines
-            # Convert to 0-indexed
+def _read_line_windows(
+    abs_path: Path,
+    f: BinaryIO,
+    preflight: FilePreflight,
+    windows: list[tuple[int, int]],
+) -> tuple[int, list[tuple[int, int, str]]]:
+    """Read inclusive, 1-indexed line windows from an open file.
+
+    Args:
+        abs_path: Absolute path of the file
+        f: The file, as yielded by _open_text_file
+        preflight: Its preflight result
+        windows: (start_line, end_line) pairs
+
+    Returns:
+        Tuple of (total_lines, [(start_line, actual_end, content)]); windows are
+        clamped to the file, and one starting past the end has empty content
+    """
+    encoding = preflight.encoding
+
+    # Seek straight to each window using the cached line-offset index
+    index = None
+    if is_index_compatible(encoding):
+        index = file_metadata_cache.line_index(abs_path, f)
+    if index is not None and not index.has_bare_cr:
+        total_lines = index.total_lines
+        results = []
+        for start_line, end_line in windows:
             actual_end = min(end_line, total_lines)
-            selected_lines = all_lines[start_line - 1 : actual_end]
+            content = ""
+            if start_line <= total_lines:
+                start = index.line_offset(f, start_line)
+                end = index.line_offset(f, actual_end + 1)
+                f.seek(start)
+                content = _decode_lines(f.read(end - start), encoding)
+            results.append((start_line, actual_end, content))
+        return total_lines, results
+
+    # Encodings with multi-byte newlines (UTF-16/32) and files with "\r" line
+    # ends, which the index cannot locate: decode and split
+    f.seek(len(preflight.prefix))
+    all_lines = io.StringIO(
+        _decode_lines(preflight.prefix + f.read(), encoding)
+    ).readlines()
+    total_lines = len(all_lines)
+    return total_lines, [
+        (
+            start_line,
+            min(end_line, total_lines),
+            "".join(all_lines[start_line - 1 : min(end_line, total_lines)]),
+        )
+        for start_line, end_line in windows
+    ]
 
-            content = "".join(selected_lines)
-            line_count = len(selected_lines)
-            is_partial = True
 
-    except PermissionError:
-        raise PermissionError(f"PERMISSION_DENIED: Cannot read {file_path}")
+def _merge_windows(windows: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort line windows and merge those that overlap or touch."""
+    merged: list[tuple[int, int]] = []
+    for start_line, end_line in sorted(windows):
+        if merged and start_line <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end_line))
+        else:
+            merged.append((start_line, end_line))
+    return merged
+
+
+def _read_file_windows(file_path: str, windows: list[tuple[int, int]]) -> dict:
+    """Read merged windows of one file for read_file_ranges."""
+    try:
+        with _open_text_file(file_path) as (abs_path, f, preflight):
+            total_lines, results = _read_line_windows(abs_path, f, preflight, windows)
+    except Exception as e:
+        return _error_entry(file_path, e)
 
     return {
-        "content": content,
-        "encoding": encoding,
-        "line_count": line_count,
         "file_path": file_path,
-        "is_partial": is_partial,
+        "encoding": preflight.encoding,
+        "encoding_detection": preflight.detection,
         "total_lines": total_lines,
+        "ranges": [
+            {
+                "start_line": start_line,
+                "end_line": actual_end,
+                "line_count": max(0, actual_end - start_line + 1),
+                "content": content,
+            }
+            for start_line, actual_end, content in results
+        ],
     }
 
 
-def read_file_tail(file_path: str, num_lines: int = 10) -> dict:
+def read_file_ranges(ranges: list[dict]) -> dict:
+    """Read many line windows, across one or more files, in one call.
+
+    Windows are grouped by file and overlapping or adjacent windows of a file
+    are merged, so each file is validated, sniffed and opened once and every
+    merged window is read by seeking to it. Files are read on the read_files
+    thread pool and returned in order of first appearance.
+
+    Args:
+        ranges: List of dicts with keys file_path, start_line, end_line
+            (1-indexed, inclusive)
+
+    Returns:
+        dict with keys: files (list), success_count (int), error_count (int).
+        Each file entry has file_path, encoding, encoding_detection,
+        total_lines and ranges (start_line, end_line, line_count, content);
+        end_line is clamped to the file and a window starting past the end
+        has no content. Failed files carry an error object instead.
+
+    Raises:
+        ValueError: If a range is malformed or has invalid line numbers
+    """
+    if not validator:
+        raise RuntimeError("Configuration not loaded")
+
+    logger.info(f"read_file_ranges: {len(ranges)} ranges")
+
+    by_file: dict[str, list[tuple[int, int]]] = {}
+    for window in ranges:
+        try:
+            file_path = window["file_path"]
+            start_line = int(window["start_line"])
+            end_line = int(window["end_line"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(
+                f"INVALID_RANGE: expected file_path, start_line, end_line: {window}"
+            )
+        if start_line < 1 or end_line < 1:
+            raise ValueError("Line numbers must be >= 1")
+        if start_line > end_line:
+            raise ValueError(
+                f"INVALID_LINE_RANGE: start_line ({start_line}) > end_line ({end_line})"
+            )
+        by_file.setdefault(file_path, []).append((start_line, end_line))
+
+    file_paths = list(by_file)
+    accepted = file_paths[:read_batch_max_files]
+    results = list(
+        _ordered_reads(
+            lambda path: _read_file_windows(path, _merge_windows(by_file[path])),
+            accepted,
+        )
+    )
+    for file_path in file_paths[len(accepted) :]:
+        message = f"batch file limit of {read_batch_max_files} reached"
+        results.append(
+            _error_entry(file_path, ValueError(f"BATCH_LIMIT_EXCEEDED: {message}"))
+        )
+
+    error_count = sum(1 for entry in results if "error" in entry)
+    return {
+        "files": results,
+        "success_count": len(results) - error_count,
+        "error_count": error_count,
+    }
+
+
+# Byte-order marks of the UTF-16/32 codecs, longest first
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# Bytes read per step when scanning backward from the end of a file
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def _newline_layout(
+    head: bytes, encoding: str
+) -> Optional[tuple[str, bytes, int, int]]:
+    """Describe how newlines are encoded in a file.
+
+    Args:
+        head: First bytes of the file (at least 4 unless the file is shorter)
+        encoding: Detected encoding
+
+    Returns:
+        Tuple of (decode_codec, newline_bytes, code_unit_size, text_start), or
+        None if newlines cannot be located at the byte level
+    """
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+    if name in ("utf-16", "utf-32"):
+        for bom, codec in _BOMS:
+            if head.startswith(bom) and codec.startswith(name):
+                return codec, "\n".encode(codec), len("\n".encode(codec)), len(bom)
+        # Without a BOM Python decodes these as little-endian
+        codec = f"{name}-le"
+        return codec, "\n".encode(codec), len("\n".encode(codec)), 0
+    if name in ("utf-16-le", "utf-16-be", "utf-32-le", "utf-32-be"):
+        return name, "\n".encode(name), len("\n".encode(name)), 0
+    if name == "utf-8-sig":
+        return "utf-8", b"\n", 1, 3 if head.startswith(codecs.BOM_UTF8) else 0
+    if is_index_compatible(encoding):
+        return encoding, b"\n", 1, 0
+    return None
+
+
+def _tail_offset(
+    f: BinaryIO, size: int, num_lines: int, newline: bytes, unit: int, text_start: int
+) -> int:
+    """Find where the last num_lines lines start by reading blocks backward.
+
+    Args:
+        f: File opened in binary mode
+        size: File size in bytes
+        num_lines: Number of lines wanted
+        newline: Encoded newline
+        unit: Code unit size; matches not aligned to it are ignored
+        text_start: Offset of the first text byte (after any BOM)
+
+    Returns:
+        Byte offset of the first returned line (text_start for the whole file)
+    """
+    end = size
+    # A final newline terminates the last line rather than starting a new one
+    if size - len(newline) >= text_start:
+        f.seek(size - len(newline))
+        if f.read(len(newline)) == newline:
+            end = size - len(newline)
+
+    found = 0
+    block_end = end
+    # Overlap blocks so a newline split across a boundary is still seen
+    overlap = len(newline) - 1
+    while block_end > text_start:
+        block_start = max(text_start, block_end - _TAIL_BLOCK_SIZE)
+        f.seek(block_start)
+        block = f.read(min(block_end + overlap, end) - block_start)
+        pos = len(block)
+        while True:
+            pos = block.rfind(newline, 0, pos)
+            if pos < 0:
+                break
+            absolute = block_start + pos
+            # Matches starting at block_end or later were counted by the
+            # previous block; unaligned ones straddle two code units
+            if (
+                absolute < block_end
+                and absolute + len(newline) <= end
+                and (absolute - text_start) % unit == 0
+            ):
+                found += 1
+                if found == num_lines:
+                    return absolute + len(newline)
+            pos += len(newline) - 1
+            if pos <= 0:
+                break
+        block_end = block_start
+    return text_start
+
+
+def read_file_tail(
+    file_path: str, num_lines: int = 10, count_lines: bool = True
+) -> dict:
     """Read last N lines of file.
 
+    Blocks are read backward from the end of the file until enough newlines
+    are found, so the cost does not depend on the file size. Counting the
+    total number of lines needs a full scan; its result is kept in the
+    line-offset cache, and count_lines=False skips it unless already cached.
+
     Args:
         file_path: File path relative to project root
         num_lines: Number of lines to read from end
+        count_lines: Whether to compute total_lines if it is not cached
 
     Returns:
-        dict with keys: content, encoding, line_count, file_path, is_partial, total_lines
+        dict with keys: content, encoding, encoding_detection, line_count, file_path,
+        is_partial, total_lines (int, or None when not counted)
     """
     logger.info(f"read_file_tail: {file_path}, num_lines={num_lines}")
 
+    if num_lines < 1:
+        raise ValueError(f"num_lines must be >= 1: {num_lines}")
+
     # Use shared preparation logic
-    abs_path, encoding = _prepare_file_read(file_path)
+    with _open_text_file(file_path) as (abs_path, f, preflight):
+        encoding = preflight.encoding
+        layout = _newline_layout(_file_head(f, preflight), encoding)
+        if layout is None:
+            f.seek(0)
+            text = _decode_lines(f.read(), encoding)
+            return _read_file_tail_full(
+                text, file_path, num_lines, encoding, preflight.detection
+            )
+        codec, newline, unit, text_start = layout
+
+        st = os.fstat(f.fileno())
+        start = _tail_offset(f, st.st_size, num_lines, newline, unit, text_start)
+        f.seek(start)
+        text = f.read().decode(codec, errors="replace")
+        if _has_bare_cr(text):
+            # "\r" line ends were not seen by the backward scan for newlines
+            f.seek(0)
+            text = _decode_lines(f.read(), encoding)
+            return _read_file_tail_full(
+                text, file_path, num_lines, encoding, preflight.detection
+            )
+        content = text.replace("\r\n", "\n")
+
+        total_lines: Optional[int] = None
+        if unit == 1:
+            entry = file_metadata_cache.peek(abs_path, st)
+            index = entry.line_index if entry is not None else None
+            if index is None and count_lines:
+                index = file_metadata_cache.line_index(abs_path, f)
+            if index is not None:
+                total_lines = index.total_lines
+        elif count_lines:
+            f.seek(text_start)
+            total_lines = _decode_lines(f.read(), codec).count("\n")
+            if content and not content.endswith("\n"):
+                total_lines += 1
+
+    line_count = content.count("\n") + (
+        1 if content and not content.endswith("\n") else 0
+    )
+    return {
+        "content": content,
+        "encoding": encoding,
+        "encoding_detection": preflight.detection,
+        "line_count": line_count,
+        "file_path": file_path,
+        "is_partial": start > text_start,
+        "total_lines": total_lines,
+    }
 
-    # Read file tail
-    try:
-        with open(abs_path, "r", encoding=encoding, errors="replace") as f:
-            all_lines = f.readlines()
-            total_lines = len(all_lines)
 
-            # Get last N lines
-            tail_lines = (
-                all_lines[-num_lines:] if total_lines > num_lines else all_lines
-            )
-            content = "".join(tail_lines)
-            line_count = len(tail_lines)
-            is_partial = total_lines > num_lines
+def _read_file_tail_full(
+    text: str, file_path: str, num_lines: int, encoding: str, detection: str
+) -> dict:
+    """Tail fallback for text whose line ends cannot be found as newline bytes."""
+    all_lines = io.StringIO(text).readlines()
+    total_lines = len(all_lines)
 
-    except PermissionError:
-        raise PermissionError(f"PERMISSION_DENIED: Cannot read {file_path}")
+    # Get last N lines
+    tail_lines = all_lines[-num_lines:] if total_lines > num_lines else all_lines
+    content = "".join(tail_lines)
+    line_count = len(tail_lines)
+    is_partial = total_lines > num_lines
 
     return {
         "content": content,
         "encoding": encoding,
+        "encoding_detection": detection,
         "line_count": line_count,
         "file_path": file_path,
         "is_partial": is_partial,
@@ -211,52 +634,323 @@ def read_file_tail(file_path: str, num_lines: int = 10) -> dict:
     }
 
 
-def read_files(file_paths: list[str]) -> dict:
+# Bytes read per step while collecting a bounded number of lines
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Line ends as universal newlines find them, for encodings with a one-byte "\n"
+_LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+def _file_head(f: BinaryIO, preflight: FilePreflight) -> bytes:
+    """First 4 bytes of a file, from the preflight prefix when it has one."""
+    if preflight.prefix:
+        return preflight.prefix[:4]
+    # A cached preflight has no prefix
+    position = f.tell()
+    f.seek(0)
+    head = f.read(4)
+    f.seek(position)
+    return head
+
+
+def _read_bounded(
+    f: BinaryIO,
+    preflight: FilePreflight,
+    start: int,
+    max_bytes: int,
+    max_lines: Optional[int],
+    newline: bytes,
+) -> bytes:
+    """Read from start up to max_bytes, stopping early once max_lines lines are in.
+
+    Bytes already held in the preflight prefix are not read again.
+    """
+    data = preflight.prefix[start : max_bytes + start]
+    f.seek(start + len(data))
+    if max_lines is None:
+        return data + f.read(max_bytes - len(data))
+
+    chunks = [data]
+    total = len(data)
+    found = data.count(newline)
+    while total < max_bytes and found < max_lines:
+        chunk = f.read(min(_READ_CHUNK_SIZE, max_bytes - total))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+        found += chunk.count(newline)
+    return b"".join(chunks)
+
+
+def _cut_point(
+    raw: bytes,
+    raw_start: int,
+    newline: bytes,
+    unit: int,
+    text_start: int,
+    max_bytes: int,
+    max_lines: Optional[int],
+    at_end: bool,
+    codec: str,
+) -> int:
+    """Length of the prefix of raw to return under the byte and line limits.
+
+    Args:
+        raw: Bytes read from raw_start
+        raw_start: File offset of raw
+        newline: Encoded newline
+        unit: Code unit size; newline matches not aligned to it are ignored
+        text_start: Offset of the first text byte (after any BOM)
+        max_bytes: Byte limit
+        max_lines: Line limit, or None
+        at_end: Whether raw extends to the end of the file
+        codec: Codec of the text, used to avoid splitting a character
+
+    Returns:
+        Cut offset into raw: after the max_lines-th line, the whole of raw if
+        it is complete, else after the last line break within max_bytes
+    """
+    limit = min(len(raw), max_bytes)
+    if unit == 1 and raw.find(b"\r", 0, limit) >= 0:
+        return _universal_cut(raw, limit, max_lines, at_end, codec)
+
+    def aligned(i: int) -> bool:
+        return (raw_start + i - text_start) % unit == 0
+
+    if max_lines is not None:
+        pos = found = 0
+        while True:
+            i = raw.find(newline, pos, limit)
+            if i < 0:
+                break
+            if aligned(i):
+                found += 1
+                if found == max_lines:
+                    return i + len(newline)
+                pos = i + len(newline)
+            else:
+                pos = i + 1
+
+    if limit == len(raw) and at_end:
+        return limit
+
+    # Prefer ending on a line break
+    end = limit
+    while True:
+        i = raw.rfind(newline, 0, end)
+        if i < 0:
+            break
+        if aligned(i):
+            return i + len(newline)
+        end = i + len(newline) - 1
+
+    # A single line longer than the limit: cut at a character boundary
+    cut = limit - (raw_start + limit - text_start) % unit
+    return _char_boundary(raw, cut, codec) or limit
+
+
+def _universal_cut(
+    raw: bytes, limit: int, max_lines: Optional[int], at_end: bool, codec: str
+) -> int:
+    """_cut_point for one-byte newlines when raw holds "\r" line ends.
+
+    Lines end at "\r\n", "\n" or "\r", as universal newlines split them. A
+    "\r" at the limit that may be followed by "\n" is not taken as a line
+    end, so "\r\n" is never split across two reads.
+    """
+    ends = [m.end() for m in _LINE_END.finditer(raw, 0, limit)]
+    cut = limit
+    if ends and ends[-1] == limit and raw[limit - 1 : limit] == b"\r":
+        following = raw[limit : limit + 1]
+        if following == b"\n" or (not following and not at_end):
+            ends.pop()
+            cut = limit - 1
+    if max_lines is not None and len(ends) >= max_lines:
+        return ends[max_lines - 1]
+    if cut == len(raw) and at_end:
+        return cut
+    if ends:
+        return ends[-1]
+    return _char_boundary(raw, cut, codec) or limit
+
+
+def _char_boundary(raw: bytes, cut: int, codec: str) -> int:
+    """Move a cut back so it does not split a UTF-8 sequence (0 if nothing fits)."""
+    if codecs.lookup(codec).name in ("utf-8", "utf-8-sig"):
+        # Drop a trailing sequence whose lead byte promises more bytes
+        for back in range(1, min(4, cut) + 1):
+            byte = raw[cut - back]
+            if byte & 0xC0 != 0x80:
+                length = (
+                    1 if byte < 0xC0 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                )
+                if length > back:
+                    cut -= back
+                break
+    return max(cut, 0)
+
+
+def _line_number_at(
+    abs_path: Path,
+    f: BinaryIO,
+    offset: int,
+    layout: Optional[tuple[str, bytes, int, int]],
+    encoding: str,
+) -> int:
+    """1-indexed number of the line containing a byte offset."""
+    if offset == 0:
+        return 1
+    if layout is not None and layout[2] == 1 and is_index_compatible(encoding):
+        index = file_metadata_cache.line_index(abs_path, f)
+        if not index.has_bare_cr:
+            return index.line_number_at(f, offset)
+    # Multi-byte newlines or "\r" line ends: decode everything before the offset
+    codec, _, _, text_start = layout or (encoding, b"\n", 1, 0)
+    f.seek(text_start)
+    return _decode_lines(f.read(max(0, offset - text_start)), codec).count("\n") + 1
+
+
+def _get_read_pool() -> ThreadPoolExecutor:
+    """Return the shared read_files thread pool, creating it on first use."""
+    global _read_pool
+    with _read_pool_lock:
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(
+                max_workers=read_workers, thread_name_prefix="read_files"
+            )
+        return _read_pool
+
+
+def _ordered_reads(
+    func: Callable[[str], T], file_paths: list[str]
+) -> Generator[T, None, None]:
+    """Apply func to each path on the shared read pool, yielding in input order.
+
+    At most read_workers calls of one batch are in flight, so a large batch
+    cannot monopolize the pool. Closing the generator cancels calls not yet
+    started.
+    """
+    pool = _get_read_pool()
+    queued = iter(file_paths)
+    in_flight: deque[Future] = deque()
+
+    def submit_next() -> None:
+        file_path = next(queued, None)
+        if file_path is not None:
+            in_flight.append(pool.submit(func, file_path))
+
+    for _ in range(read_workers):
+        submit_next()
+    try:
+        while in_flight:
+            result = in_flight.popleft().result()
+            submit_next()
+            yield result
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def _error_entry(file_path: str, e: Exception) -> dict:
+    """Build the read_files entry for a file that could not be read."""
+    error_code = "UNKNOWN_ERROR"
+    if "FILE_NOT_FOUND" in str(e):
+        error_code = "FILE_NOT_FOUND"
+    elif "BINARY_FILE_ERROR" in str(e):
+        error_code = "BINARY_FILE_ERROR"
+    elif "PATH_SECURITY_ERROR" in str(e):
+        error_code = "PATH_SECURITY_ERROR"
+    elif "PERMISSION_DENIED" in str(e):
+        error_code = "PERMISSION_DENIED"
+    elif "BATCH_LIMIT_EXCEEDED" in str(e):
+        error_code = "BATCH_LIMIT_EXCEEDED"
+
+    return {
+        "file_path": file_path,
+        "error": {"code": error_code, "message": str(e)},
+    }
+
+
+def _read_batch_entry(
+    file_path: str, max_bytes: int, max_lines: Optional[int]
+) -> tuple[dict, int]:
+    """Read one file of a batch; errors become entries instead of exceptions."""
+    try:
+        return _read_entire_file(file_path, max_bytes, max_lines)
+    except Exception as e:
+        return _error_entry(file_path, e), 0
+
+
+def read_files(
+    file_paths: list[str],
+    max_bytes: Optional[int] = None,
+    max_lines: Optional[int] = None,
+) -> dict:
     """Batch read multiple files.
 
+    Files are read on a thread pool shared by all callers. Each call keeps at
+    most read_workers reads in flight, so a large batch cannot monopolize the
+    pool, and results are collected in input order.
+
+    The whole batch shares one byte budget. Files are charged in input order;
+    the file that exhausts the budget is truncated like read_entire_file, and
+    files after it, or beyond the per-call file limit, are not read and are
+    reported with error code BATCH_LIMIT_EXCEEDED.
+
     Args:
         file_paths: List of file paths relative to project root
+        max_bytes: Byte budget for the whole batch (default and upper bound:
+            the per-call batch limit)
+        max_lines: Maximum lines returned per file (default: unlimited)
 
     Returns:
         dict with keys: files (list), success_count (int), error_count (int)
     """
     if not validator:
         raise RuntimeError("Configuration not loaded")
+    if max_bytes is not None and max_bytes < 1:
+        raise ValueError(f"max_bytes must be >= 1: {max_bytes}")
+    if max_lines is not None and max_lines < 1:
+        raise ValueError(f"max_lines must be >= 1: {max_lines}")
 
     logger.info(f"read_files: {len(file_paths)} files")
 
-    results = []
-    success_count = 0
-    error_count = 0
-
-    for file_path in file_paths:
-        try:
-            # Try to read the file
-            file_result = read_entire_file(file_path)
-            results.append(file_result)
-            success_count += 1
-        except Exception as e:
-            # Record error
-            error_code = "UNKNOWN_ERROR"
-            if "FILE_NOT_FOUND" in str(e):
-                error_code = "FILE_NOT_FOUND"
-            elif "BINARY_FILE_ERROR" in str(e):
-                error_code = "BINARY_FILE_ERROR"
-            elif "PATH_SECURITY_ERROR" in str(e):
-                error_code = "PATH_SECURITY_ERROR"
-            elif "PERMISSION_DENIED" in str(e):
-                error_code = "PERMISSION_DENIED"
-
-            results.append(
-                {
-                    "file_path": file_path,
-                    "error": {"code": error_code, "message": str(e)},
-                }
-            )
-            error_count += 1
+    budget = (
+        read_batch_max_bytes
+        if max_bytes is None
+        else min(max_bytes, read_batch_max_bytes)
+    )
+    results: list[dict] = []
+    remaining = budget
+    limit_message = ""
+    reads = _ordered_reads(
+        lambda path: _read_batch_entry(path, budget, max_lines),
+        file_paths[:read_batch_max_files],
+    )
+    for entry, size in reads:
+        if size > remaining:
+            # Re-read this one file within what is left of the budget
+            entry, size = _read_batch_entry(entry["file_path"], remaining, max_lines)
+            remaining = 0
+        else:
+            remaining -= size
+        results.append(entry)
+        if remaining == 0:
+            limit_message = f"batch byte budget of {budget} exhausted"
+            break
+    # Reads still queued for this call are abandoned
+    reads.close()
+
+    for file_path in file_paths[len(results) :]:
+        message = limit_message or f"batch file limit of {read_batch_max_files} reached"
+        results.append(
+            _error_entry(file_path, ValueError(f"BATCH_LIMIT_EXCEEDED: {message}"))
+        )
 
+    error_count = sum(1 for entry in results if "error" in entry)
     return {
         "files": results,
-        "success_count": success_count,
+        "success_count": len(results) - error_count,
         "error_count": error_count,
     }
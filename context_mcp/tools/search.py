@@ -1,19 +1,43 @@
-"""Search tools: search_in_file, search_in_files, find_files_by_name, find_recently_modified_files.
+"""Search tools: search_in_file, search_in_files, find_files_by_name, fuzzy_find_files,
+find_recently_modified_files, find_changed_files.
 
 Provides content search and file finding capabilities.
 """
 
+import base64
+import fnmatch
+import hashlib
+import heapq
+import json
+import math
+import os
 import re
 import subprocess
 import shutil
+import threading
 import time
 import platform
-from pathlib import Path
+from operator import itemgetter
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, Optional
 from context_mcp.config import config
 from context_mcp.validators.path_validator import PathValidator
-from context_mcp.utils.file_detector import assert_text_file
+from context_mcp.utils.file_catalog import FileCatalog
+from context_mcp.utils.file_detector import BINARY_SNIFF_SIZE, BinaryFileError
+from context_mcp.utils.file_metadata import file_metadata_cache
+from context_mcp.utils.fuzzy import FuzzyQuery, top_matches
+from context_mcp.utils.git_changes import change_detector_for
+from context_mcp.utils.git_index import TrackedFiles, tracked_files_for
 from context_mcp.utils.logger import logger
+from context_mcp.utils.pattern_cache import compile_pattern
+from context_mcp.utils.search_engine import (
+    ParallelSearchEngine,
+    open_buffer,
+    search_buffer,
+)
 from context_mcp.utils.tool_detector import ToolDetector
+from context_mcp.utils.trigram_index import TrigramIndex, ensure_index_in_background
+from context_mcp.utils.walker import rel_dir_prefix, walk_files
 
 
 # Initialize path validator
@@ -26,52 +50,809 @@ else:
 # Initialize tool detector
 _tool_detector = ToolDetector()
 
+# Initialize trigram index handle (built by the server at startup)
+search_index: TrigramIndex | None
+if config and config.search_index:
+    search_index = TrigramIndex(config.root_path, config.cache_dir)
+else:
+    search_index = None
+
+# Initialize git index reader (None outside a git work tree)
+tracked_files: TrackedFiles | None
+if config and config.git_index:
+    tracked_files = tracked_files_for(config.root_path, config.git_untracked == "include")
+else:
+    tracked_files = None
+
+# Initialize resident path catalog (built by the server at startup)
+file_catalog: FileCatalog | None
+if config and config.file_catalog:
+    file_catalog = FileCatalog(config.root_path, tracked=tracked_files)
+else:
+    file_catalog = None
+
+# Initialize pure-Python search engine (worker pool started on first use)
+search_engine = ParallelSearchEngine(config.search_workers if config else 0)
+
+# Default page size for search_in_files
+DEFAULT_MAX_RESULTS = 500
+
+
+# ============================================================================
+# Pagination
+# ============================================================================
+
+
+def _path_key(rel_path: str) -> tuple[str, ...]:
+    """Sort key ordering paths component by component, like `rg --sort path`."""
+    return tuple(rel_path.split("/"))
+
+
+def _search_fingerprint(*params: object) -> str:
+    """Identify a search so cursors cannot be replayed against another one."""
+    raw = json.dumps(list(params))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(fingerprint: str, file_rel: str, line_number: int) -> str:
+    """Encode the position of the last returned match as an opaque token."""
+    payload = json.dumps({"v": 1, "q": fingerprint, "f": file_rel, "l": line_number})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> tuple[str, int]:
+    """Decode a continuation token into (file_path, line_number).
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another search
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        file_rel = str(payload["f"])
+        line_number = int(payload["l"])
+        token_fingerprint = payload["q"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"INVALID_CURSOR: {e}")
+    if token_fingerprint != fingerprint:
+        raise ValueError("INVALID_CURSOR: Cursor belongs to a different search")
+    return file_rel, line_number
+
+
+class _MatchPage:
+    """Collects one page of matches arriving in (path, line) order.
+
+    Matches at or before the resume position are skipped; the page reports
+    has_more as soon as one match beyond max_results arrives, which is the
+    signal for engines to stop reading. With with_context set, every match
+    carries context_before and context_after line lists. An engine that fed
+    matches out of order and could not finish sets resumable to False: the
+    last match is then no valid resume position.
+    """
+
+    def __init__(
+        self,
+        max_results: int,
+        exclude_query: str = "",
+        after: Optional[tuple[str, int]] = None,
+        with_context: bool = False,
+    ):
+        self.max_results = max_results
+        self.exclude_query = exclude_query
+        self.with_context = with_context
+        self.after_key = _path_key(after[0]) if after else None
+        self.after_line = after[1] if after else 0
+        self.matches: list[dict] = []
+        self.has_more = False
+        self.resumable = True
+
+    @property
+    def full(self) -> bool:
+        """Whether the page is complete and engines should stop."""
+        return self.has_more
+
+    def clear(self) -> None:
+        """Drop collected matches so the page can be filled again."""
+        self.matches = []
+        self.has_more = False
+
+    def sort(self) -> None:
+        """Put matches fed in arbitrary file order into (path, line) order."""
+        self.matches.sort(key=lambda m: (_path_key(m["file_path"]), m["line_number"]))
+
+    def skip_file(self, file_rel: str) -> bool:
+        """Whether a file lies entirely before the resume position."""
+        return self.after_key is not None and _path_key(file_rel) < self.after_key
+
+    def add(
+        self,
+        file_rel: str,
+        line_number: int,
+        line_content: str,
+        match_start: Optional[int] = None,
+        match_end: Optional[int] = None,
+        context_before: Optional[list[str]] = None,
+        context_after: Optional[list[str]] = None,
+    ) -> bool:
+        """Offer a match to the page.
+
+        Returns:
+            False once the page is complete, True otherwise
+        """
+        if self.after_key is not None:
+            key = _path_key(file_rel)
+            if key < self.after_key or (
+                key == self.after_key and line_number <= self.after_line
+            ):
+                return True
+        if self.exclude_query and self.exclude_query in line_content:
+            return True
+        if len(self.matches) >= self.max_results:
+            self.has_more = True
+            return False
+        match = {
+            "file_path": file_rel,
+            "line_number": line_number,
+            "line_content": line_content,
+            "match_start": match_start,
+            "match_end": match_end,
+        }
+        if self.with_context:
+            match["context_before"] = context_before or []
+            match["context_after"] = context_after or []
+        self.matches.append(match)
+        return True
+
+
+# ============================================================================
+# File enumeration and process helpers
+# ============================================================================
+
+
+def _matches_file_pattern(rel_path: str, file_pattern: str) -> bool:
+    """Check a root-relative path against a file name glob."""
+    if file_pattern == "*":
+        return True
+    if "/" in file_pattern:
+        return PurePosixPath(rel_path).match(file_pattern)
+    return fnmatch.fnmatch(rel_path.rsplit("/", 1)[-1], file_pattern)
+
+
+def _tracked_for(root_path: Path) -> Optional[TrackedFiles]:
+    """Git index reader for a project root, if it is the configured one."""
+    if tracked_files is not None and tracked_files.root == root_path:
+        return tracked_files
+    return None
+
+
+def _to_rel(path_str: str, root_str: str) -> Optional[str]:
+    """Convert an absolute path string under root into a POSIX relative path."""
+    if not path_str.startswith(root_str):
+        return None
+    rel = path_str[len(root_str) :].lstrip("/\\")
+    return rel.replace("\\", "/") if rel else None
+
+
+def _max_command_bytes() -> int:
+    """Byte budget for file arguments on one command line."""
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        arg_max = 32768  # Windows CreateProcess command line limit
+    env_size = sum(len(k) + len(v) + 2 for k, v in os.environ.items())
+    return max(4096, min((arg_max - env_size) // 2, 1024 * 1024))
+
+
+def _batched(paths: Iterable[str], base_cost: int) -> Iterator[list[str]]:
+    """Group paths into batches whose command line fits the ARG_MAX budget.
+
+    Args:
+        paths: File path arguments
+        base_cost: Bytes already used by the fixed part of the command
+
+    Yields:
+        Lists of paths
+    """
+    budget = _max_command_bytes() - base_cost
+    batch: list[str] = []
+    used = 0
+    for path in paths:
+        cost = len(os.fsencode(path)) + 1 + 8  # NUL terminator and argv pointer
+        if batch and used + cost > budget:
+            yield batch
+            batch, used = [], 0
+        batch.append(path)
+        used += cost
+    if batch:
+        yield batch
+
+
+class _StreamingProcess:
+    """Child process whose stdout is consumed line by line.
+
+    The child is killed when the deadline passes or when the context exits
+    early (e.g. because the result page is full), so large searches never
+    buffer their whole output.
+    """
+
+    def __init__(self, cmd: list[str], deadline: float, cwd: Optional[str] = None):
+        self.timed_out = False
+        self.proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            cwd=cwd,
+        )
+        self._timer = threading.Timer(max(deadline - time.time(), 0), self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self) -> None:
+        self.timed_out = True
+        self.proc.kill()
+
+    def __enter__(self) -> "_StreamingProcess":
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            yield line.rstrip("\r\n")
+
+    def __exit__(self, *exc) -> None:
+        self._timer.cancel()
+        if self.proc.poll() is None:
+            self.proc.kill()
+        if self.proc.stdout is not None:
+            self.proc.stdout.close()
+        self.proc.wait()
+
+
+# ============================================================================
+# Search engines
+# ============================================================================
+
+
+def _rg_data(data: dict) -> bytes:
+    """Raw bytes of a ripgrep JSON `{"text": ...}` / `{"bytes": ...}` field."""
+    if "text" in data:
+        return data["text"].encode("utf-8")
+    return base64.b64decode(data.get("bytes", ""))
+
+
+def _rg_match(event: dict) -> Optional[tuple[int, str, Optional[int], Optional[int]]]:
+    """Convert a ripgrep JSON match or context event into (line, content, start, end).
+
+    Context events have no submatches and yield None offsets. Submatch offsets are byte offsets into the line; they are converted to
+    character offsets into the decoded, newline-stripped line content.
+    """
+    data = event["data"]
+    line_number = data.get("line_number")
+    if line_number is None:
+        return None
+    raw = _rg_data(data["lines"]).rstrip(b"\r\n")
+    line_content = raw.decode("utf-8", errors="replace")
+    submatches = data.get("submatches") or []
+    if not submatches:
+        return line_number, line_content, None, None
+    first = submatches[0]
+    if line_content.isascii():
+        start, end = first["start"], first["end"]
+    else:
+        start = len(raw[: first["start"]].decode("utf-8", errors="replace"))
+        end = start + len(raw[first["start"] : first["end"]].decode("utf-8", errors="replace"))
+    end = min(end, len(line_content))
+    return line_number, line_content, min(start, end), end
+
+
+# Engine output records: (file_path, line_number, line_content, match_start, match_end,
+# context_before, context_after)
+_Record = tuple[str, int, str, Optional[int], Optional[int], list[str], list[str]]
+
+# Engine output lines: (is_match, file_path, line_number, line_content, match_start,
+# match_end); lines that are not matches are context
+_Event = tuple[bool, str, int, str, Optional[int], Optional[int]]
+
+# grep line prefix: "NUM:" for matches, "NUM-" for context lines
+_GREP_LINE = re.compile(r"(\d+)([:-])", re.ASCII)
+
+
+def _feed_page(records: Iterable[_Record], root_str: str, page: _MatchPage) -> None:
+    """Add parsed engine records to page until it is full.
+
+    Consecutive records of one file share a path string, so the path is
+    converted to root-relative form once per file rather than per match.
+    """
+    current_file: Optional[str] = None
+    current_rel: Optional[str] = None
+    for file_str, line_num, line_content, start, end, before, after in records:
+        if file_str != current_file:
+            current_file = file_str
+            if not os.path.isabs(file_str):
+                file_str = os.path.join(root_str, file_str)
+            current_rel = _to_rel(file_str, root_str)
+            if current_rel is None:
+                logger.info(f"Skip file outside root: {file_str}")
+        if current_rel is None:
+            continue
+        if not page.add(current_rel, line_num, line_content, start, end, before, after):
+            return
+
+
+def _context_records(events: Iterable[_Event], context_after: int) -> Iterator[_Record]:
+    """Attach the context lines of an engine's output to its matches.
+
+    ripgrep and grep print every line once, merging the context of nearby
+    matches. A context line within context_after lines of the previous match
+    in the same file is its after context; any other context line is before
+    context of the next match. Each match is held back until its after
+    context is complete.
+    """
+    pending: Optional[_Record] = None
+    pending_last = 0
+    before: list[tuple[str, int, str]] = []
+    for is_match, file_str, line_num, line_content, start, end in events:
+        if pending is not None and (
+            is_match or file_str != pending[0] or line_num > pending_last + context_after
+        ):
+            yield pending
+            pending = None
+        if not is_match:
+            if pending is not None:
+                pending[6].append(line_content)
+            else:
+                before.append((file_str, line_num, line_content))
+            continue
+        # Keep the run of context lines leading up to this match
+        context_before: list[str] = []
+        expected = line_num - 1
+        for ctx_file, ctx_line, ctx_content in reversed(before):
+            if ctx_file != file_str or ctx_line != expected:
+                break
+            context_before.append(ctx_content)
+            expected -= 1
+        context_before.reverse()
+        before = []
+        pending = (file_str, line_num, line_content, start, end, context_before, [])
+        # A multiline match ends on the last line it spans
+        pending_last = line_num + line_content.count("\n")
+    if pending is not None:
+        yield pending
+
+
+def _rg_events(lines: Iterable[str]) -> Iterator[_Event]:
+    """Parse a ripgrep --json event stream into match and context lines."""
+    file_str: Optional[str] = None
+    for line in lines:
+        try:
+            event = json.loads(line)
+            kind = event["type"]
+            if kind == "begin":
+                file_str = os.fsdecode(_rg_data(event["data"]["path"]))
+                continue
+            if kind not in ("match", "context") or file_str is None:
+                continue
+            parsed = _rg_match(event)
+        except (ValueError, KeyError, TypeError):
+            continue
+        if parsed is not None:
+            yield (kind == "match", file_str, *parsed)
+
+
+def _rg_records(lines: Iterable[str], context_after: int = 0) -> Iterator[_Record]:
+    """Parse a ripgrep --json event stream into match records."""
+    return _context_records(_rg_events(lines), context_after)
+
+
+def _grep_events(
+    lines: Iterable[str], query: str, use_regex: bool, ignore_case: bool = False
+) -> Iterator[_Event]:
+    """Parse `grep -n -H --null` output into match and context lines.
+
+    Matches print as `path\\0line:content`, context lines as
+    `path\\0line-content`; `--` group separators are skipped.
+    """
+    # grep reports no offsets; literal matches are located directly
+    folded = None
+    if ignore_case and not use_regex:
+        folded = compile_pattern(query, use_regex, ignore_case)
+    for line in lines:
+        file_str, sep, rest = line.partition("\0")
+        if not sep:
+            continue
+        prefix = _GREP_LINE.match(rest)
+        if prefix is None:
+            continue
+        line_num = int(prefix.group(1))
+        line_content = rest[prefix.end() :]
+        is_match = prefix.group(2) == ":"
+        start: Optional[int] = None
+        end: Optional[int] = None
+        if is_match and folded is not None:
+            located = folded.search(line_content)
+            if located is not None:
+                start, end = located.span()
+        elif is_match and not use_regex:
+            found = line_content.find(query)
+            if found >= 0:
+                start, end = found, found + len(query)
+        yield is_match, file_str, line_num, line_content, start, end
+
+
+def _grep_records(
+    lines: Iterable[str],
+    query: str,
+    use_regex: bool,
+    ignore_case: bool = False,
+    context_after: int = 0,
+) -> Iterator[_Record]:
+    """Parse `grep -n -H --null` output into match records."""
+    return _context_records(
+        _grep_events(lines, query, use_regex, ignore_case), context_after
+    )
+
+
+def _search_ripgrep(
+    rg_cmd: str,
+    query: str,
+    abs_path: Path,
+    root_path: Path,
+    file_pattern: str,
+    use_regex: bool,
+    page: _MatchPage,
+    deadline: float,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context: tuple[int, int] = (0, 0),
+) -> bool:
+    """Stream ripgrep JSON events into page in path order.
+
+    File paths arrive once per file in "begin" events and are converted to
+    root-relative form there, so matches need no per-line path handling.
+    `--sort path` makes ripgrep single-threaded, so a first page is searched
+    unsorted and sorted here; only when it fills up (and the cursor must be
+    an exact position) is it searched again in path order. If the unsorted
+    pass times out, its matches are returned sorted but page.resumable is
+    cleared. On resume, files before the cursor are skipped by enumerating
+    them with `rg --files` and searching only the remaining files, in
+    ARG_MAX-sized batches, instead of re-searching the whole tree. Context
+    lines come from ripgrep itself (-B/-A) in the same pass.
+
+    Returns:
+        True if the search timed out
+    """
+    context_before, context_after = context
+    cmd = [rg_cmd, "--json"]
+    # ripgrep defaults to regex mode, only add -F for literal search
+    if not use_regex:
+        cmd.append("--fixed-strings")
+    if ignore_case:
+        cmd.append("--ignore-case")
+    if multiline:
+        cmd.append("--multiline")
+    if context_before:
+        cmd.extend(["--before-context", str(context_before)])
+    if context_after:
+        cmd.extend(["--after-context", str(context_after)])
+    if file_pattern != "*":
+        cmd.extend(["--glob", file_pattern])
+    cmd.extend(["--regexp", query, "--"])
+
+    root_str = str(root_path)
+
+    sorted_cmd = cmd[:2] + ["--sort", "path"] + cmd[2:]
+
+    if page.after_key is None:
+        with _StreamingProcess(cmd + [str(abs_path)], deadline, cwd=root_str) as process:
+            _feed_page(_rg_records(process, context_after), root_str, page)
+        if not page.full or process.timed_out:
+            page.sort()
+            page.resumable = not process.timed_out
+            return process.timed_out
+
+        # Truncated: the page must be the first max_results matches in order
+        page.clear()
+        with _StreamingProcess(
+            sorted_cmd + [str(abs_path)], deadline, cwd=root_str
+        ) as process:
+            _feed_page(_rg_records(process, context_after), root_str, page)
+        return process.timed_out
+
+    # Resume: enumerate files in the same order and search only the rest
+    list_cmd = [rg_cmd, "--files", "--sort", "path"]
+    if file_pattern != "*":
+        list_cmd.extend(["--glob", file_pattern])
+    list_cmd.extend(["--", str(abs_path)])
+
+    with _StreamingProcess(list_cmd, deadline, cwd=root_str) as listing:
+        remaining = (
+            path
+            for path in listing
+            if path and not page.skip_file(_to_rel(path, root_str) or "")
+        )
+        base_cost = sum(len(os.fsencode(arg)) + 9 for arg in sorted_cmd)
+        for batch in _batched(remaining, base_cost):
+            with _StreamingProcess(sorted_cmd + batch, deadline, cwd=root_str) as process:
+                _feed_page(_rg_records(process, context_after), root_str, page)
+            if process.timed_out:
+                return True
+            if page.full:
+                break
+    return listing.timed_out
+
+
+def _search_grep(
+    query: str,
+    abs_path: Path,
+    root_path: Path,
+    file_pattern: str,
+    use_regex: bool,
+    page: _MatchPage,
+    deadline: float,
+    timeout: int,
+    ignore_case: bool = False,
+    context: tuple[int, int] = (0, 0),
+) -> Optional[bool]:
+    """Search with find + grep on Unix-like systems.
+
+    Files are enumerated once with find, sorted, and handed to grep in
+    ARG_MAX-sized batches, so the number of child processes grows with the
+    number of batches rather than the number of files. When find reports an
+    error (an unreadable directory, a file removed mid-walk) the files it did
+    print are still searched.
+
+    Returns:
+        True if the search timed out, or None if find failed without listing
+        any file, so the next engine should run
+    """
+    # First, find matching files
+    find_cmd = ["find", str(abs_path), "-type", "f"]
+    if file_pattern != "*":
+        find_cmd.extend(["-name", file_pattern])
+    find_cmd.append("-print0")
+
+    find_result = subprocess.run(
+        find_cmd,
+        capture_output=True,
+        text=True,
+        timeout=timeout // 2,  # Half timeout for find
+        encoding="utf-8",
+        errors="replace",
+    )
+    listed = [file_str for file_str in find_result.stdout.split("\0") if file_str]
+    if find_result.returncode != 0:
+        if not listed:
+            return None
+        logger.warning(f"find reported errors: {find_result.stderr.strip()[:200]}")
+
+    root_str = str(root_path)
+    files = []
+    for file_str in listed:
+        rel = _to_rel(file_str, root_str)
+        if rel is not None and not page.skip_file(rel):
+            files.append((_path_key(rel), file_str))
+    files.sort()
+
+    # -H/--null print "path\0" before each match; -I skips binary files
+    grep_cmd = ["grep", "-n", "-H", "-I", "--null"]
+    grep_cmd.append("-E" if use_regex else "-F")  # Extended regex or fixed string
+    if ignore_case:
+        grep_cmd.append("-i")
+    context_before, context_after = context
+    if context_before:
+        grep_cmd.extend(["-B", str(context_before)])
+    if context_after:
+        grep_cmd.extend(["-A", str(context_after)])
+    grep_cmd.extend(["-e", query, "--"])
+
+    base_cost = sum(len(os.fsencode(arg)) + 9 for arg in grep_cmd)
+    for batch in _batched((file_str for _, file_str in files), base_cost):
+        if time.time() > deadline:
+            return True
+        with _StreamingProcess(grep_cmd + batch, deadline, cwd=root_str) as process:
+            records = _grep_records(
+                process, query, use_regex, ignore_case, context_after
+            )
+            _feed_page(records, root_str, page)
+        if process.timed_out:
+            return True
+        if page.full:
+            break
+    return False
 
-def search_in_file(query: str, file_path: str, use_regex: bool = False) -> dict:
+
+def _search_python(
+    query: str,
+    files: Iterable[tuple[str, str]],
+    use_regex: bool,
+    page: _MatchPage,
+    deadline: float,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context: tuple[int, int] = (0, 0),
+) -> bool:
+    """Search (absolute, relative) file pairs in order with the Python engine.
+
+    Returns:
+        True if the search timed out
+    """
+    pending = ((file_abs, rel) for file_abs, rel in files if not page.skip_file(rel))
+    run = search_engine.search(
+        pending, query, use_regex, deadline, ignore_case, multiline, *context
+    )
+    results = iter(run)
+    try:
+        for rel, file_matches in results:
+            for match in file_matches:
+                if not page.add(rel, *match):
+                    return False
+    finally:
+        # Stops outstanding pool work when the page fills early
+        results.close()  # type: ignore[attr-defined]
+    return run.timed_out
+
+
+def _search_with_index(
+    query: str,
+    abs_path: Path,
+    file_pattern: str,
+    use_regex: bool,
+    page: _MatchPage,
+    deadline: float,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context: tuple[int, int] = (0, 0),
+) -> Optional[bool]:
+    """Search only the files the trigram index reports as candidates.
+
+    Args:
+        query: Search text or regex pattern
+        abs_path: Validated absolute search root
+        file_pattern: File name glob pattern
+        use_regex: Whether to treat query as regex
+        page: Page collecting the matches
+        deadline: Absolute time after which the search stops
+        ignore_case: Case-insensitive matching
+        multiline: Allow matches to span lines
+        context: Lines of context (before, after) each match
+
+    Returns:
+        Whether the search timed out, or None when the index is missing,
+        stale or cannot narrow this query.
+    """
+    if search_index is None:
+        return None
+
+    try:
+        abs_path.relative_to(search_index.root)
+    except ValueError:
+        return None
+
+    if search_index.is_building() or not search_index.is_fresh():
+        logger.info("Trigram index missing or stale, using full search")
+        ensure_index_in_background(search_index)
+        return None
+
+    candidates = search_index.candidates(query, use_regex, ignore_case)
+    if candidates is None:
+        return None
+
+    prefix = rel_dir_prefix(abs_path, search_index.root)
+    candidates.sort(key=_path_key)
+    files = (
+        (str(search_index.root / rel), rel)
+        for rel in candidates
+        if rel.startswith(prefix) and _matches_file_pattern(rel, file_pattern)
+    )
+    return _search_python(
+        query, files, use_regex, page, deadline, ignore_case, multiline, context
+    )
+
+
+# ============================================================================
+# Tools
+# ============================================================================
+
+
+def _validate_context(context_before: int, context_after: int) -> None:
+    """Reject negative context line counts.
+
+    Raises:
+        ValueError: If either count is negative
+    """
+    if context_before < 0:
+        raise ValueError(f"context_before must be >= 0: {context_before}")
+    if context_after < 0:
+        raise ValueError(f"context_after must be >= 0: {context_after}")
+
+
+def search_in_file(
+    query: str,
+    file_path: str,
+    use_regex: bool = False,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+) -> dict:
     """Search for text in a single file.
 
+    Context lines are read from the same mapped buffer as the matches. When
+    context is requested, each match also has context_before and
+    context_after lists; nearby matches share their context rather than
+    repeating it, so every line of the file appears at most once.
+
     Args:
         query: Search text or regex pattern
         file_path: File path relative to project root
         use_regex: Whether to treat query as regex
+        ignore_case: Case-insensitive matching
+        multiline: Allow matches to span lines
+        context_before: Lines of context before each match (>= 0)
+        context_after: Lines of context after each match (>= 0)
 
     Returns:
         dict with keys: matches (list), total_matches (int)
+
+    Raises:
+        ValueError: If query is an invalid regex or a context count is negative
     """
     if config is None or validator is None:
         raise RuntimeError("Configuration not loaded")
 
     logger.info(f"search_in_file: query={query}, file={file_path}, regex={use_regex}")
 
+    _validate_context(context_before, context_after)
+
+    # Validate and compile the pattern once, before touching the file
+    compile_pattern(query, use_regex, ignore_case, multiline)
+
     # Validate path
     abs_path = validator.validate(file_path)
 
     if not abs_path.exists():
         raise FileNotFoundError(f"FILE_NOT_FOUND: {file_path}")
 
-    # Check if binary
-    assert_text_file(abs_path)
-
-    # Read file and search
-    matches = []
+    # Map the file and search the raw buffer; only matched lines are decoded
     try:
-        with open(abs_path, "r", encoding="utf-8", errors="replace") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.rstrip("\n")
-                if use_regex:
-                    try:
-                        if re.search(query, line):
-                            matches.append(
-                                {"line_number": line_num, "line_content": line}
-                            )
-                    except re.error as e:
-                        raise ValueError(f"INVALID_REGEX: {str(e)}")
-                else:
-                    if query in line:
-                        matches.append({"line_number": line_num, "line_content": line})
+        with open_buffer(abs_path) as data:
+            st = abs_path.stat()
+            entry = file_metadata_cache.peek(abs_path, st)
+            if entry is None or entry.has_nul is None:
+                # Sniff for binary content in the mapping rather than a separate read
+                has_nul = b"\x00" in data[:BINARY_SNIFF_SIZE]
+                entry = file_metadata_cache.update(abs_path, st, has_nul=has_nul)
+            if entry.has_nul:
+                raise BinaryFileError(str(abs_path))
+            # Reuse a line-offset index left by read tools to number far-apart hits
+            line_index = entry.line_index
+            found = search_buffer(
+                data,
+                query,
+                use_regex,
+                ignore_case,
+                multiline,
+                line_index,
+                context_before,
+                context_after,
+            )
     except PermissionError:
         raise PermissionError(f"PERMISSION_DENIED: Cannot read {file_path}")
 
+    matches = []
+    for line_number, line_content, match_start, match_end, *context in found:
+        match = {
+            "line_number": line_number,
+            "line_content": line_content,
+            "match_start": match_start,
+            "match_end": match_end,
+        }
+        if context:
+            match["context_before"], match["context_after"] = context
+        matches.append(match)
+
     return {"matches": matches, "total_matches": len(matches)}
 
 
@@ -82,8 +863,30 @@ def search_in_files(
     use_regex: bool = False,
     exclude_query: str = "",
     timeout: int = 60,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    cursor: str = "",
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
 ) -> dict:
-    """Search for text across multiple files.
+    """Search for text across multiple files, one page at a time.
+
+    Matches are returned in (file path, line number) order. When more matches
+    exist than max_results, the search stops reading as soon as the page is
+    full and returns next_cursor; passing it back resumes after the last
+    returned match without re-searching files already covered.
+
+    A search that times out after its first match also returns next_cursor,
+    so it can be continued page by page. There is no cursor when it times out
+    before the first match, or while ripgrep was still producing an unordered
+    first page; timed_out is then set without next_cursor, and the search
+    has to be repeated with a larger timeout.
+
+    Context lines are produced by the search pass itself (ripgrep/grep -B/-A,
+    or the Python engine reading around each hit). When context is requested,
+    each match also has context_before and context_after lists, merged per
+    file as in search_in_file.
 
     Args:
         query: Search text or regex pattern
@@ -92,236 +895,148 @@ def search_in_files(
         use_regex: Whether to treat query as regex
         exclude_query: Exclude matches containing this pattern
         timeout: Timeout in seconds
+        max_results: Maximum matches per page (>= 1)
+        cursor: Continuation token from a previous page ("" for the first page)
+        ignore_case: Case-insensitive matching
+        multiline: Allow matches to span lines (grep is skipped in this mode)
+        context_before: Lines of context before each match (>= 0)
+        context_after: Lines of context after each match (>= 0)
 
     Returns:
-        dict with keys: matches (list), total_matches (int), timed_out (bool)
+        dict with keys: matches (list), total_matches (int), timed_out (bool),
+        index_used (bool), has_more (bool), next_cursor (str | None)
+
+    Raises:
+        ValueError: If query is an invalid regex, cursor is invalid or a
+            context count is negative
     """
     if config is None or validator is None:
         raise RuntimeError("Configuration not loaded")
 
     logger.info(f"search_in_files: query={query}, pattern={file_pattern}, path={path}")
 
+    if max_results < 1:
+        raise ValueError(f"max_results must be >= 1: {max_results}")
+    _validate_context(context_before, context_after)
+    context = (context_before, context_after)
+
+    # Validate and compile the pattern once, before any engine runs
+    compile_pattern(query, use_regex, ignore_case, multiline)
+
     # Validate path
     abs_path = validator.validate(path)
 
     if not abs_path.exists():
         raise FileNotFoundError(f"PATH_NOT_FOUND: {path}")
 
-    # Use ripgrep if available, otherwise grep
-    matches = []
-    timed_out = False
-    start_time = time.time()
+    fingerprint = _search_fingerprint(
+        query, file_pattern, path, use_regex, exclude_query, ignore_case, multiline
+    )
+    after = _decode_cursor(cursor, fingerprint) if cursor else None
+    page = _MatchPage(max_results, exclude_query, after, with_context=any(context))
 
-    try:
-        search_root_rel = abs_path.relative_to(config.root_path)
-    except ValueError:
-        search_root_rel = Path(".")
-    search_root_parts = tuple(
-        part for part in search_root_rel.parts if part not in (".",)
+    start_time = time.time()
+    deadline = start_time + timeout
+    root_path = config.root_path
+
+    # Narrow candidates with the trigram index when it is present and fresh
+    timed_out = _search_with_index(
+        query,
+        abs_path,
+        file_pattern,
+        use_regex,
+        page,
+        deadline,
+        ignore_case,
+        multiline,
+        context,
     )
+    index_used = timed_out is not None
+    searched = index_used
 
     # Try to use rg (ripgrep) first
     rg_cmd = shutil.which("rg")
-    if rg_cmd:
-        cmd = [rg_cmd, "--line-number", "--no-heading"]
-        # ripgrep defaults to regex mode, only add -F for literal search
-        if not use_regex:
-            cmd.append("--fixed-strings")
-
-        if file_pattern != "*":
-            cmd.extend(["--glob", file_pattern])
-
-        cmd.append(query)
-        cmd.append(str(abs_path))
-
+    if not searched and rg_cmd:
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=str(config.root_path),
-                encoding="utf-8",
-                errors="replace",
+            timed_out = _search_ripgrep(
+                rg_cmd,
+                query,
+                abs_path,
+                root_path,
+                file_pattern,
+                use_regex,
+                page,
+                deadline,
+                ignore_case,
+                multiline,
+                context,
             )
-
-            for line in result.stdout.splitlines():
-                if not line.strip():
-                    continue
-                if exclude_query and exclude_query in line:
-                    continue
-
-                # Handle Windows paths with drive letters (e.g., C:\path:123:content)
-                # Split only at the first two colons after the path
-                # For Windows: "C:\path\file.txt:123:content" or ".\path\file.txt:123:content"
-                # For Unix: "/path/file.txt:123:content"
-
-                # Find the first colon that's not part of a drive letter
-                colon_positions = []
-                for i, char in enumerate(line):
-                    if char == ":":
-                        # Skip if it's a drive letter (position 1)
-                        if i == 1 and len(line) > 2 and line[i + 1] in ("\\", "/"):
-                            continue
-                        colon_positions.append(i)
-
-                if len(colon_positions) < 2:
-                    continue
-
-                file_str = line[: colon_positions[0]]
-                line_num_str = line[colon_positions[0] + 1 : colon_positions[1]]
-                line_content = line[colon_positions[1] + 1 :]
-
-                try:
-                    file_path = Path(file_str)
-                    # ripgrep with cwd=root_path returns paths relative to root_path
-                    if not file_path.is_absolute():
-                        file_path = (config.root_path / file_path).resolve()
-                    else:
-                        file_path = file_path.resolve()
-
-                    file_rel = file_path.relative_to(config.root_path)
-
-                    matches.append(
-                        {
-                            "file_path": str(file_rel).replace("\\", "/"),
-                            "line_number": int(line_num_str),
-                            "line_content": line_content,
-                        }
-                    )
-                except (ValueError, IndexError) as e:
-                    # Skip malformed lines or paths outside root
-                    logger.info(f"Skip line due to {type(e).__name__}: {line[:100]}")
-                    continue
-
-        except subprocess.TimeoutExpired:
-            timed_out = True
-    # Try grep as fallback if ripgrep not available
-    elif shutil.which("grep") and platform.system() != "Windows":
-        # Use grep + find combination for Unix-like systems
+            searched = True
+        except OSError as e:
+            logger.warning(f"ripgrep failed, falling back: {e}")
+
+    # Try grep as fallback if ripgrep not available (grep cannot match across lines)
+    if (
+        not searched
+        and not multiline
+        and shutil.which("grep")
+        and platform.system() != "Windows"
+    ):
         try:
-            # First, find matching files
-            if file_pattern != "*":
-                find_cmd = ["find", str(abs_path), "-type", "f", "-name", file_pattern]
-            else:
-                find_cmd = ["find", str(abs_path), "-type", "f"]
-
-            find_result = subprocess.run(
-                find_cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout // 2,  # Half timeout for find
-                encoding="utf-8",
-                errors="replace",
+            timed_out = _search_grep(
+                query,
+                abs_path,
+                root_path,
+                file_pattern,
+                use_regex,
+                page,
+                deadline,
+                timeout,
+                ignore_case,
+                context,
             )
-
-            if find_result.returncode == 0:
-                files_to_search = find_result.stdout.strip().split("\n")
-                remaining_timeout = timeout - (timeout // 2)
-
-                for file_str in files_to_search:
-                    if time.time() - start_time > timeout:
-                        timed_out = True
-                        break
-
-                    if not file_str.strip():
-                        continue
-
-                    # Build grep command
-                    grep_cmd = ["grep", "-n"]  # -n for line numbers
-                    if use_regex:
-                        grep_cmd.append("-E")  # Extended regex
-                    else:
-                        grep_cmd.append("-F")  # Fixed string
-
-                    grep_cmd.extend([query, file_str])
-
-                    try:
-                        grep_result = subprocess.run(
-                            grep_cmd,
-                            capture_output=True,
-                            text=True,
-                            timeout=min(5, remaining_timeout),
-                            encoding="utf-8",
-                            errors="replace",
-                        )
-
-                        # grep returns 0 if matches found, 1 if no matches, >1 for errors
-                        if grep_result.returncode in (0, 1):
-                            for line in grep_result.stdout.splitlines():
-                                if not line.strip():
-                                    continue
-                                if exclude_query and exclude_query in line:
-                                    continue
-
-                                # Parse grep output: "line_number:line_content"
-                                parts = line.split(":", 1)
-                                if len(parts) == 2:
-                                    try:
-                                        line_num = int(parts[0])
-                                        line_content = parts[1]
-
-                                        file_path = Path(file_str)
-                                        file_rel = file_path.relative_to(
-                                            config.root_path
-                                        )
-
-                                        matches.append(
-                                            {
-                                                "file_path": str(file_rel).replace(
-                                                    "\\", "/"
-                                                ),
-                                                "line_number": line_num,
-                                                "line_content": line_content,
-                                            }
-                                        )
-                                    except (ValueError, IndexError):
-                                        continue
-
-                    except (subprocess.TimeoutExpired, FileNotFoundError):
-                        continue
-
+            searched = timed_out is not None
         except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
             # If grep fails, fall back to Python
             pass
-    # Final fallback: manual Python search
-    if not matches and not timed_out:
-        # Fallback: manual search
-        for file in abs_path.rglob(file_pattern):
-            if time.time() - start_time > timeout:
-                timed_out = True
-                break
 
-            if file.is_file():
-                try:
-                    file_result = search_in_file(
-                        query, str(file.relative_to(config.root_path)), use_regex
-                    )
-                    for match in file_result["matches"]:
-                        if exclude_query and exclude_query in match["line_content"]:
-                            continue
-                        matches.append(
-                            {
-                                "file_path": str(
-                                    file.relative_to(config.root_path)
-                                ).replace("\\", "/"),
-                                "line_number": match["line_number"],
-                                "line_content": match["line_content"],
-                            }
-                        )
-                except Exception:
-                    continue
+    # Final fallback: manual Python search
+    if not searched:
+        files = (
+            (entry.path, rel)
+            for entry, rel in walk_files(
+                root_path, abs_path, sort=True, tracked=_tracked_for(root_path)
+            )
+            if _matches_file_pattern(rel, file_pattern)
+        )
+        timed_out = _search_python(
+            query, files, use_regex, page, deadline, ignore_case, multiline, context
+        )
+
+    matches = page.matches
+    has_more = page.has_more or (bool(timed_out) and bool(matches))
+    next_cursor = None
+    if has_more and matches and page.resumable:
+        last = matches[-1]
+        next_cursor = _encode_cursor(fingerprint, last["file_path"], last["line_number"])
 
     return {
         "matches": matches,
         "total_matches": len(matches),
-        "timed_out": timed_out,
+        "timed_out": bool(timed_out),
+        "index_used": index_used,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
 
 
 def find_files_by_name(name_pattern: str, path: str = ".") -> dict:
     """Find files by name pattern (glob).
 
+    Answered from the resident file catalog when it is built and current;
+    otherwise fd, find and a Python walk are tried in turn (and a catalog
+    rebuild is started in the background).
+
     Args:
         name_pattern: File name pattern with wildcards (* and ?)
         path: Starting directory
@@ -340,7 +1055,21 @@ def find_files_by_name(name_pattern: str, path: str = ".") -> dict:
     if not abs_path.exists():
         raise FileNotFoundError(f"PATH_NOT_FOUND: {path}")
 
+    # Answer from memory when the catalog is built and current
+    if file_catalog is not None and file_catalog.root == config.root_path:
+        found = file_catalog.glob(name_pattern, rel_dir_prefix(abs_path, config.root_path))
+        if found is not None:
+            return {"files": found, "total_found": len(found)}
+
     files = []
+    tracked = _tracked_for(config.root_path)
+
+    # Listing tracked files only: the index is the cheapest source
+    if tracked is not None and not tracked.include_untracked:
+        for _, rel in walk_files(config.root_path, abs_path, tracked=tracked):
+            if _matches_file_pattern(rel, name_pattern):
+                files.append(rel)
+        return {"files": files, "total_found": len(files)}
 
     # Try fd first if available
     if _tool_detector.has_fd:
@@ -410,32 +1139,175 @@ def find_files_by_name(name_pattern: str, path: str = ".") -> dict:
             # Fall through to Python fallback
             pass
 
-    # Final fallback: Python rglob
-    for file in abs_path.rglob(name_pattern):
-        if file.is_file():
-            files.append(str(file.relative_to(config.root_path)).replace("\\", "/"))
+    # Final fallback: walk the tree, skipping ignored paths like fd does
+    for _, rel in walk_files(config.root_path, abs_path, tracked=tracked):
+        if _matches_file_pattern(rel, name_pattern):
+            files.append(rel)
 
     return {"files": files, "total_found": len(files)}
 
 
+def fuzzy_find_files(query: str, path: str = ".", max_results: int = 20) -> dict:
+    """Find files whose paths fuzzily match a query, best first.
+
+    Each whitespace-separated term of the query must appear in the path as a
+    subsequence (case-insensitive unless the term has an uppercase letter);
+    matches are ranked fzf-style, favoring word boundaries, consecutive runs
+    and the basename. Served from the resident file catalog when it is ready,
+    otherwise from a walk honoring the same ignore rules.
+
+    Args:
+        query: Whitespace-separated terms, e.g. "user service test"
+        path: Starting directory
+        max_results: Maximum number of matches to return
+
+    Returns:
+        dict with keys: matches (list[dict] with path and score),
+        total_matched (int)
+
+    Raises:
+        ValueError: If the query has no terms or max_results < 1
+    """
+    if config is None or validator is None:
+        raise RuntimeError("Configuration not loaded")
+
+    logger.info(f"fuzzy_find_files: query={query}, path={path}")
+
+    if max_results < 1:
+        raise ValueError(f"max_results must be >= 1: {max_results}")
+    fuzzy_query = FuzzyQuery(query)
+
+    abs_path = validator.validate(path)
+    if not abs_path.exists():
+        raise FileNotFoundError(f"PATH_NOT_FOUND: {path}")
+
+    found = None
+    if file_catalog is not None and file_catalog.root == config.root_path:
+        found = file_catalog.fuzzy(
+            fuzzy_query, max_results, rel_dir_prefix(abs_path, config.root_path)
+        )
+    if found is None:
+        paths = (
+            rel
+            for _, rel in walk_files(
+                config.root_path, abs_path, sort=True, tracked=_tracked_for(config.root_path)
+            )
+        )
+        found = top_matches(fuzzy_query, paths, max_results)
+
+    best, total = found
+    return {
+        "matches": [{"path": rel, "score": score} for rel, score in best],
+        "total_matched": total,
+    }
+
+
+def _newest(
+    items: Iterable[tuple[str, float]], max_results: Optional[int]
+) -> tuple[list[tuple[str, float]], int]:
+    """Most recently modified (path, mtime) pairs, newest first, and their count.
+
+    With max_results set only that many items are kept, in a bounded heap.
+    """
+    count = 0
+
+    def counted() -> Iterator[tuple[str, float]]:
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    if max_results is None:
+        newest = sorted(counted(), key=itemgetter(1), reverse=True)
+    else:
+        newest = heapq.nlargest(max_results, counted(), key=itemgetter(1))
+    return newest, count
+
+
+def _fd_recent(
+    root: Path, abs_path: Path, cutoff_time: float, file_pattern: str
+) -> Optional[list[tuple[str, float]]]:
+    """Files changed since cutoff_time according to fd, or None if fd failed.
+
+    fd cannot print modification times, so each reported file is stat()ed
+    once, by absolute path (no per-component resolve()). Paths are reported
+    relative to root.
+    """
+    seconds = max(1, math.ceil(time.time() - cutoff_time))
+    cmd = [
+        "fd",
+        "--type", "f",
+        "--absolute-path",
+        "--changed-within", f"{seconds}s",
+        "--glob", file_pattern,
+        str(abs_path),
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=60,
+            cwd=str(root),
+            encoding="utf-8",
+            errors="replace",
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+
+    root_str = str(root)
+    items = []
+    for line in result.stdout.splitlines():
+        file_rel = _to_rel(line.strip(), root_str)
+        if not file_rel:
+            continue
+        try:
+            mtime = os.stat(os.path.join(root_str, file_rel)).st_mtime
+        except OSError:
+            continue
+        if mtime >= cutoff_time:
+            items.append((file_rel, mtime))
+    return items
+
+
 def find_recently_modified_files(
-    hours_ago: int, path: str = ".", file_pattern: str = "*"
+    hours_ago: float,
+    path: str = ".",
+    file_pattern: str = "*",
+    max_results: Optional[int] = None,
 ) -> dict:
-    """Find files modified within the last N hours.
+    """Find files modified within the last N hours, most recent first.
+
+    Answered from the file catalog's mtime index (a range query) while a
+    watcher keeps it current; otherwise fd or a Python walk is used. With
+    max_results, only the newest files are kept, in a bounded heap.
 
     Args:
-        hours_ago: Number of hours to look back
+        hours_ago: Number of hours to look back; fractions give minute
+            granularity (0.25 = 15 minutes)
         path: Starting directory
         file_pattern: File name pattern
+        max_results: Maximum files to return (None for all)
 
     Returns:
-        dict with keys: files (list[dict]), total_found (int)
+        dict with keys: files (list[dict] with path and mtime), total_found
+        (int, all matching files), truncated (bool)
+
+    Raises:
+        ValueError: If hours_ago is not positive or max_results < 1
     """
     if config is None or validator is None:
         raise RuntimeError("Configuration not loaded")
 
     logger.info(f"find_recently_modified_files: hours_ago={hours_ago}, path={path}")
 
+    if hours_ago <= 0:
+        raise ValueError(f"hours_ago must be positive: {hours_ago}")
+    if max_results is not None and max_results < 1:
+        raise ValueError(f"max_results must be >= 1: {max_results}")
+
     # Validate path
     abs_path = validator.validate(path)
 
@@ -443,82 +1315,101 @@ def find_recently_modified_files(
         raise FileNotFoundError(f"PATH_NOT_FOUND: {path}")
 
     # Calculate cutoff time
-    cutoff_time = time.time() - (hours_ago * 3600)
+    cutoff_time = time.time() - hours_ago * 3600
+
+    found = None
+    if file_catalog is not None and file_catalog.root == config.root_path:
+        found = file_catalog.modified_since(
+            cutoff_time,
+            rel_dir_prefix(abs_path, config.root_path),
+            file_pattern,
+            max_results,
+        )
+
+    # Try fd next (respects .gitignore automatically), unless only tracked
+    # files are listed
+    tracked = _tracked_for(config.root_path)
+    if found is None and _tool_detector.has_fd and (tracked is None or tracked.include_untracked):
+        items = _fd_recent(config.root_path, abs_path, cutoff_time, file_pattern)
+        if items is not None:
+            found = _newest(items, max_results)
+
+    # Python fallback: walk the tree, skipping ignored paths like fd does
+    if found is None:
+
+        def walk_recent() -> Iterator[tuple[str, float]]:
+            for entry, rel in walk_files(config.root_path, abs_path, tracked=tracked):
+                if not _matches_file_pattern(rel, file_pattern):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime >= cutoff_time:
+                    yield rel, mtime
 
-    files = []
+        found = _newest(walk_recent(), max_results)
 
-    # Try fd first (respects .gitignore automatically)
-    if _tool_detector.has_fd:
-        try:
-            cmd = [
-                "fd",
-                "--type", "f",
-                "--changed-within", f"{hours_ago}h",
-                "--glob", file_pattern,
-                str(abs_path)
-            ]
+    newest, total = found
+    return {
+        "files": [{"path": rel, "mtime": mtime} for rel, mtime in newest],
+        "total_found": total,
+        "truncated": total > len(newest),
+    }
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60,
-                cwd=str(config.root_path),
-                encoding="utf-8",
-                errors="replace",
-            )
 
-            if result.returncode == 0:
-                for line in result.stdout.splitlines():
-                    if not line.strip():
-                        continue
+def find_changed_files(ref: str, path: str = ".", include_untracked: bool = False) -> dict:
+    """Find files that differ between the working tree and a git revision.
 
-                    try:
-                        file_path = Path(line.strip())
-                        if not file_path.is_absolute():
-                            file_path = (abs_path / file_path).resolve()
+    The revision's tree, the index and the working tree are read straight
+    from .git (loose objects and packfiles). Files whose stat data still
+    matches the index are not read at all; only files touched since they
+    were staged are hashed.
 
-                        file_rel = file_path.relative_to(config.root_path)
-                        mtime = file_path.stat().st_mtime
-
-                        files.append(
-                            {
-                                "path": str(file_rel).replace("\\", "/"),
-                                "mtime": mtime,
-                            }
-                        )
-                    except (ValueError, OSError):
-                        continue
+    Args:
+        ref: Revision to compare against: branch, tag, remote branch, object
+            name (4+ hex digits), HEAD, optionally with ~N / ^N suffixes
+        path: Starting directory
+        include_untracked: Also report untracked files that are not ignored
 
-                # Sort by modification time (most recent first)
-                from typing import cast
-                files.sort(key=lambda f: cast(float, f["mtime"]), reverse=True)
-                return {"files": files, "total_found": len(files)}
+    Returns:
+        dict with keys: ref (str), commit (str, resolved object name), files
+        (list[dict] with path and change: added, modified, deleted or
+        untracked), total_found (int)
 
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            # Fall through to Python fallback
-            pass
+    Raises:
+        ValueError: If the project is not in a git work tree
+            (NOT_A_GIT_REPOSITORY) or ref does not name a commit (INVALID_REF)
+    """
+    if config is None or validator is None:
+        raise RuntimeError("Configuration not loaded")
 
-    for file in abs_path.rglob(file_pattern):
-        if file.is_file():
-            try:
-                # Get path relative to root for exclusion check
-                file_rel = file.relative_to(config.root_path)
+    logger.info(f"find_changed_files: ref={ref}, path={path}")
 
-                mtime = file.stat().st_mtime
-                if mtime >= cutoff_time:
-                    files.append(
-                        {
-                            "path": str(file_rel).replace("\\", "/"),
-                            "mtime": mtime,
-                        }
-                    )
-            except (OSError, PermissionError, ValueError):
-                continue
+    # Validate path
+    abs_path = validator.validate(path)
 
-    # Sort by modification time (most recent first)
-    from typing import cast
+    if not abs_path.exists():
+        raise FileNotFoundError(f"PATH_NOT_FOUND: {path}")
 
-    files.sort(key=lambda f: cast(float, f["mtime"]), reverse=True)
+    tracked = _tracked_for(config.root_path) or tracked_files_for(config.root_path)
+    if tracked is None:
+        raise ValueError(f"NOT_A_GIT_REPOSITORY: {config.root_path} is not in a git work tree")
 
-    return {"files": files, "total_found": len(files)}
+    prefix = rel_dir_prefix(abs_path, config.root_path)
+    commit, changes = change_detector_for(tracked).changes(ref, prefix)
+    files = [{"path": rel, "change": change} for rel, change in changes]
+
+    if include_untracked:
+        index = tracked.entries()
+        untracked = [
+            {"path": rel, "change": "untracked"}
+            for _, rel in walk_files(
+                config.root_path, abs_path, sort=True, hidden=True
+            )
+            if rel not in index
+        ]
+        if untracked:
+            files = sorted(files + untracked, key=itemgetter("path"))
+
+    return {"ref": ref, "commit": commit, "files": files, "total_found": len(files)}
@@ -0,0 +1,20 @@
+"""Status tools: get_server_metrics.
+
+Reports health counters of background subsystems (watcher, caches, indexes).
+"""
+
+import time
+from context_mcp.utils.logger import logger
+from context_mcp.utils.metrics import collect_metrics
+
+
+def get_server_metrics() -> dict:
+    """Return health metrics from all registered subsystems.
+
+    Returns:
+        dict with keys: metrics (dict of provider name to counters),
+        generated_at (float, epoch seconds)
+    """
+    logger.info("get_server_metrics")
+
+    return {"metrics": collect_metrics(), "generated_at": time.time()}
@@ -0,0 +1,481 @@
+"""Resident catalog of project file paths.
+
+find_files_by_name used to spawn fd or find and walk the whole tree on every
+call. FileCatalog walks the tree once (with the shared walker, so ignore
+files are honored) and keeps a sorted list of root-relative paths plus
+basename and extension side-indexes. Glob queries are then answered from
+memory: exact names and `*.ext`-style patterns go straight to a side-index,
+path prefixes restrict scans to a bisected slice of the sorted list.
+
+Fuzzy queries use a CharIndex (per-character bitsets) built from the catalog
+on first use and updated alongside it. Modification times are recorded at
+build time and kept in an mtime-ordered list, so "modified since" queries are
+a bisect plus a scan of the matching tail instead of a tree walk.
+
+The catalog stays current by applying watcher change events; without a
+running watcher it is considered stale after rescan_interval seconds and is
+rebuilt in the background while callers use their cold fallback. In a git
+work tree the catalog is built from the index (see TrackedFiles), and a
+rewritten index (after `git add`, checkout, ...) marks it stale as well.
+"""
+
+import bisect
+import fnmatch
+import os
+import re
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Callable, Optional
+
+from context_mcp.utils.fuzzy import CharIndex, FuzzyQuery
+from context_mcp.utils.gitignore import IGNORE_FILES, IgnoreMatcher
+from context_mcp.utils.logger import logger
+from context_mcp.utils.walker import is_hidden, walk_files
+
+if TYPE_CHECKING:  # pragma: no cover - type checking helper
+    from context_mcp.utils.git_index import TrackedFiles
+    from context_mcp.utils.watcher import ChangeEvent, FileWatcher
+
+# Seconds a catalog without a running watcher is trusted after a build
+DEFAULT_RESCAN_INTERVAL = 30.0
+
+# Changes tracked beside a fuzzy index before it is rebuilt: this many, or
+# 1% of the catalog if more
+FUZZY_REBUILD_THRESHOLD = 1024
+
+# Glob metacharacters
+_MAGIC = re.compile(r"[*?\[\]]")
+
+
+def _basename(rel_path: str) -> str:
+    return rel_path.rsplit("/", 1)[-1]
+
+
+def _extension(name: str) -> str:
+    """Text after the last dot of a basename ("" without a dot)."""
+    dot = name.rfind(".")
+    return name[dot + 1 :] if dot >= 0 else ""
+
+
+def _path_matcher(pattern: str) -> Callable[[str], bool]:
+    """Predicate for a glob as find_files_by_name applies it.
+
+    Patterns without "/" match basenames; patterns with "/" match trailing
+    path components (PurePosixPath.match).
+    """
+    if pattern == "*":
+        return lambda rel: True
+    if "/" in pattern:
+        return lambda rel: PurePosixPath(rel).match(pattern)
+    regex = re.compile(fnmatch.translate(pattern))
+    return lambda rel: regex.match(_basename(rel)) is not None
+
+
+def _add_to(index: dict[str, list[str]], key: str, rel_path: str) -> None:
+    index.setdefault(key, []).append(rel_path)
+
+
+def _remove_from(index: dict[str, list[str]], key: str, rel_path: str) -> None:
+    paths = index.get(key)
+    if paths is None:
+        return
+    try:
+        paths.remove(rel_path)
+    except ValueError:
+        return
+    if not paths:
+        del index[key]
+
+
+class FileCatalog:
+    """In-memory, sorted catalog of the files under a project root."""
+
+    def __init__(
+        self,
+        root_path: Path,
+        rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+        tracked: Optional["TrackedFiles"] = None,
+    ):
+        """Initialize an empty catalog (call build() or build_in_background()).
+
+        Args:
+            root_path: Absolute project root
+            rescan_interval: Seconds a build is trusted without a running watcher
+            tracked: Tracked files, if root_path is in a git work tree
+        """
+        self.root = Path(root_path).resolve()
+        self.rescan_interval = rescan_interval
+        self.tracked = tracked
+        self._index_stamp: Optional[tuple[int, int, int]] = None
+        self._matcher = IgnoreMatcher(self.root)
+        self._lock = threading.RLock()
+        self._paths: list[str] = []
+        self._by_name: dict[str, list[str]] = {}
+        self._by_ext: dict[str, list[str]] = {}
+        self._fuzzy: Optional[CharIndex] = None
+        self._mtimes: dict[str, float] = {}
+        self._by_mtime: list[tuple[float, str]] = []
+        self._built_at: Optional[float] = None
+        self._stale = False
+        self._building = False
+        self._pending: list["ChangeEvent"] = []
+        self._watcher: Optional["FileWatcher"] = None
+        self.builds = 0
+        self.queries = 0
+        self.fallbacks = 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self) -> int:
+        """Walk the tree and replace the catalog contents.
+
+        Events arriving during the walk are applied once it finishes.
+
+        Returns:
+            Number of cataloged files
+        """
+        with self._lock:
+            self._building = True
+        try:
+            started = time.time()
+            index_stamp = self.tracked.stamp() if self.tracked is not None else None
+            mtimes: dict[str, float] = {}
+            for entry, rel in walk_files(self.root, tracked=self.tracked):
+                try:
+                    mtimes[rel] = entry.stat().st_mtime
+                except OSError:
+                    continue  # Removed while walking
+            paths = sorted(mtimes)
+            by_name: dict[str, list[str]] = {}
+            by_ext: dict[str, list[str]] = {}
+            for rel in paths:
+                name = _basename(rel)
+                _add_to(by_name, name, rel)
+                _add_to(by_ext, _extension(name), rel)
+            by_mtime = sorted((mtime, rel) for rel, mtime in mtimes.items())
+        except BaseException:
+            with self._lock:
+                self._building = False
+            raise
+
+        with self._lock:
+            self._paths, self._by_name, self._by_ext = paths, by_name, by_ext
+            self._mtimes, self._by_mtime = mtimes, by_mtime
+            self._fuzzy = None
+            self._built_at = started
+            self._index_stamp = index_stamp
+            self._stale = False
+            self._building = False
+            self.builds += 1
+            pending, self._pending = self._pending, []
+            if pending:
+                self._apply(pending)
+        logger.info(
+            f"File catalog built: {len(paths)} files in {time.time() - started:.2f}s"
+        )
+        return len(paths)
+
+    def build_in_background(self) -> bool:
+        """Start a build thread unless one is running.
+
+        Returns:
+            True if a build was started
+        """
+        with self._lock:
+            if self._building:
+                return False
+            self._building = True
+
+        def run() -> None:
+            try:
+                self.build()
+            except Exception as e:
+                logger.warning(f"File catalog build failed: {e}")
+
+        threading.Thread(target=run, name="file-catalog", daemon=True).start()
+        return True
+
+    def is_building(self) -> bool:
+        """Whether a build is in progress."""
+        return self._building
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    def attach(self, watcher: "FileWatcher") -> None:
+        """Keep the catalog current from a watcher's change events.
+
+        Args:
+            watcher: Running file watcher for the same root
+        """
+        self._watcher = watcher
+        watcher.subscribe(self.apply_changes)
+
+    def is_live(self) -> bool:
+        """Whether a running watcher keeps the catalog current."""
+        return self._watcher is not None and self._watcher.running
+
+    def is_ready(self) -> bool:
+        """Whether queries can be answered from memory."""
+        if self._built_at is None or self._stale:
+            return False
+        if self.tracked is not None and self.tracked.stamp() != self._index_stamp:
+            self._stale = True  # Files were staged or checked out
+            return False
+        return self.is_live() or time.time() - self._built_at < self.rescan_interval
+
+    def apply_changes(self, events: list["ChangeEvent"]) -> None:
+        """Add and remove the paths touched by a batch of watcher events.
+
+        Args:
+            events: Coalesced change events from the watcher
+        """
+        with self._lock:
+            if self._building:
+                self._pending.extend(events)
+                return
+            if self._built_at is None:
+                return
+            self._apply(events)
+
+    def _apply(self, events: list["ChangeEvent"]) -> None:
+        """Apply events; the caller holds the lock."""
+        for event in events:
+            if event.kind == "rescan" or _basename(event.path) in IGNORE_FILES:
+                # Lost events or changed ignore rules: only a rebuild is correct
+                self._stale = True
+                return
+            if event.kind == "deleted":
+                if event.is_dir:
+                    self._remove_tree(event.path)
+                else:
+                    self._remove(event.path)
+            elif not event.is_dir:
+                # Created or modified: (re)record the current mtime
+                if event.path not in self._mtimes and self._excluded(event.path):
+                    continue
+                try:
+                    mtime = os.stat(self.root / event.path).st_mtime
+                except OSError:
+                    self._remove(event.path)
+                    continue
+                self._add(event.path, mtime)
+
+    def _excluded(self, rel_path: str) -> bool:
+        """Whether a new file stays out of the catalog (as the walker decides)."""
+        if is_hidden(rel_path):
+            return True
+        if self.tracked is not None:
+            if self.tracked.is_tracked(rel_path):
+                return False
+            if not self.tracked.include_untracked:
+                return True
+        return self._matcher.is_ignored(rel_path)
+
+    def _set_mtime(self, rel_path: str, mtime: Optional[float]) -> None:
+        """Move a path within the mtime order (None removes it)."""
+        old = self._mtimes.pop(rel_path, None)
+        if old is not None:
+            at = bisect.bisect_left(self._by_mtime, (old, rel_path))
+            if at < len(self._by_mtime) and self._by_mtime[at] == (old, rel_path):
+                del self._by_mtime[at]
+        if mtime is not None:
+            self._mtimes[rel_path] = mtime
+            bisect.insort(self._by_mtime, (mtime, rel_path))
+
+    def _add(self, rel_path: str, mtime: float) -> None:
+        self._set_mtime(rel_path, mtime)
+        at = bisect.bisect_left(self._paths, rel_path)
+        if at < len(self._paths) and self._paths[at] == rel_path:
+            return
+        self._paths.insert(at, rel_path)
+        name = _basename(rel_path)
+        _add_to(self._by_name, name, rel_path)
+        _add_to(self._by_ext, _extension(name), rel_path)
+        if self._fuzzy is not None:
+            self._fuzzy.add(rel_path)
+            self._check_fuzzy()
+
+    def _remove(self, rel_path: str) -> None:
+        at = bisect.bisect_left(self._paths, rel_path)
+        if at >= len(self._paths) or self._paths[at] != rel_path:
+            return
+        del self._paths[at]
+        self._set_mtime(rel_path, None)
+        name = _basename(rel_path)
+        _remove_from(self._by_name, name, rel_path)
+        _remove_from(self._by_ext, _extension(name), rel_path)
+        if self._fuzzy is not None:
+            self._fuzzy.discard(rel_path)
+            self._check_fuzzy()
+
+    def _remove_tree(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        lo, hi = self._prefix_range(prefix)
+        if lo == hi:
+            return
+        for rel_path in self._paths[lo:hi]:
+            del self._mtimes[rel_path]
+            name = _basename(rel_path)
+            _remove_from(self._by_name, name, rel_path)
+            _remove_from(self._by_ext, _extension(name), rel_path)
+            if self._fuzzy is not None:
+                self._fuzzy.discard(rel_path)
+        del self._paths[lo:hi]
+        self._by_mtime = [
+            item for item in self._by_mtime if not item[1].startswith(prefix)
+        ]
+        self._check_fuzzy()
+
+    def _check_fuzzy(self) -> None:
+        """Drop the fuzzy index once too many changes are tracked beside it."""
+        limit = max(FUZZY_REBUILD_THRESHOLD, len(self._paths) // 100)
+        if self._fuzzy is not None and self._fuzzy.pending() > limit:
+            self._fuzzy = None
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        """Slice of the sorted paths starting with prefix."""
+        if not prefix:
+            return 0, len(self._paths)
+        lo = bisect.bisect_left(self._paths, prefix)
+        # Every path with the prefix sorts before prefix + the highest code point
+        hi = bisect.bisect_left(self._paths, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidates(self, pattern: str) -> Optional[list[str]]:
+        """Paths a basename glob can match, from a side-index, or None to scan all."""
+        if not _MAGIC.search(pattern):
+            return self._by_name.get(pattern, [])
+        # The text after the last metacharacter is a literal suffix of every match
+        suffix = _MAGIC.split(pattern)[-1]
+        if "." in suffix:
+            return self._by_ext.get(_extension(suffix), [])
+        return None
+
+    def _usable(self) -> bool:
+        """Count a query; when not ready, start a rebuild and count a fallback."""
+        if not self.is_ready():
+            self.fallbacks += 1
+            if not self._building:
+                self.build_in_background()
+            return False
+        self.queries += 1
+        return True
+
+    def glob(self, pattern: str, prefix: str = "") -> Optional[list[str]]:
+        """Find cataloged files matching a glob, as find_files_by_name does.
+
+        Patterns without "/" match basenames; patterns with "/" match trailing
+        path components (PurePosixPath.match).
+
+        Args:
+            pattern: Glob pattern (*, ?, [...])
+            prefix: Root-relative directory prefix ("" or "dir/") to search under
+
+        Returns:
+            Sorted root-relative paths, or None if the catalog is not ready (a
+            rebuild is started; the caller should use its fallback)
+        """
+        if not self._usable():
+            return None
+
+        matches = _path_matcher(pattern)
+        with self._lock:
+            candidates = None if "/" in pattern else self._candidates(pattern)
+            if candidates is None:
+                lo, hi = self._prefix_range(prefix)
+                return [rel for rel in self._paths[lo:hi] if matches(rel)]
+            found = [
+                rel for rel in candidates if rel.startswith(prefix) and matches(rel)
+            ]
+        found.sort()
+        return found
+
+    def fuzzy(
+        self, query: FuzzyQuery, limit: int, prefix: str = ""
+    ) -> Optional[tuple[list[tuple[str, int]], int]]:
+        """Best fuzzy matches among cataloged files.
+
+        The first call after a build indexes the catalog (see CharIndex).
+
+        Args:
+            query: Compiled fuzzy query
+            limit: Maximum number of results
+            prefix: Root-relative directory prefix ("" or "dir/") to search under
+
+        Returns:
+            ([(path, score)] best first, number of matching paths), or None if
+            the catalog is not ready (a rebuild is started; the caller should
+            use its fallback)
+        """
+        if not self._usable():
+            return None
+        with self._lock:
+            if self._fuzzy is None:
+                self._fuzzy = CharIndex(list(self._paths))
+            return self._fuzzy.search(query, limit, prefix)
+
+    def modified_since(
+        self,
+        cutoff: float,
+        prefix: str = "",
+        pattern: str = "*",
+        limit: Optional[int] = None,
+    ) -> Optional[tuple[list[tuple[str, float]], int]]:
+        """Cataloged files modified at or after a time, most recent first.
+
+        Only answered while a running watcher keeps mtimes current; a catalog
+        trusted for rescan_interval would miss exactly the newest changes.
+
+        Args:
+            cutoff: Earliest modification time (seconds since the epoch)
+            prefix: Root-relative directory prefix ("" or "dir/") to search under
+            pattern: File name glob, as for glob()
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            ([(path, mtime)] newest first, number of matching files), or None
+            if the catalog cannot answer (the caller should use its fallback)
+        """
+        if not self.is_live():
+            self.fallbacks += 1
+            return None
+        if not self._usable():
+            return None
+        matches = _path_matcher(pattern)
+        found: list[tuple[str, float]] = []
+        total = 0
+        with self._lock:
+            start = bisect.bisect_left(self._by_mtime, (cutoff, ""))
+            for mtime, rel in reversed(self._by_mtime[start:]):
+                if rel.startswith(prefix) and matches(rel):
+                    total += 1
+                    if limit is None or len(found) < limit:
+                        found.append((rel, mtime))
+        return found, total
+
+    def stats(self) -> dict:
+        """Catalog counters for server metrics.
+
+        Returns:
+            dict with keys: files, built_at, building, live, ready, builds,
+            queries, fallbacks
+        """
+        return {
+            "files": len(self._paths),
+            "built_at": self._built_at,
+            "building": self._building,
+            "live": self.is_live(),
+            "ready": self.is_ready(),
+            "builds": self.builds,
+            "queries": self.queries,
+            "fallbacks": self.fallbacks,
+        }
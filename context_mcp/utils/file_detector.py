@@ -2,9 +2,36 @@
 
 Reads first 1024 bytes of a file to check for NULL bytes (\x00),
 which are common in binary files but rare in text files.
+
+preflight_file combines binary detection, BOM sniffing and encoding detection
+in a single read of a file prefix, which callers reuse as the start of the
+content read. Results are kept in the shared file metadata cache.
 """
 
+import codecs
+import os
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import chardet
+
+from context_mcp.utils.file_metadata import file_metadata_cache
+
+# Bytes inspected for NULL when deciding whether a file is binary
+BINARY_SNIFF_SIZE = 1024
+
+# Bytes read by preflight_file (the chardet sample size)
+PREFLIGHT_SIZE = 10000
+
+# Byte-order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
 
 
 class BinaryFileError(Exception):
@@ -15,7 +42,7 @@ class BinaryFileError(Exception):
         super().__init__(f"BINARY_FILE_ERROR: Cannot read binary file '{file_path}'")
 
 
-def is_binary_file(file_path: Path, chunk_size: int = 1024) -> bool:
+def is_binary_file(file_path: Path, chunk_size: int = BINARY_SNIFF_SIZE) -> bool:
     """Detect if a file is binary by checking for NULL bytes.
 
     Args:
@@ -30,9 +57,18 @@ def is_binary_file(file_path: Path, chunk_size: int = 1024) -> bool:
     """
     try:
         with open(file_path, "rb") as f:
+            cacheable = chunk_size == BINARY_SNIFF_SIZE
+            if cacheable:
+                st = os.fstat(f.fileno())
+                entry = file_metadata_cache.peek(file_path, st)
+                if entry is not None and entry.has_nul is not None:
+                    return entry.has_nul
             chunk = f.read(chunk_size)
             # Check for NULL byte
-            return b"\x00" in chunk
+            has_nul = b"\x00" in chunk
+            if cacheable:
+                file_metadata_cache.update(file_path, st, has_nul=has_nul)
+            return has_nul
     except (IOError, OSError):
         # If we can't read the file, assume it's not binary
         # The actual file operation will fail with a proper error
@@ -50,3 +86,142 @@ def assert_text_file(file_path: Path) -> None:
     """
     if is_binary_file(file_path):
         raise BinaryFileError(str(file_path))
+
+
+@dataclass(frozen=True)
+class FilePreflight:
+    """Everything derived from one read of a file prefix.
+
+    Attributes:
+        prefix: First bytes of the file (reuse as the start of the content)
+        is_binary: Whether the file looks binary (NULL bytes and no UTF-16/32 BOM)
+        bom_encoding: Codec implied by a byte-order mark, if any
+        encoding: Detected encoding
+        utf8_valid: Whether the prefix is valid UTF-8 (a sequence cut off at
+            the end of the prefix is allowed)
+        detection: How the encoding was chosen: bom, ascii, utf-8, chardet,
+            fixed, or binary
+    """
+
+    prefix: bytes
+    is_binary: bool
+    bom_encoding: Optional[str]
+    encoding: str
+    utf8_valid: bool
+    detection: str
+
+
+def detect_bom(prefix: bytes) -> Optional[str]:
+    """Return the codec implied by a byte-order mark at the start of prefix."""
+    for bom, codec in _BOMS:
+        if prefix.startswith(bom):
+            return codec
+    return None
+
+
+def is_utf8_prefix(prefix: bytes) -> bool:
+    """Check that prefix is strict UTF-8, allowing a truncated final sequence."""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def preflight_file(
+    f: BinaryIO,
+    sample_size: int = PREFLIGHT_SIZE,
+    mode: str = "fast",
+    default_encoding: str = "utf-8",
+) -> FilePreflight:
+    """Inspect a file from a single read of its prefix.
+
+    A byte-order mark always determines the encoding. Otherwise the fast mode
+    accepts a prefix that is pure ASCII or strict UTF-8 as UTF-8 and only
+    runs chardet (pure Python, and slow) when validation fails; accurate
+    always runs chardet; fixed uses default_encoding without inspection.
+
+    Args:
+        f: File opened in binary mode, positioned at the start
+        sample_size: Number of bytes to read
+        mode: Encoding detection mode: fast, accurate, or fixed
+        default_encoding: Encoding used in fixed mode and when chardet gives up
+
+    Returns:
+        FilePreflight; f is left positioned right after the prefix
+    """
+    prefix = f.read(sample_size)
+    bom_encoding = detect_bom(prefix)
+    # UTF-16/32 text is full of NULL bytes; a BOM marks it as text
+    is_binary = b"\x00" in prefix[:BINARY_SNIFF_SIZE] and bom_encoding not in (
+        "utf-16",
+        "utf-32",
+    )
+    is_ascii = bom_encoding is None and prefix.isascii()
+    utf8_valid = is_ascii or (
+        bom_encoding in (None, "utf-8-sig") and is_utf8_prefix(prefix)
+    )
+
+    if bom_encoding is not None:
+        encoding, detection = bom_encoding, "bom"
+    elif is_binary:
+        encoding, detection = default_encoding, "binary"
+    elif mode == "fixed":
+        encoding, detection = default_encoding, "fixed"
+    elif mode == "fast" and is_ascii:
+        # Report UTF-8: the rest of the file may hold non-ASCII characters
+        encoding, detection = "utf-8", "ascii"
+    elif mode == "fast" and utf8_valid:
+        encoding, detection = "utf-8", "utf-8"
+    else:
+        encoding = chardet.detect(prefix)["encoding"] or default_encoding
+        detection = "chardet"
+
+    return FilePreflight(
+        prefix=prefix,
+        is_binary=is_binary,
+        bom_encoding=bom_encoding,
+        encoding=encoding,
+        utf8_valid=utf8_valid,
+        detection=detection,
+    )
+
+
+def cached_preflight(
+    path: Union[str, Path],
+    f: BinaryIO,
+    mode: str = "fast",
+    default_encoding: str = "utf-8",
+) -> FilePreflight:
+    """Preflight an open file, reusing a cached result for the same file version.
+
+    On a cache hit nothing is read: the returned preflight has an empty prefix
+    and f stays at offset 0, so prefix + f.read() is still the whole content.
+
+    Args:
+        path: Absolute path of the file (cache key)
+        f: File opened in binary mode, positioned at the start
+        mode: Encoding detection mode: fast, accurate, or fixed
+        default_encoding: Encoding used in fixed mode and when chardet gives up
+
+    Returns:
+        FilePreflight; f is left positioned right after the prefix
+    """
+    st = os.fstat(f.fileno())
+    entry = file_metadata_cache.peek(path, st)
+    if (
+        entry is not None
+        and entry.preflight is not None
+        and entry.preflight_mode == (mode, default_encoding)
+    ):
+        return entry.preflight
+
+    result = preflight_file(f, mode=mode, default_encoding=default_encoding)
+    file_metadata_cache.update(
+        path,
+        st,
+        has_nul=b"\x00" in result.prefix[:BINARY_SNIFF_SIZE],
+        preflight=replace(result, prefix=b""),
+        preflight_mode=(mode, default_encoding),
+    )
+    return result
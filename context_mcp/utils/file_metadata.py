@@ -0,0 +1,207 @@
+"""Shared cache of per-file metadata.
+
+Binary status, detected encoding and line-offset indexes are derived from a
+file's contents and stay valid until the file changes. FileMetadataCache keeps
+them per path, keyed by (device, inode, size, mtime_ns) so a single stat()
+tells whether an entry still describes the file. Entries are evicted in LRU
+order once their estimated memory use exceeds a byte budget; hit and miss
+counters are reported through the server metrics registry.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Optional, Union
+
+from context_mcp.utils.line_index import LineIndex
+from context_mcp.utils.metrics import register_metrics_provider
+
+if TYPE_CHECKING:  # pragma: no cover - type checking helper
+    from context_mcp.utils.file_detector import FilePreflight
+
+# (st_dev, st_ino, st_size, st_mtime_ns)
+FileKey = tuple[int, int, int, int]
+
+# Memory budget for all entries
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Upper bound on entries regardless of their size
+DEFAULT_MAX_ENTRIES = 4096
+
+# Estimated fixed cost of one entry (key, dataclass, dict slot, strings)
+_ENTRY_OVERHEAD = 512
+
+
+def file_key(st: os.stat_result) -> FileKey:
+    """Identity of one version of a file, from its stat result."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class FileMetadata:
+    """Cached facts about one version of a file; None means not computed.
+
+    Attributes:
+        key: File version the facts describe
+        has_nul: Whether the first BINARY_SNIFF_SIZE bytes contain a NULL byte
+        preflight: Preflight result without its prefix bytes
+        preflight_mode: Encoding detection mode the preflight was computed with
+        line_index: Line-offset index
+    """
+
+    key: FileKey
+    has_nul: Optional[bool] = None
+    preflight: Optional["FilePreflight"] = None
+    preflight_mode: Optional[tuple[str, str]] = None
+    line_index: Optional[LineIndex] = None
+
+    def memory_size(self) -> int:
+        """Estimated bytes held by this entry."""
+        size = _ENTRY_OVERHEAD
+        if self.line_index is not None:
+            counts = self.line_index.block_counts
+            size += len(counts) * counts.itemsize
+        return size
+
+
+class FileMetadataCache:
+    """Thread-safe, memory-bounded LRU of FileMetadata keyed by absolute path."""
+
+    def __init__(
+        self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Estimated memory budget for all entries
+            max_entries: Maximum number of entries
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, FileMetadata] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def peek(
+        self, path: Union[str, Path], st: os.stat_result
+    ) -> Optional[FileMetadata]:
+        """Return the entry for a path if it still describes the file.
+
+        Args:
+            path: Absolute path of the file
+            st: Current stat result of the file
+
+        Returns:
+            FileMetadata, or None if absent or stale (stale entries are dropped)
+        """
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.key != file_key(st):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def update(
+        self, path: Union[str, Path], st: os.stat_result, **fields
+    ) -> FileMetadata:
+        """Merge computed facts into the entry for a file version.
+
+        Args:
+            path: Absolute path of the file
+            st: Stat result the facts were computed for
+            **fields: FileMetadata fields to set
+
+        Returns:
+            The stored entry
+        """
+        key = str(path)
+        version = file_key(st)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._drop(key)
+            if entry is None or entry.key != version:
+                entry = FileMetadata(key=version)
+            entry = replace(entry, **fields)
+            self._entries[key] = entry
+            self._bytes += entry.memory_size()
+            while self._entries and (
+                self._bytes > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                self._drop(oldest)
+                self.evictions += 1
+            return entry
+
+    def line_index(self, path: Union[str, Path], f: BinaryIO) -> LineIndex:
+        """Return the line-offset index for an open file, building it on a miss.
+
+        Args:
+            path: Absolute path of the file (cache key)
+            f: The file opened in binary mode
+
+        Returns:
+            LineIndex valid for the file's current version
+        """
+        st = os.fstat(f.fileno())
+        entry = self.peek(path, st)
+        if entry is not None and entry.line_index is not None:
+            return entry.line_index
+        index = LineIndex.build(f, st)
+        self.update(path, st, line_index=index)
+        return index
+
+    def _drop(self, key: str) -> None:
+        """Remove an entry; the caller holds the lock."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.memory_size()
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """Drop the entry for a path."""
+        with self._lock:
+            if str(path) in self._entries:
+                self._drop(str(path))
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Cache counters for server metrics.
+
+        Returns:
+            dict with keys: entries, bytes, max_bytes, hits, misses, hit_rate, evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide cache shared by the read and search tools
+file_metadata_cache = FileMetadataCache()
+register_metrics_provider("file_metadata", file_metadata_cache.stats)
@@ -0,0 +1,278 @@
+"""Working-tree changes against a git revision, without the git binary.
+
+The comparison `git diff <rev> --name-status` makes is rebuilt from three
+sources read directly from .git: the revision's tree (see Repository), the
+index, and the files on disk. A file whose lstat() still matches the stat
+data cached in its index entry is taken to hold the staged object, so only
+files touched since they were last staged are read and hashed; entries
+written in the same instant as the index itself ("racily clean") are always
+hashed, as git does. Hashes computed here are remembered with the stat data
+they were computed for, so repeated calls do not re-read unchanged files;
+the most recently used DEFAULT_REMEMBERED_HASHES are kept.
+
+With core.filemode set to false in the repository config the executable bit
+on disk is ignored and regular files keep the mode staged in the index, as
+git does on file systems without reliable permissions.
+
+Content filters (core.autocrlf, clean filters such as git-lfs) are not
+applied: a stat-dirty file is hashed as stored on disk.
+"""
+
+import hashlib
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from context_mcp.utils.git_index import IndexEntry, TrackedFiles
+from context_mcp.utils.git_objects import Repository
+
+_NS = 1_000_000_000
+_MODE_SYMLINK = 0o120000
+_MODE_GITLINK = 0o160000
+_MODE_EXECUTABLE = 0o100755
+_MODE_REGULAR = 0o100644
+
+_HASH_CHUNK = 1024 * 1024
+
+DEFAULT_REMEMBERED_HASHES = 4096
+
+_SECTION = re.compile(r"^\s*\[\s*([^\]\s\"]+)")
+_FILEMODE = re.compile(r"^\s*filemode\s*=\s*(\S+)", re.IGNORECASE)
+
+# Stat fields a remembered hash is valid for
+_StatKey = tuple[int, int, int, int]
+
+
+def _stat_matches(entry: IndexEntry, st: os.stat_result) -> bool:
+    """Whether a file still has the stat data cached in its index entry."""
+    if entry.mtime_ns // _NS != st.st_mtime_ns // _NS:
+        return False
+    if entry.ctime_ns // _NS != st.st_ctime_ns // _NS:
+        return False
+    # Nanoseconds are compared only when git recorded them
+    if entry.mtime_ns % _NS and entry.mtime_ns % _NS != st.st_mtime_ns % _NS:
+        return False
+    if entry.ctime_ns % _NS and entry.ctime_ns % _NS != st.st_ctime_ns % _NS:
+        return False
+    if entry.size != st.st_size & 0xFFFFFFFF:
+        return False
+    return not entry.ino or entry.ino == st.st_ino & 0xFFFFFFFF
+
+
+def trust_filemode(common_dir: Path) -> bool:
+    """Whether a repository's config leaves core.filemode at its default (true).
+
+    Args:
+        common_dir: Repository directory holding the shared config
+
+    Returns:
+        False only if the config sets core.filemode to a false value
+    """
+    try:
+        text = (Path(common_dir) / "config").read_text(
+            encoding="utf-8", errors="replace"
+        )
+    except OSError:
+        return True
+    trusted = True
+    section = ""
+    for line in text.splitlines():
+        header = _SECTION.match(line)
+        if header:
+            section = header.group(1).lower()
+            continue
+        value = _FILEMODE.match(line)
+        if section == "core" and value:
+            trusted = value.group(1).strip('"').lower() not in (
+                "false",
+                "no",
+                "off",
+                "0",
+            )
+    return trusted
+
+
+def _worktree_mode(st: os.stat_result) -> int:
+    """Tree entry mode git would record for a file."""
+    if stat.S_ISLNK(st.st_mode):
+        return _MODE_SYMLINK
+    return _MODE_EXECUTABLE if st.st_mode & stat.S_IXUSR else _MODE_REGULAR
+
+
+class ChangeDetector:
+    """Compares the working tree of a git repository with revisions.
+
+    Attributes:
+        tracked: Index reader of the work tree
+        repository: Object database and refs
+        filemode: Whether the executable bit on disk is trusted
+            (core.filemode, read once)
+        hashed: Files read and hashed so far
+        stat_hits: Files taken as unchanged from their cached stat data
+    """
+
+    def __init__(
+        self, tracked: TrackedFiles, remembered_hashes: int = DEFAULT_REMEMBERED_HASHES
+    ):
+        """Initialize the detector.
+
+        Args:
+            tracked: Index reader for the project root
+            remembered_hashes: Most file hashes kept between calls
+        """
+        self.tracked = tracked
+        self.repository = Repository(tracked.git_dir, tracked.hash_size)
+        self.filemode = trust_filemode(self.repository.common_dir)
+        self.remembered_hashes = remembered_hashes
+        self._lock = threading.Lock()
+        self._hashes: OrderedDict[str, tuple[_StatKey, str]] = OrderedDict()
+        self.hashed = 0
+        self.stat_hits = 0
+
+    def _hash_file(self, path: str, mode: int) -> str:
+        """Blob name of a file's contents (a symlink's target for links)."""
+        digest = hashlib.sha256() if self.tracked.hash_size == 32 else hashlib.sha1()
+        if mode == _MODE_SYMLINK:
+            data = os.readlink(os.fsencode(path))
+            digest.update(b"blob %d\0" % len(data))
+            digest.update(data)
+        else:
+            with open(path, "rb") as f:
+                digest.update(b"blob %d\0" % os.fstat(f.fileno()).st_size)
+                while chunk := f.read(_HASH_CHUNK):
+                    digest.update(chunk)
+        self.hashed += 1
+        return digest.hexdigest()
+
+    def _worktree(
+        self, entry: IndexEntry, racy_ns: Optional[int]
+    ) -> Optional[tuple[int, str]]:
+        """(mode, blob name) of an index entry's file on disk, None if it is gone."""
+        if entry.skip_worktree or entry.mode == _MODE_GITLINK:
+            return entry.mode, entry.sha
+        path = os.path.join(self.tracked.work_tree, entry.path)
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        if stat.S_ISDIR(st.st_mode):
+            return None
+        mode = _worktree_mode(st)
+        if (
+            not self.filemode
+            and mode != _MODE_SYMLINK
+            and entry.mode
+            in (
+                _MODE_REGULAR,
+                _MODE_EXECUTABLE,
+            )
+        ):
+            mode = entry.mode
+        if (
+            not entry.intent_to_add
+            and _stat_matches(entry, st)
+            and (racy_ns is None or entry.mtime_ns < racy_ns)
+        ):
+            self.stat_hits += 1
+            self._hashes.pop(entry.path, None)  # Restaged since it was hashed
+            return mode, entry.sha
+        key = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+        known = self._hashes.get(entry.path)
+        if known is not None and known[0] == key:
+            self._hashes.move_to_end(entry.path)
+            return mode, known[1]
+        try:
+            sha = self._hash_file(path, mode)
+        except OSError:
+            return None
+        self._hashes[entry.path] = (key, sha)
+        self._hashes.move_to_end(entry.path)
+        if len(self._hashes) > self.remembered_hashes:
+            self._hashes.popitem(last=False)
+        return mode, sha
+
+    def changes(self, rev: str, prefix: str = "") -> tuple[str, list[tuple[str, str]]]:
+        """Files that differ between the working tree and a revision.
+
+        Staged and unstaged changes both count, as for `git diff <rev>`;
+        untracked files are not reported.
+
+        Args:
+            rev: Revision (see Repository.resolve)
+            prefix: Root-relative directory ("" or "dir/") to restrict to
+
+        Returns:
+            (resolved object name, [(root-relative path, change)] sorted by
+            path), where change is added, modified or deleted
+
+        Raises:
+            ValueError: If rev does not name a commit (INVALID_REF)
+            GitObjectError: If the revision's trees cannot be read
+        """
+        with self._lock:
+            name = self.repository.resolve(rev)
+            base = self.tracked.prefix + prefix
+            cut = len(self.tracked.prefix)
+            tree = self.repository.flatten(self.repository.tree_of(name), base)
+            entries, stamp = self.tracked.snapshot()
+            racy_ns = stamp[0] if stamp is not None else None
+
+            staged: dict[str, IndexEntry] = {}
+            unmerged: set[str] = set()
+            for entry in entries:
+                if not entry.path.startswith(base):
+                    continue
+                if entry.stage:
+                    unmerged.add(entry.path)
+                elif not stat.S_ISDIR(entry.mode):  # Sparse-index directories
+                    staged[entry.path] = entry
+
+            changes: list[tuple[str, str]] = []
+            for path in sorted(tree.keys() | staged.keys() | unmerged):
+                old = tree.get(path)
+                staged_entry = staged.get(path)
+                if staged_entry is None:
+                    if path in unmerged:
+                        change: Optional[str] = "modified" if old else "added"
+                    else:
+                        change = "deleted"  # Removed from the index
+                else:
+                    current = self._worktree(staged_entry, racy_ns)
+                    if current is None:
+                        change = "deleted" if old else None
+                    elif old is None:
+                        change = "added"
+                    else:
+                        change = "modified" if current != old else None
+                if change is not None:
+                    changes.append((path[cut:], change))
+            return name, changes
+
+    def stats(self) -> dict:
+        """Detector counters.
+
+        Returns:
+            dict with keys: hashed, stat_hits, remembered
+        """
+        return {
+            "hashed": self.hashed,
+            "stat_hits": self.stat_hits,
+            "remembered": len(self._hashes),
+        }
+
+
+_detectors: dict[Path, ChangeDetector] = {}
+_detectors_lock = threading.Lock()
+
+
+def change_detector_for(tracked: TrackedFiles) -> ChangeDetector:
+    """Shared ChangeDetector for an index reader's project root."""
+    with _detectors_lock:
+        detector = _detectors.get(tracked.root)
+        if detector is None or detector.tracked is not tracked:
+            detector = _detectors[tracked.root] = ChangeDetector(tracked)
+        return detector
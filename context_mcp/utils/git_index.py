@@ -0,0 +1,392 @@
+"""Reader for git's index file (.git/index), without the git binary.
+
+The index lists every tracked path with the stat data git cached when it
+last wrote the entry, sorted by path. Reading it is the cheapest way to
+enumerate a repository: no directory is listed and no ignore rule is
+evaluated. Versions 2, 3 (extended flags) and 4 (prefix-compressed paths)
+are supported; extensions are skipped. Repositories using SHA-256 object
+names are detected from `extensions.objectFormat` in the repository config.
+
+TrackedFiles exposes the tracked files below a project root (which may be a
+subdirectory of the work tree) and re-reads the index only when its stat
+stamp changes.
+"""
+
+import os
+import re
+import stat
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Fixed part of an entry: ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size
+_ENTRY_STAT = struct.Struct(">10I")
+_HEADER = struct.Struct(">4sII")
+
+# Entry flag bits
+_FLAG_ASSUME_VALID = 0x8000
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_SHIFT = 12
+_FLAG_NAME_MASK = 0x0FFF
+_EXT_SKIP_WORKTREE = 0x4000
+_EXT_INTENT_TO_ADD = 0x2000
+
+# Submodule entries (a commit, not a file)
+_MODE_GITLINK = 0o160000
+
+_OBJECT_FORMAT = re.compile(
+    r"^\s*objectformat\s*=\s*sha256\s*$", re.IGNORECASE | re.MULTILINE
+)
+
+
+class GitIndexError(Exception):
+    """Raised when an index file cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """One entry of the git index.
+
+    Attributes:
+        path: Work-tree-relative POSIX path
+        mode: File mode (0o100644, 0o100755, 0o120000 symlink, 0o160000 gitlink)
+        size: Cached file size (truncated to 32 bits)
+        mtime_ns: Cached modification time in nanoseconds
+        ctime_ns: Cached inode change time in nanoseconds
+        dev: Cached device number
+        ino: Cached inode number
+        uid: Cached owner
+        gid: Cached group
+        sha: Object name of the staged content (hex)
+        stage: Merge stage (0 unless the path is conflicted)
+        assume_valid: The assume-unchanged bit
+        skip_worktree: The skip-worktree bit (sparse checkouts)
+        intent_to_add: Added with `git add -N`
+    """
+
+    path: str
+    mode: int
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+    dev: int
+    ino: int
+    uid: int
+    gid: int
+    sha: str
+    stage: int
+    assume_valid: bool = False
+    skip_worktree: bool = False
+    intent_to_add: bool = False
+
+
+def _varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Decode git's offset varint (used by index v4); returns (value, next pos)."""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def parse_index(data: bytes, hash_size: int = 20) -> list[IndexEntry]:
+    """Parse the contents of an index file.
+
+    Args:
+        data: Raw index file
+        hash_size: Object name length in bytes (20 for SHA-1, 32 for SHA-256)
+
+    Returns:
+        Entries in index order (sorted by path, then stage)
+
+    Raises:
+        GitIndexError: If the data is not a supported index file
+    """
+    if len(data) < _HEADER.size:
+        raise GitIndexError("index file is truncated")
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b"DIRC":
+        raise GitIndexError("not a git index file")
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"unsupported index version: {version}")
+
+    entries = []
+    pos = _HEADER.size
+    previous = b""
+    try:
+        for _ in range(count):
+            start = pos
+            (ctime_s, ctime_ns, mtime_s, mtime_ns, dev, ino, mode, uid, gid, size) = (
+                _ENTRY_STAT.unpack_from(data, pos)
+            )
+            pos += _ENTRY_STAT.size
+            sha = data[pos : pos + hash_size].hex()
+            pos += hash_size
+            (flags,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+            extended = 0
+            if flags & _FLAG_EXTENDED:
+                if version < 3:
+                    raise GitIndexError("extended flags in a version 2 index")
+                (extended,) = struct.unpack_from(">H", data, pos)
+                pos += 2
+
+            if version == 4:
+                strip, pos = _varint(data, pos)
+                end = data.index(b"\0", pos)
+                name = previous[: len(previous) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                length = flags & _FLAG_NAME_MASK
+                if length < _FLAG_NAME_MASK:
+                    end = pos + length
+                else:
+                    end = data.index(b"\0", pos)  # Name of 4095+ bytes
+                name = data[pos:end]
+                # NUL-padded to a multiple of 8 bytes, with at least one NUL
+                pos = start + ((end - start) // 8 + 1) * 8
+            previous = name
+
+            entries.append(
+                IndexEntry(
+                    path=os.fsdecode(name),
+                    mode=mode,
+                    size=size,
+                    mtime_ns=mtime_s * 1_000_000_000 + mtime_ns,
+                    ctime_ns=ctime_s * 1_000_000_000 + ctime_ns,
+                    dev=dev,
+                    ino=ino,
+                    uid=uid,
+                    gid=gid,
+                    sha=sha,
+                    stage=(flags >> _FLAG_STAGE_SHIFT) & 0x3,
+                    assume_valid=bool(flags & _FLAG_ASSUME_VALID),
+                    skip_worktree=bool(extended & _EXT_SKIP_WORKTREE),
+                    intent_to_add=bool(extended & _EXT_INTENT_TO_ADD),
+                )
+            )
+    except (struct.error, ValueError, IndexError) as e:
+        raise GitIndexError(f"index file is truncated or corrupt: {e}")
+    return entries
+
+
+def find_git_dir(path: Path) -> Optional[tuple[Path, Path]]:
+    """Locate the work tree containing a directory.
+
+    Follows `.git` files (`gitdir: ...`) used by linked worktrees and
+    submodules.
+
+    Args:
+        path: Absolute directory inside a work tree
+
+    Returns:
+        (work tree top, git directory), or None outside a work tree
+    """
+    for candidate in (path, *path.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            try:
+                text = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = Path(text[len("gitdir:") :].strip())
+            if not git_dir.is_absolute():
+                git_dir = (candidate / git_dir).resolve()
+            return candidate, git_dir
+    return None
+
+
+def hash_size(git_dir: Path) -> int:
+    """Object name length in bytes for a repository (20, or 32 for SHA-256)."""
+    git_dir = Path(git_dir)
+    # Linked worktrees share the main repository's config
+    common = git_dir / "commondir"
+    if common.is_file():
+        try:
+            git_dir = (git_dir / common.read_text(encoding="utf-8").strip()).resolve()
+        except OSError:
+            pass
+    try:
+        text = (git_dir / "config").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return 20
+    return 32 if _OBJECT_FORMAT.search(text) else 20
+
+
+# (st_mtime_ns, st_size, st_ino) of the index file, None if it is missing
+_Stamp = Optional[tuple[int, int, int]]
+
+
+class TrackedFiles:
+    """Tracked files below a project root, read from the git index.
+
+    Attributes:
+        root: Absolute project root
+        work_tree: Top of the work tree containing root
+        git_dir: Repository directory
+        include_untracked: Whether callers should also list untracked files
+            (walking the disk) or only tracked ones
+        prefix: Work-tree-relative directory of root ("" or "dir/")
+        hash_size: Object name length in bytes (20 for SHA-1, 32 for SHA-256)
+    """
+
+    def __init__(
+        self, root: Path, work_tree: Path, git_dir: Path, include_untracked: bool = True
+    ):
+        """Initialize the reader; the index is read on first use.
+
+        Args:
+            root: Absolute project root (the work tree or a directory inside it)
+            work_tree: Top of the work tree
+            git_dir: Repository directory holding the index
+            include_untracked: See the class attributes
+        """
+        self.root = Path(root)
+        self.work_tree = Path(work_tree)
+        self.git_dir = Path(git_dir)
+        self.include_untracked = include_untracked
+        rel = self.root.relative_to(self.work_tree).as_posix()
+        self.prefix = "" if rel == "." else rel + "/"
+        self.hash_size = hash_size(self.git_dir)
+        self._index_path = self.git_dir / "index"
+        self._lock = threading.Lock()
+        self._stamp: _Stamp = None
+        self._loaded = False
+        self._all: list[IndexEntry] = []
+        self._entries: dict[str, IndexEntry] = {}
+        self._paths: list[str] = []
+        self._dirs: frozenset[str] = frozenset()
+        self.reads = 0
+        self.errors = 0
+
+    def stamp(self) -> _Stamp:
+        """Identity of the current index file."""
+        try:
+            st = os.stat(self._index_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self) -> None:
+        """Re-read the index if it changed; the caller holds the lock."""
+        current = self.stamp()
+        if self._loaded and current == self._stamp:
+            return
+        entries: dict[str, IndexEntry] = {}
+        parsed: list[IndexEntry] = []
+        if current is not None:
+            try:
+                with open(self._index_path, "rb") as f:
+                    data = f.read()
+                parsed = parse_index(data, self.hash_size)
+            except (OSError, GitIndexError):
+                self.errors += 1
+                parsed = []
+            prefix, cut = self.prefix, len(self.prefix)
+            for entry in parsed:
+                if (
+                    entry.stage > 1  # Keep one entry per conflicted path
+                    or entry.skip_worktree  # Not checked out
+                    or stat.S_ISDIR(entry.mode)  # Sparse-index directory
+                    or entry.mode == _MODE_GITLINK
+                    or not entry.path.startswith(prefix)
+                ):
+                    continue
+                entries[entry.path[cut:]] = entry
+        dirs = set()
+        for rel in entries:
+            slash = rel.rfind("/")
+            while slash > 0:
+                parent = rel[:slash]
+                if parent in dirs:
+                    break
+                dirs.add(parent)
+                slash = parent.rfind("/")
+        self._all = parsed
+        self._entries = entries
+        self._paths = sorted(entries)
+        self._dirs = frozenset(dirs)
+        self._stamp = current
+        self._loaded = True
+        self.reads += 1
+
+    def snapshot(self) -> tuple[list[IndexEntry], _Stamp]:
+        """Every index entry (work-tree-relative, all stages) and the index stamp."""
+        with self._lock:
+            self._refresh()
+            return self._all, self._stamp
+
+    def entries(self) -> dict[str, IndexEntry]:
+        """Index entries of the tracked files, keyed by root-relative path."""
+        with self._lock:
+            self._refresh()
+            return self._entries
+
+    def paths(self) -> list[str]:
+        """Sorted root-relative paths of the tracked files."""
+        with self._lock:
+            self._refresh()
+            return self._paths
+
+    def dirs(self) -> frozenset[str]:
+        """Root-relative directories containing tracked files (no trailing "/")."""
+        with self._lock:
+            self._refresh()
+            return self._dirs
+
+    def is_tracked(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Whether a file is tracked, or a directory holds tracked files."""
+        with self._lock:
+            self._refresh()
+            return rel_path in (self._dirs if is_dir else self._entries)
+
+    def stats(self) -> dict:
+        """Reader counters for server metrics.
+
+        Returns:
+            dict with keys: work_tree, tracked_files, include_untracked, reads,
+            errors
+        """
+        return {
+            "work_tree": str(self.work_tree),
+            "tracked_files": len(self._entries),
+            "include_untracked": self.include_untracked,
+            "reads": self.reads,
+            "errors": self.errors,
+        }
+
+
+_instances: dict[tuple[Path, bool], Optional[TrackedFiles]] = {}
+_instances_lock = threading.Lock()
+
+
+def tracked_files_for(
+    root: Path, include_untracked: bool = True
+) -> Optional[TrackedFiles]:
+    """Shared TrackedFiles for a project root.
+
+    Args:
+        root: Absolute project root
+        include_untracked: See TrackedFiles
+
+    Returns:
+        TrackedFiles, or None if root is not inside a git work tree
+    """
+    key = (Path(root), include_untracked)
+    with _instances_lock:
+        if key not in _instances:
+            found = find_git_dir(key[0])
+            tracked = None
+            if found is not None:
+                tracked = TrackedFiles(key[0], found[0], found[1], include_untracked)
+            _instances[key] = tracked
+        return _instances[key]
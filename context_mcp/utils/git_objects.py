@@ -0,0 +1,599 @@
+"""Read-only access to a git object database, without the git binary.
+
+Objects are looked up loose first (objects/xx/..., zlib-compressed), then in
+packfiles through their .idx files (versions 1 and 2, with 64-bit offsets).
+Packed objects may be deltified against an earlier object of the same pack
+(OFS_DELTA) or any object by name (REF_DELTA); delta chains are resolved
+iteratively and recently inflated objects are kept in a small LRU cache,
+since neighbouring trees of one commit usually share delta bases. Alternate
+object directories (objects/info/alternates) are searched as well.
+
+Repository adds revision parsing (full or abbreviated object names, refs
+and packed-refs, annotated tags, and the `~N` / `^N` suffixes) and flattens
+tree objects into {path: (mode, object name)} maps.
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Object types as numbered in packfiles
+_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+_OFS_DELTA = 6
+_REF_DELTA = 7
+
+# Inflated objects kept for delta bases and repeated reads
+DEFAULT_CACHE_OBJECTS = 256
+
+# Tree entry mode of subdirectories
+MODE_TREE = 0o040000
+
+_REV_SUFFIX = re.compile(r"(?:[~^]\d*)*$")
+_HEX = re.compile(r"^[0-9a-f]+$")
+_INFLATE_CHUNK = 64 * 1024
+
+
+class GitObjectError(Exception):
+    """Raised when an object is missing or cannot be decoded."""
+
+
+def blob_id(data: bytes, hash_size: int = 20) -> str:
+    """Object name git gives a blob with the given contents."""
+    digest = hashlib.sha256() if hash_size == 32 else hashlib.sha1()
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _inflate(buffer, pos: int) -> bytes:
+    """Decompress the zlib stream starting at buffer[pos]."""
+    inflater = zlib.decompressobj()
+    parts = []
+    while not inflater.eof:
+        chunk = buffer[pos : pos + _INFLATE_CHUNK]
+        if not chunk:
+            raise GitObjectError("truncated zlib stream")
+        parts.append(inflater.decompress(chunk))
+        pos += _INFLATE_CHUNK
+    return b"".join(parts)
+
+
+def _delta_size(delta: bytes, pos: int) -> tuple[int, int]:
+    """Decode a little-endian size varint of a delta header."""
+    size = shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its delta base and a git delta.
+
+    Raises:
+        GitObjectError: If the delta does not fit the base
+    """
+    source_size, pos = _delta_size(delta, 0)
+    target_size, pos = _delta_size(delta, pos)
+    if source_size != len(base):
+        raise GitObjectError("delta base size mismatch")
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # Copy: bits 0-3 select offset bytes, bits 4-6 size bytes
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise GitObjectError("invalid delta opcode")
+    if len(out) != target_size:
+        raise GitObjectError("delta result size mismatch")
+    return bytes(out)
+
+
+class _Pack:
+    """One packfile and its index, memory-mapped on first use."""
+
+    def __init__(self, idx_path: Path, hash_size: int):
+        self.idx_path = idx_path
+        self.pack_path = idx_path.with_suffix(".pack")
+        self.hash_size = hash_size
+        self._names: list[bytes] = []
+        self._offsets: list[int] = []
+        self._pack: Optional[mmap.mmap] = None
+        self._load_index()
+
+    def _load_index(self) -> None:
+        data = self.idx_path.read_bytes()
+        hs = self.hash_size
+        if data[:4] == b"\xfftOc":
+            (version,) = struct.unpack_from(">I", data, 4)
+            if version != 2:
+                raise GitObjectError(f"unsupported pack index version: {version}")
+            count = struct.unpack_from(">I", data, 8 + 255 * 4)[0]
+            names_at = 8 + 256 * 4
+            crc_at = names_at + count * hs
+            offsets_at = crc_at + count * 4
+            large_at = offsets_at + count * 4
+            names = [
+                data[names_at + i * hs : names_at + (i + 1) * hs] for i in range(count)
+            ]
+            offsets = list(struct.unpack_from(f">{count}I", data, offsets_at))
+            for i, offset in enumerate(offsets):
+                if offset & 0x80000000:
+                    (offsets[i],) = struct.unpack_from(
+                        ">Q", data, large_at + (offset & 0x7FFFFFFF) * 8
+                    )
+        else:
+            count = struct.unpack_from(">I", data, 255 * 4)[0]
+            at = 256 * 4
+            step = 4 + hs
+            names = [
+                data[at + i * step + 4 : at + (i + 1) * step] for i in range(count)
+            ]
+            offsets = [
+                struct.unpack_from(">I", data, at + i * step)[0] for i in range(count)
+            ]
+        self._names = names
+        self._offsets = offsets
+
+    def find(self, name: bytes) -> Optional[int]:
+        """Pack offset of an object, or None if the pack does not hold it."""
+        at = bisect.bisect_left(self._names, name)
+        if at < len(self._names) and self._names[at] == name:
+            return self._offsets[at]
+        return None
+
+    def names_with_prefix(self, prefix: bytes) -> list[bytes]:
+        """Object names starting with a byte prefix."""
+        at = bisect.bisect_left(self._names, prefix)
+        found = []
+        while at < len(self._names) and self._names[at].startswith(prefix):
+            found.append(self._names[at])
+            at += 1
+        return found
+
+    def data(self) -> mmap.mmap:
+        if self._pack is None:
+            with open(self.pack_path, "rb") as f:
+                self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._pack[:4] != b"PACK":
+                raise GitObjectError(f"not a packfile: {self.pack_path}")
+        return self._pack
+
+    def entry(self, offset: int) -> tuple[int, int, object]:
+        """Decode the entry at an offset.
+
+        Returns:
+            (type number, data position, delta base) where the base is a pack
+            offset for OFS_DELTA, an object name for REF_DELTA, else None
+        """
+        pack = self.data()
+        byte = pack[offset]
+        pos = offset + 1
+        kind = (byte >> 4) & 0x7
+        while byte & 0x80:  # Size varint; the inflated length is not needed
+            byte = pack[pos]
+            pos += 1
+        base: object = None
+        if kind == _OFS_DELTA:
+            byte = pack[pos]
+            pos += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = offset - distance
+        elif kind == _REF_DELTA:
+            base = bytes(pack[pos : pos + self.hash_size])
+            pos += self.hash_size
+        return kind, pos, base
+
+
+class ObjectStore:
+    """Loose and packed objects of one repository."""
+
+    def __init__(
+        self,
+        objects_dir: Path,
+        hash_size: int = 20,
+        cache_objects: int = DEFAULT_CACHE_OBJECTS,
+    ):
+        """Initialize the store; packs are discovered on first use.
+
+        Args:
+            objects_dir: The repository's objects directory
+            hash_size: Object name length in bytes (20 for SHA-1, 32 for SHA-256)
+            cache_objects: Inflated objects kept in memory
+        """
+        self.objects_dir = Path(objects_dir)
+        self.hash_size = hash_size
+        self.cache_objects = cache_objects
+        self._lock = threading.RLock()
+        self._cache: OrderedDict[object, tuple[str, bytes]] = OrderedDict()
+        self._packs: dict[Path, _Pack] = {}
+        self._pack_stamp: Optional[int] = None
+        self._alternates: Optional[list["ObjectStore"]] = None
+
+    def _remember(self, key: object, value: tuple[str, bytes]) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_objects:
+            self._cache.popitem(last=False)
+
+    def packs(self, rescan: bool = False) -> list[_Pack]:
+        """Packs of this store (re-listed when the pack directory changes)."""
+        pack_dir = self.objects_dir / "pack"
+        try:
+            stamp = os.stat(pack_dir).st_mtime_ns
+        except OSError:
+            return []
+        if rescan or stamp != self._pack_stamp:
+            current = {}
+            for idx in sorted(pack_dir.glob("*.idx")):
+                pack = self._packs.get(idx)
+                if pack is None:
+                    try:
+                        pack = _Pack(idx, self.hash_size)
+                    except (OSError, struct.error, GitObjectError):
+                        continue
+                current[idx] = pack
+            self._packs = current
+            self._pack_stamp = stamp
+        return list(self._packs.values())
+
+    def alternates(self) -> list["ObjectStore"]:
+        """Stores listed in objects/info/alternates."""
+        if self._alternates is None:
+            stores = []
+            try:
+                lines = (
+                    (self.objects_dir / "info" / "alternates")
+                    .read_text(encoding="utf-8")
+                    .splitlines()
+                )
+            except OSError:
+                lines = []
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    path = Path(line)
+                    if not path.is_absolute():
+                        path = self.objects_dir / path
+                    stores.append(ObjectStore(path, self.hash_size, self.cache_objects))
+            self._alternates = stores
+        return self._alternates
+
+    def _read_loose(self, name: str) -> Optional[tuple[str, bytes]]:
+        try:
+            with open(self.objects_dir / name[:2] / name[2:], "rb") as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            raise GitObjectError(f"corrupt loose object {name}: {e}")
+        header, _, body = raw.partition(b"\0")
+        kind, _, _ = header.partition(b" ")
+        return kind.decode("ascii"), body
+
+    def _read_packed(self, pack: _Pack, offset: int) -> tuple[str, bytes]:
+        """Inflate a packed object, resolving its delta chain."""
+        chain: list[int] = []
+        pos_offset = offset
+        while True:
+            cached = self._cache.get((pack.pack_path, pos_offset))
+            if cached is not None:
+                kind, data = cached
+                break
+            number, pos, base = pack.entry(pos_offset)
+            if number in _TYPES:
+                kind, data = _TYPES[number], _inflate(pack.data(), pos)
+                self._remember((pack.pack_path, pos_offset), (kind, data))
+                break
+            chain.append(pos_offset)
+            if number == _OFS_DELTA and isinstance(base, int):
+                pos_offset = base
+            elif number == _REF_DELTA and isinstance(base, bytes):
+                found = self.read(base.hex())
+                if found is None:
+                    raise GitObjectError(f"missing delta base {base.hex()}")
+                kind, data = found
+                break
+            else:
+                raise GitObjectError(
+                    f"invalid pack object type {number} in {pack.pack_path}"
+                )
+        for delta_offset in reversed(chain):
+            _, pos, _ = pack.entry(delta_offset)
+            data = apply_delta(data, _inflate(pack.data(), pos))
+            self._remember((pack.pack_path, delta_offset), (kind, data))
+        return kind, data
+
+    def read(self, name: str) -> Optional[tuple[str, bytes]]:
+        """Read an object.
+
+        Args:
+            name: Full hex object name
+
+        Returns:
+            (type, contents), or None if no store holds the object
+
+        Raises:
+            GitObjectError: If the object is corrupt
+        """
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is not None:
+                self._cache.move_to_end(name)
+                return cached
+            found = self._read_loose(name)
+            if found is None:
+                raw = bytes.fromhex(name)
+                for rescan in (False, True):  # A repack may have replaced the packs
+                    for pack in self.packs(rescan):
+                        offset = pack.find(raw)
+                        if offset is not None:
+                            found = self._read_packed(pack, offset)
+                            break
+                    if found is not None:
+                        break
+            if found is None:
+                for store in self.alternates():
+                    found = store.read(name)
+                    if found is not None:
+                        break
+            if found is not None:
+                self._remember(name, found)
+            return found
+
+    def expand(self, prefix: str) -> set[str]:
+        """Full names of the objects whose hex name starts with prefix."""
+        names = set()
+        try:
+            for entry in os.scandir(self.objects_dir / prefix[:2]):
+                if (prefix[:2] + entry.name).startswith(prefix):
+                    names.add(prefix[:2] + entry.name)
+        except OSError:
+            pass
+        even = bytes.fromhex(prefix[: len(prefix) // 2 * 2])
+        with self._lock:
+            for pack in self.packs():
+                for raw in pack.names_with_prefix(even):
+                    if raw.hex().startswith(prefix):
+                        names.add(raw.hex())
+        for store in self.alternates():
+            names |= store.expand(prefix)
+        return names
+
+
+class Repository:
+    """Refs and objects of a git repository."""
+
+    def __init__(self, git_dir: Path, hash_size: int = 20):
+        """Initialize the repository.
+
+        Args:
+            git_dir: Repository directory (.git, or a linked worktree's gitdir)
+            hash_size: Object name length in bytes (20 for SHA-1, 32 for SHA-256)
+        """
+        self.git_dir = Path(git_dir)
+        common = self.git_dir
+        try:
+            common = (
+                self.git_dir
+                / (self.git_dir / "commondir").read_text(encoding="utf-8").strip()
+            ).resolve()
+        except OSError:
+            pass
+        self.common_dir = common
+        self.hash_size = hash_size
+        self.objects = ObjectStore(common / "objects", hash_size)
+
+    # ------------------------------------------------------------------
+    # Revisions
+    # ------------------------------------------------------------------
+
+    def _read_ref(self, ref: str, depth: int = 0) -> Optional[str]:
+        """Object name a ref points to, following symbolic refs."""
+        if depth > 5:
+            return None
+        for base in (self.git_dir, self.common_dir):
+            try:
+                text = (base / ref).read_text(encoding="utf-8").strip()
+            except (OSError, ValueError):
+                continue
+            if text.startswith("ref:"):
+                return self._read_ref(text[4:].strip(), depth + 1)
+            return text if _HEX.match(text) else None
+        try:
+            packed = (self.common_dir / "packed-refs").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        for line in packed.splitlines():
+            if line and line[0] not in "#^":
+                name, _, refname = line.partition(" ")
+                if refname == ref:
+                    return name
+        return None
+
+    def _resolve_base(self, rev: str) -> Optional[str]:
+        width = self.hash_size * 2
+        if len(rev) == width and _HEX.match(rev):
+            return rev
+        if rev and ".." not in rev and not rev.startswith("/"):
+            for ref in (
+                rev,
+                f"refs/{rev}",
+                f"refs/tags/{rev}",
+                f"refs/heads/{rev}",
+                f"refs/remotes/{rev}",
+                f"refs/remotes/{rev}/HEAD",
+            ):
+                name = self._read_ref(ref)
+                if name is not None:
+                    return name
+        if 4 <= len(rev) < width and _HEX.match(rev):
+            names = self.objects.expand(rev)
+            if len(names) > 1:
+                raise ValueError(f"INVALID_REF: ambiguous object name: {rev}")
+            if names:
+                return names.pop()
+        return None
+
+    def read(self, name: str, kind: Optional[str] = None) -> bytes:
+        """Contents of an object, checking its type if given.
+
+        Raises:
+            GitObjectError: If the object is missing, corrupt, or of another type
+        """
+        found = self.objects.read(name)
+        if found is None:
+            raise GitObjectError(f"missing object {name}")
+        if kind is not None and found[0] != kind:
+            raise GitObjectError(f"object {name} is a {found[0]}, not a {kind}")
+        return found[1]
+
+    def _peel(self, name: str) -> tuple[str, str]:
+        """Follow annotated tags; returns (type, name) of the target."""
+        for _ in range(10):
+            found = self.objects.read(name)
+            if found is None:
+                raise GitObjectError(f"missing object {name}")
+            kind, data = found
+            if kind != "tag":
+                return kind, name
+            name = data.split(b"\n", 1)[0].split(b" ", 1)[1].decode("ascii")
+        raise GitObjectError(f"tag chain too long at {name}")
+
+    def _parents(self, commit: str) -> list[str]:
+        parents = []
+        for line in self.read(commit, "commit").split(b"\n"):
+            if not line:
+                break
+            if line.startswith(b"parent "):
+                parents.append(line[7:].decode("ascii"))
+        return parents
+
+    def resolve(self, rev: str) -> str:
+        """Resolve a revision to a commit (or tree) object name.
+
+        Supports object names (4+ hex digits), refs as git looks them up
+        (HEAD, branches, tags, remotes, packed-refs), annotated tags, and
+        `~N`, `^N` and `^` suffixes.
+
+        Raises:
+            ValueError: If the revision does not name a commit or tree
+        """
+        suffix = _REV_SUFFIX.search(rev).group(0)  # type: ignore[union-attr]
+        base = rev[: len(rev) - len(suffix)]
+        name = self._resolve_base(base)
+        if name is None:
+            raise ValueError(f"INVALID_REF: unknown revision: {rev}")
+        try:
+            kind, name = self._peel(name)
+            for op, count in re.findall(r"([~^])(\d*)", suffix):
+                if kind != "commit":
+                    raise ValueError(f"INVALID_REF: {base} is not a commit: {rev}")
+                number = int(count) if count else 1
+                if op == "~":
+                    for _ in range(number):
+                        parents = self._parents(name)
+                        if not parents:
+                            raise ValueError(
+                                f"INVALID_REF: revision has no parent: {rev}"
+                            )
+                        name = parents[0]
+                elif number:
+                    parents = self._parents(name)
+                    if len(parents) < number:
+                        raise ValueError(
+                            f"INVALID_REF: revision has no parent {number}: {rev}"
+                        )
+                    name = parents[number - 1]
+        except GitObjectError as e:
+            raise ValueError(f"INVALID_REF: {rev}: {e}")
+        if kind not in ("commit", "tree"):
+            raise ValueError(f"INVALID_REF: {rev} names a {kind}, not a commit")
+        return name
+
+    # ------------------------------------------------------------------
+    # Trees
+    # ------------------------------------------------------------------
+
+    def tree_of(self, name: str) -> str:
+        """Tree object name of a commit (a tree name is returned unchanged)."""
+        kind, data = self.objects.read(name) or ("", b"")
+        if kind == "tree":
+            return name
+        if kind != "commit":
+            raise GitObjectError(f"object {name} is not a commit")
+        return data[5 : data.index(b"\n")].decode("ascii")
+
+    def tree_entries(self, tree: str) -> list[tuple[int, str, str]]:
+        """Entries of one tree object as (mode, name, object name)."""
+        data = self.read(tree, "tree")
+        hs = self.hash_size
+        entries = []
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = int(data[pos:space], 8)
+            name = os.fsdecode(data[space + 1 : nul])
+            entries.append((mode, name, data[nul + 1 : nul + 1 + hs].hex()))
+            pos = nul + 1 + hs
+        return entries
+
+    def flatten(self, tree: str, prefix: str = "") -> dict[str, tuple[int, str]]:
+        """Every non-tree entry below a tree.
+
+        Args:
+            tree: Tree object name
+            prefix: Subdirectory ("" or "dir/sub/") to restrict the result to;
+                paths are returned relative to the tree, including the prefix
+
+        Returns:
+            {path: (mode, object name)}; empty if prefix is not in the tree
+        """
+        for part in prefix.strip("/").split("/") if prefix else []:
+            for mode, name, sha in self.tree_entries(tree):
+                if name == part and mode == MODE_TREE:
+                    tree = sha
+                    break
+            else:
+                return {}
+        files: dict[str, tuple[int, str]] = {}
+        pending = [(tree, prefix)]
+        while pending:
+            tree, base = pending.pop()
+            for mode, name, sha in self.tree_entries(tree):
+                if mode == MODE_TREE:
+                    pending.append((sha, f"{base}{name}/"))
+                else:
+                    files[base + name] = (mode, sha)
+        return files
@@ -0,0 +1,374 @@
+"""Ignore-file matching for the Python traversal fallbacks.
+
+ripgrep and fd skip files excluded by .gitignore and .ignore files; the Python
+fallbacks use IgnoreMatcher to make the same decisions. Each directory's
+ignore files are compiled once into a DirRules object and cached per
+directory, keyed by the (mtime_ns, size, inode) of the files, so repeated
+walks only pay for a stat() of the ignore files they find.
+
+Supported syntax follows gitignore(5): comments, escaped leading `#`/`!`,
+trailing-space trimming, negation, directory-only patterns (trailing `/`),
+anchoring (a `/` anywhere but at the end), `*`, `?`, `[...]` and `**`.
+Within one directory .ignore rules take precedence over .gitignore rules, as
+in ripgrep; rules of deeper directories take precedence over shallower ones,
+and .git/info/exclude applies at the root with the lowest precedence.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from context_mcp.utils.metrics import register_metrics_provider
+
+# Ignore files read in every directory, lowest precedence first
+IGNORE_FILES = (".gitignore", ".ignore")
+
+# Version-control directories never traversed
+VCS_DIRS = frozenset({".git", ".hg", ".svn"})
+
+# Maximum number of directories whose compiled rules are kept
+DEFAULT_MAX_DIRS = 8192
+
+# (st_mtime_ns, st_size, st_ino) per ignore file, None where a file is missing
+_Stamp = tuple[Optional[tuple[int, int, int]], ...]
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One compiled ignore pattern.
+
+    Attributes:
+        regex: Compiled pattern, matched in full against a basename (unanchored
+            rules) or a path relative to the rule's directory (anchored rules)
+        negate: Whether the rule re-includes matches (`!pattern`)
+        dir_only: Whether the rule matches directories only (`pattern/`)
+        anchored: Whether the rule is matched against the relative path
+    """
+
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex (without anchors)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+                after = i + 2
+                if after == n:
+                    # Trailing "**": everything inside
+                    out.append(".*")
+                    i = after
+                    continue
+                if pattern[after] == "/":
+                    # "**/": zero or more directories
+                    out.append("(?:.*/)?")
+                    i = after + 1
+                    continue
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : j]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+                continue
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_rule(line: str) -> Optional[IgnoreRule]:
+    """Compile one line of an ignore file.
+
+    Args:
+        line: Line without its terminator
+
+    Returns:
+        IgnoreRule, or None for blank lines, comments and invalid patterns
+    """
+    line = line.rstrip("\r")
+    if not line or line.startswith("#"):
+        return None
+    # Trailing spaces are dropped unless escaped with a backslash
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    if dir_only:
+        line = line[:-1]
+    if not line:
+        return None
+    anchored = "/" in line
+    if line.startswith("/"):
+        line = line[1:]
+    try:
+        regex = re.compile(_translate(line), re.DOTALL)
+    except re.error:
+        return None
+    return IgnoreRule(regex=regex, negate=negate, dir_only=dir_only, anchored=anchored)
+
+
+def parse_rules(text: str) -> list[IgnoreRule]:
+    """Compile the lines of an ignore file, skipping blanks and comments."""
+    rules = []
+    for line in text.split("\n"):
+        rule = parse_rule(line)
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+@dataclass(frozen=True)
+class DirRules:
+    """Compiled ignore rules of one directory.
+
+    Attributes:
+        base: Root-relative POSIX path of the directory, with a trailing "/"
+            ("" for the root)
+        rules: Rules in file order, lowest precedence first
+    """
+
+    base: str
+    rules: tuple[IgnoreRule, ...]
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """Decide a path against these rules.
+
+        Args:
+            rel_path: Root-relative POSIX path below this directory
+            name: Basename of rel_path
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if ignored, False if re-included by a negated rule, None if no
+            rule matches
+        """
+        local = rel_path[len(self.base) :]
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.fullmatch(local if rule.anchored else name):
+                return not rule.negate
+        return None
+
+
+def _stamp(paths: tuple[str, ...]) -> _Stamp:
+    """Identity of the current versions of a directory's ignore files."""
+    stamp: list[Optional[tuple[int, int, int]]] = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+class IgnoreRulesCache:
+    """Thread-safe LRU of compiled DirRules keyed by absolute directory path."""
+
+    def __init__(self, max_dirs: int = DEFAULT_MAX_DIRS):
+        """Initialize the cache.
+
+        Args:
+            max_dirs: Maximum number of directories kept
+        """
+        self.max_dirs = max_dirs
+        self._entries: OrderedDict[str, tuple[_Stamp, Optional[DirRules]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, dir_path: str, base: str, extra: tuple[str, ...] = ()
+    ) -> Optional[DirRules]:
+        """Return the compiled rules of a directory, recompiling changed files.
+
+        Args:
+            dir_path: Absolute directory path
+            base: Root-relative POSIX path of the directory ("" or "dir/")
+            extra: Additional ignore files applying to the directory, with
+                lower precedence than its own (e.g. .git/info/exclude)
+
+        Returns:
+            DirRules, or None if the directory has no rules
+        """
+        paths = extra + tuple(os.path.join(dir_path, name) for name in IGNORE_FILES)
+        stamp = _stamp(paths)
+        with self._lock:
+            cached = self._entries.get(dir_path)
+            if cached is not None and cached[0] == stamp:
+                self._entries.move_to_end(dir_path)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        rules: list[IgnoreRule] = []
+        for path, version in zip(paths, stamp):
+            if version is None:
+                continue
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    rules.extend(parse_rules(f.read()))
+            except OSError:
+                continue
+        dir_rules = DirRules(base=base, rules=tuple(rules)) if rules else None
+
+        with self._lock:
+            self._entries[dir_path] = (stamp, dir_rules)
+            self._entries.move_to_end(dir_path)
+            while len(self._entries) > self.max_dirs:
+                self._entries.popitem(last=False)
+        return dir_rules
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Cache counters for server metrics.
+
+        Returns:
+            dict with keys: directories, max_directories, hits, misses, hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directories": len(self._entries),
+                "max_directories": self.max_dirs,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by every traversal
+ignore_rules_cache = IgnoreRulesCache()
+register_metrics_provider("ignore_rules", ignore_rules_cache.stats)
+
+# Rules in effect in a directory, from the root down
+RuleChain = tuple[DirRules, ...]
+
+
+class IgnoreMatcher:
+    """Ignore decisions for paths under one project root."""
+
+    def __init__(self, root: Path, cache: IgnoreRulesCache = ignore_rules_cache):
+        """Initialize the matcher.
+
+        Args:
+            root: Absolute project root (where .git/info/exclude is looked up)
+            cache: Compiled-rules cache
+        """
+        self.root = Path(root)
+        self._root_str = str(self.root)
+        self._cache = cache
+
+    def dir_rules(self, dir_path: str, base: str) -> Optional[DirRules]:
+        """Compiled rules of the ignore files in one directory.
+
+        Args:
+            dir_path: Absolute directory path
+            base: Root-relative POSIX path of the directory ("" or "dir/")
+        """
+        extra: tuple[str, ...] = ()
+        if not base:
+            extra = (os.path.join(dir_path, ".git", "info", "exclude"),)
+        return self._cache.get(dir_path, base, extra)
+
+    def extend(self, chain: RuleChain, dir_path: str, base: str) -> RuleChain:
+        """Chain for a subdirectory: chain plus the subdirectory's own rules."""
+        rules = self.dir_rules(dir_path, base)
+        return chain + (rules,) if rules is not None else chain
+
+    def chain_for(self, rel_dir: str) -> RuleChain:
+        """Rules in effect inside a directory, loading each ancestor's files.
+
+        Args:
+            rel_dir: Root-relative POSIX directory path ("" or "." for the root)
+        """
+        chain = self.extend((), self._root_str, "")
+        base = ""
+        for part in rel_dir.strip("/").split("/"):
+            if part in ("", "."):
+                continue
+            base += part + "/"
+            chain = self.extend(chain, os.path.join(self._root_str, base), base)
+        return chain
+
+    @staticmethod
+    def ignored(chain: RuleChain, rel_path: str, name: str, is_dir: bool) -> bool:
+        """Whether a path is ignored by the rules in effect in its directory.
+
+        Parent directories are not checked; traversals prune them instead.
+
+        Args:
+            chain: Rules in effect in the path's directory (see chain_for)
+            rel_path: Root-relative POSIX path
+            name: Basename of rel_path
+            is_dir: Whether the path is a directory
+        """
+        for dir_rules in reversed(chain):
+            decision = dir_rules.match(rel_path, name, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Whether a root-relative path or any of its parent directories is ignored.
+
+        Args:
+            rel_path: Root-relative POSIX path
+            is_dir: Whether the path is a directory
+        """
+        parts = rel_path.strip("/").split("/")
+        chain = self.extend((), self._root_str, "")
+        base = ""
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            path = base + part
+            if not last and part in VCS_DIRS:
+                return True
+            if self.ignored(chain, path, part, is_dir or not last):
+                return True
+            if not last:
+                base = path + "/"
+                chain = self.extend(chain, os.path.join(self._root_str, base), base)
+        return False
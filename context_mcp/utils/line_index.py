@@ -0,0 +1,156 @@
+"""Cached line-offset index for random access to lines of large files.
+
+A LineIndex records, for every fixed-size block of a file, how many newlines
+precede the block. Finding where line N starts is then a bisect over those
+counts plus a scan of a single block, so line ranges are served by seeking
+straight to their byte offset instead of reading the whole file. Indexes are
+built lazily on first access and kept in the shared file metadata cache
+(see file_metadata), so any change to the file invalidates them.
+
+Offsets assume an ASCII-compatible encoding (newline is the single byte
+0x0A); see is_index_compatible. Carriage returns not followed by a newline
+also end a line when text is read with universal newlines; they are counted
+so total_lines stays right, but offsets are then only approximate and
+callers read such files as text instead (see has_bare_cr).
+"""
+
+import codecs
+import os
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO
+
+# Bytes per index block; bounds the scan needed to locate one line
+BLOCK_SIZE = 64 * 1024
+
+# Bytes read at a time while building an index
+_READ_SIZE = 16 * BLOCK_SIZE
+
+
+def is_index_compatible(encoding: str) -> bool:
+    """Whether byte-level line offsets are valid for text in this encoding.
+
+    True when newline and ASCII text encode to themselves (UTF-8, ASCII,
+    Latin-1, Windows code pages, ...); False for UTF-16/32 and BOM codecs.
+    """
+    try:
+        codecs.lookup(encoding)
+        return "\n".encode(encoding) == b"\n" and "a\n".encode(encoding) == b"a\n"
+    except (LookupError, UnicodeError):
+        return False
+
+
+class LineIndex:
+    """Newline counts at fixed block boundaries of one file version."""
+
+    def __init__(self, size: int, mtime_ns: int, inode: int):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        # block_counts[i] = number of newlines in bytes [0, i * BLOCK_SIZE)
+        self.block_counts = array("Q", [0])
+        self.newline_count = 0
+        # "\r" bytes not followed by "\n" (old Mac line ends)
+        self.bare_cr_count = 0
+        self.ends_with_newline = False
+
+    @classmethod
+    def build(cls, f: BinaryIO, st: os.stat_result) -> "LineIndex":
+        """Scan a file once and record newline counts per block.
+
+        Args:
+            f: File opened in binary mode
+            st: Stat result of the file, used for invalidation
+
+        Returns:
+            Built LineIndex
+        """
+        index = cls(st.st_size, st.st_mtime_ns, st.st_ino)
+        counts = index.block_counts
+        total = 0
+        bare_cr = 0
+        last = b""
+        f.seek(0)
+        while True:
+            chunk = f.read(_READ_SIZE)
+            if not chunk:
+                break
+            for start in range(0, len(chunk), BLOCK_SIZE):
+                total += chunk.count(b"\n", start, start + BLOCK_SIZE)
+                counts.append(total)
+            cr = chunk.count(b"\r")
+            if cr:
+                bare_cr += cr - chunk.count(b"\r\n")
+            if last == b"\r" and chunk[:1] == b"\n":
+                bare_cr -= 1  # "\r\n" split across two reads
+            last = chunk[-1:]
+        # The final entry covers a partial block; drop it so every entry
+        # marks a block boundary inside the file
+        if len(counts) > 1 and index.size % BLOCK_SIZE:
+            counts.pop()
+        index.newline_count = total
+        index.bare_cr_count = bare_cr
+        index.ends_with_newline = last in (b"\n", b"\r")
+        return index
+
+    @property
+    def has_bare_cr(self) -> bool:
+        """Whether lines also end at "\r" alone, so byte offsets do not apply."""
+        return self.bare_cr_count > 0
+
+    @property
+    def total_lines(self) -> int:
+        """Number of lines as universal newlines split them.
+
+        A final line without terminator counts; "\r\n", "\n" and "\r" each
+        end one line.
+        """
+        if self.size == 0:
+            return 0
+        breaks = self.newline_count + self.bare_cr_count
+        return breaks + (0 if self.ends_with_newline else 1)
+
+    def matches(self, st: os.stat_result) -> bool:
+        """Whether the index describes the file version with this stat."""
+        return (
+            st.st_size == self.size
+            and st.st_mtime_ns == self.mtime_ns
+            and st.st_ino == self.inode
+        )
+
+    def line_offset(self, f: BinaryIO, line_number: int) -> int:
+        """Byte offset at which a line starts.
+
+        Args:
+            f: Binary file (or mmap) of the indexed file version
+            line_number: 1-indexed line number; total_lines + 1 gives the size
+
+        Returns:
+            Byte offset (the file size for lines past the end)
+        """
+        newlines_before = line_number - 1
+        if newlines_before <= 0:
+            return 0
+        if newlines_before > self.newline_count:
+            return self.size
+        # Last block whose preceding newline count is still short of the target
+        block = bisect_left(self.block_counts, newlines_before) - 1
+        remaining = newlines_before - self.block_counts[block]
+        f.seek(block * BLOCK_SIZE)
+        data = f.read(BLOCK_SIZE)
+        pos = -1
+        for _ in range(remaining):
+            pos = data.find(b"\n", pos + 1)
+        return block * BLOCK_SIZE + pos + 1
+
+    def line_number_at(self, f: BinaryIO, offset: int) -> int:
+        """1-indexed number of the line containing a byte offset.
+
+        Args:
+            f: Binary file (or mmap) of the indexed file version
+            offset: Byte offset into the file
+        """
+        block = min(offset // BLOCK_SIZE, len(self.block_counts) - 1)
+        start = block * BLOCK_SIZE
+        f.seek(start)
+        return self.block_counts[block] + f.read(offset - start).count(b"\n") + 1
@@ -0,0 +1,51 @@
+"""Server metrics registry.
+
+Subsystems (watcher, caches, indexes) register a provider callable returning a
+dict of counters; get_server_metrics collects them into one response.
+"""
+
+import threading
+from typing import Callable
+
+from context_mcp.utils.logger import logger
+
+MetricsProvider = Callable[[], dict]
+
+_providers: dict[str, MetricsProvider] = {}
+_lock = threading.Lock()
+
+
+def register_metrics_provider(name: str, provider: MetricsProvider) -> None:
+    """Register (or replace) a named metrics provider.
+
+    Args:
+        name: Section name in the metrics response
+        provider: Callable returning a JSON-serializable dict
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def unregister_metrics_provider(name: str) -> None:
+    """Remove a named metrics provider if present."""
+    with _lock:
+        _providers.pop(name, None)
+
+
+def collect_metrics() -> dict:
+    """Collect metrics from every registered provider.
+
+    Returns:
+        dict mapping provider names to their metrics (or an error string)
+    """
+    with _lock:
+        providers = dict(_providers)
+
+    metrics: dict[str, dict] = {}
+    for name, provider in sorted(providers.items()):
+        try:
+            metrics[name] = provider()
+        except Exception as e:
+            logger.warning(f"Metrics provider '{name}' failed: {e}")
+            metrics[name] = {"error": str(e)}
+    return metrics
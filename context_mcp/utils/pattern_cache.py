@@ -0,0 +1,227 @@
+"""Bounded LRU cache of compiled search patterns.
+
+Shared by search_in_file, search_in_files and the Python search engine so a
+query is validated and compiled once, not on every line or file. Hit and miss
+counters are reported through the server metrics registry.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import Union
+
+from context_mcp.utils.metrics import register_metrics_provider
+
+# Maximum number of compiled patterns kept per process
+DEFAULT_MAX_PATTERNS = 256
+
+
+def pattern_flags(ignore_case: bool = False, multiline: bool = False) -> int:
+    """Translate search options into re flags.
+
+    ^ and $ always anchor at line boundaries, as in line-by-line search.
+    multiline only lifts the restriction that a match lies within one line,
+    which is enforced by the search engine rather than by a flag.
+    """
+    flags = re.MULTILINE
+    if ignore_case:
+        flags |= re.IGNORECASE
+    return flags
+
+
+# Anchors that behave the same over bytes and text (word boundaries do not)
+_BYTE_SAFE_AT = {
+    sre_constants.AT_BEGINNING,
+    sre_constants.AT_BEGINNING_LINE,
+    sre_constants.AT_BEGINNING_STRING,
+    sre_constants.AT_END,
+    sre_constants.AT_END_LINE,
+    sre_constants.AT_END_STRING,
+}
+
+
+def _byte_safe_items(items) -> bool:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av >= 0x80:
+                return False
+        elif op is sre_constants.IN:
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL and item_av < 0x80:
+                    continue
+                if item_op is sre_constants.RANGE and item_av[1] < 0x80:
+                    continue
+                # Negated sets and categories (\w, \d, \s) differ for non-ASCII
+                return False
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if not _byte_safe_items(av[2]):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            if not _byte_safe_items(av[-1]):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_byte_safe_items(branch) for branch in av[1]):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _byte_safe_items(av[1]):
+                return False
+        elif op is sre_constants.AT:
+            if av not in _BYTE_SAFE_AT:
+                return False
+        elif op is not sre_constants.GROUPREF:
+            # ANY, NOT_LITERAL, CATEGORY, word boundaries, ...
+            return False
+    return True
+
+
+@lru_cache(maxsize=DEFAULT_MAX_PATTERNS)
+def is_byte_safe(
+    query: str, use_regex: bool = False, ignore_case: bool = False
+) -> bool:
+    """Whether a query matches UTF-8 bytes exactly as it matches decoded text.
+
+    True for patterns built only from ASCII literals, ASCII character sets,
+    anchors, groups and repeats. Such a query can run as a bytes regex over
+    the raw buffer of any file. Case-insensitive matching is never byte safe
+    because Unicode case folding maps some ASCII letters to non-ASCII ones.
+
+    Args:
+        query: Search text or regex pattern
+        use_regex: Whether to treat query as regex
+        ignore_case: Case-insensitive matching
+
+    Returns:
+        True if the bytes form of the pattern is equivalent
+    """
+    if ignore_case:
+        return False
+    if not use_regex:
+        return True
+    try:
+        parsed = sre_parser.parse(query)
+    except re.error:
+        return False
+    if parsed.state.flags & (re.IGNORECASE | re.DOTALL | re.VERBOSE):
+        return False
+    return _byte_safe_items(list(parsed))
+
+
+class PatternCache:
+    """Thread-safe LRU mapping (pattern, flags, mode) to compiled regexes."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_PATTERNS):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of compiled patterns kept
+        """
+        self.maxsize = maxsize
+        self._patterns: OrderedDict[tuple[str, int, bool, bool], re.Pattern] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        query: str,
+        use_regex: bool = False,
+        ignore_case: bool = False,
+        multiline: bool = False,
+        binary: bool = False,
+    ) -> "re.Pattern":
+        """Return the compiled pattern for a query, compiling it on a miss.
+
+        Args:
+            query: Search text or regex pattern
+            use_regex: Whether to treat query as regex (literal queries are escaped)
+            ignore_case: Case-insensitive matching
+            multiline: Allow matches to span lines
+            binary: Compile a bytes pattern (for searching raw buffers)
+
+        Returns:
+            Compiled pattern
+
+        Raises:
+            ValueError: If query is an invalid regex (or has no bytes form)
+        """
+        key = (query, pattern_flags(ignore_case, multiline), use_regex, binary)
+        with self._lock:
+            pattern = self._patterns.get(key)
+            if pattern is not None:
+                self._patterns.move_to_end(key)
+                self.hits += 1
+                return pattern
+            self.misses += 1
+
+        source: Union[str, bytes] = query if use_regex else re.escape(query)
+        try:
+            if binary:
+                source = source.encode("utf-8")  # type: ignore[union-attr]
+            pattern = re.compile(source, key[1])
+        except re.error as e:
+            raise ValueError(f"INVALID_REGEX: {str(e)}")
+
+        with self._lock:
+            self._patterns[key] = pattern
+            self._patterns.move_to_end(key)
+            while len(self._patterns) > self.maxsize:
+                self._patterns.popitem(last=False)
+        return pattern
+
+    def clear(self) -> None:
+        """Drop all cached patterns and reset counters."""
+        with self._lock:
+            self._patterns.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Cache counters for server metrics.
+
+        Returns:
+            dict with keys: size, maxsize, hits, misses, hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._patterns),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache (worker processes of the search engine keep their own)
+pattern_cache = PatternCache()
+register_metrics_provider("pattern_cache", pattern_cache.stats)
+
+
+def compile_pattern(
+    query: str,
+    use_regex: bool = False,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    binary: bool = False,
+) -> "re.Pattern":
+    """Compile a query through the shared pattern cache.
+
+    Args:
+        query: Search text or regex pattern
+        use_regex: Whether to treat query as regex
+        ignore_case: Case-insensitive matching
+        multiline: Allow matches to span lines
+        binary: Compile a bytes pattern (for searching raw buffers)
+
+    Returns:
+        Compiled pattern
+
+    Raises:
+        ValueError: If query is an invalid regex
+    """
+    return pattern_cache.get(query, use_regex, ignore_case, multiline, binary)
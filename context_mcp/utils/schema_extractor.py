@@ -72,7 +72,7 @@ async def extract_tool_schema(
 
 def categorize_tools() -> Dict[str, List[str]]:
     """
-    Categorize tools into navigation/search/read/guide groups.
+    Categorize tools into navigation/search/read/status/guide groups.
 
     Returns:
         Dict mapping category names to lists of tool names
@@ -87,20 +87,25 @@ def categorize_tools() -> Dict[str, List[str]]:
         "search_in_file",
         "search_in_files",
         "find_files_by_name",
+        "fuzzy_find_files",
         "find_recently_modified_files",
+        "find_changed_files",
     ]
     read = [
         "read_entire_file",
         "read_file_lines",
+        "read_file_ranges",
         "read_file_tail",
         "read_files",
     ]
+    status = ["get_server_metrics"]
     guide = ["get_tool_usage_guide"]
 
     return {
         "navigation": navigation,
         "search": search,
         "read": read,
+        "status": status,
         "guide": guide,
     }
 
@@ -0,0 +1,540 @@
+"""Parallel pure-Python content search engine.
+
+Used by search_in_files when neither ripgrep nor grep is available (and to
+verify trigram index candidates). Files are partitioned into chunks searched
+by a process pool; each worker memory-maps whole files, skips binary files
+and scans the buffer with a precompiled pattern, decoding only matching lines.
+Results are yielded in input order so callers can page deterministically.
+"""
+
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from context_mcp.utils.file_detector import BINARY_SNIFF_SIZE
+from context_mcp.utils.line_index import BLOCK_SIZE, LineIndex
+from context_mcp.utils.logger import logger
+from context_mcp.utils.pattern_cache import compile_pattern, is_byte_safe
+
+# (line_number, line_content, match_start, match_end)
+LineMatch = tuple[int, str, int, int]
+
+# LineMatch followed by its (context_before, context_after) lines
+ContextMatch = tuple[int, str, int, int, list[str], list[str]]
+
+Match = Union[LineMatch, ContextMatch]
+
+# Raw file contents: bytes or a read-only memory map
+Buffer = Union[bytes, mmap.mmap]
+
+# Files per task submitted to the pool
+DEFAULT_CHUNK_SIZE = 32
+
+# Below this many files the search runs inline, without the pool
+DEFAULT_INLINE_THRESHOLD = 64
+
+# Bytes copied at a time when counting newlines in a memory map
+_COUNT_SLICE = 8 * 1024 * 1024
+
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+# Extra seconds granted to a worker past the deadline before giving up on it
+_RESULT_GRACE = 1.0
+
+
+def _char_offset(raw: bytes, byte_offset: int) -> int:
+    """Convert a byte offset within a UTF-8 line into a character offset."""
+    return len(raw[:byte_offset].decode("utf-8", errors="replace"))
+
+
+def _count(buf: Buffer, sub: Union[bytes, str], start: int, end: int) -> int:
+    """Count occurrences of sub in buf[start:end], in bounded slices for mmaps."""
+    if not isinstance(buf, mmap.mmap):
+        return buf.count(sub, start, end)  # type: ignore[arg-type]
+    total = 0
+    while start < end:
+        stop = min(start + _COUNT_SLICE, end)
+        total += buf[start:stop].count(sub)  # type: ignore[arg-type]
+        start = stop
+    return total
+
+
+def _line_text(line: Union[bytes, str]) -> str:
+    """Decode one line of a buffer without its line terminator."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    return line[:-1] if line.endswith("\r") else line
+
+
+def _with_context(
+    buf: Union[Buffer, str],
+    newline: Union[bytes, str],
+    results: list[LineMatch],
+    spans: list[tuple[int, int]],
+    context_before: int,
+    context_after: int,
+) -> list[ContextMatch]:
+    """Attach surrounding lines to matches, read from the searched buffer.
+
+    Context is merged per file as ripgrep does: every line is reported at
+    most once, so context never repeats a match line and lines lying in both
+    the after context of one match and the before context of the next belong
+    to the earlier match.
+
+    Args:
+        buf: Searched buffer
+        newline: Line terminator in buf's type
+        results: Matches in buffer order
+        spans: (line_start, line_end) of the lines each match covers
+        context_before: Lines wanted before each match
+        context_after: Lines wanted after each match
+
+    Returns:
+        ContextMatch tuples, in the order of results
+    """
+    size = len(buf)
+    with_context: list[ContextMatch] = []
+    # Start of the first line not yet reported as a match or as context
+    emitted = 0
+    for i, (match, (line_start, line_end)) in enumerate(zip(results, spans)):
+        before: list[str] = []
+        pos = line_start
+        while len(before) < context_before and pos > emitted:
+            start = buf.rfind(newline, 0, pos - 1) + 1  # type: ignore[arg-type]
+            before.append(_line_text(buf[start : pos - 1]))
+            pos = start
+        before.reverse()
+
+        stop = spans[i + 1][0] if i + 1 < len(spans) else size
+        after: list[str] = []
+        pos = line_end + 1
+        while len(after) < context_after and pos < stop:
+            end = buf.find(newline, pos)  # type: ignore[arg-type]
+            if end < 0:
+                end = size
+            after.append(_line_text(buf[pos:end]))
+            pos = end + 1
+        emitted = pos
+        with_context.append((*match, before, after))
+    return with_context
+
+
+def search_buffer(
+    data: Buffer,
+    query: str,
+    use_regex: bool,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    line_index: Optional[LineIndex] = None,
+    context_before: int = 0,
+    context_after: int = 0,
+) -> Sequence[Match]:
+    """Find the lines of a file buffer that match query.
+
+    The raw buffer (bytes or a read-only mmap) is searched directly with
+    bytes.find for literals or a bytes regex, as long as that is equivalent
+    to matching the decoded text: the pattern is byte safe (see
+    is_byte_safe) or the buffer is pure ASCII. Only then are line boundaries
+    and numbers derived, from newlines around each hit, and only matched
+    lines are decoded. Other queries fall back to searching the decoded text.
+
+    Unless multiline is set, a match is confined to a single line, like
+    searching line by line; multiline matches report every line they span,
+    joined, under the number of the first one (as ripgrep -U does). Buffers
+    holding carriage returns are searched with "\r\n" and "\r" translated to
+    "\n", so lines are split as universal newlines split them.
+
+    Args:
+        data: Raw file contents
+        query: Search text or regex pattern
+        use_regex: Whether to treat query as regex
+        ignore_case: Case-insensitive matching
+        multiline: Allow matches to span lines
+        line_index: Cached line-offset index of the file, used to number
+            lines without counting newlines from the start of the buffer
+        context_before: Lines of context to report before each match
+        context_after: Lines of context to report after each match
+
+    Returns:
+        List of (line_number, line_content, match_start, match_end) tuples;
+        offsets are character offsets of the first match in line_content.
+        When context is requested each tuple also carries its context_before
+        and context_after line lists (see _with_context)
+
+    Raises:
+        ValueError: If query is an invalid regex
+    """
+    if data.find(b"\r") >= 0:
+        # Universal newlines, as when reading in text mode: "\r\n" and a bare
+        # "\r" end a line too, so $ and line spans never see a carriage return
+        data = bytes(data).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        line_index = None
+    buf: Union[Buffer, str] = data
+    newline: Union[bytes, str] = b"\n"
+    pattern = None
+    needle = b""
+    if not use_regex and not ignore_case and query:
+        needle = query.encode("utf-8")
+    elif is_byte_safe(query, use_regex, ignore_case) or (
+        (query.isascii() or not ignore_case) and _NON_ASCII.search(data) is None
+    ):
+        try:
+            pattern = compile_pattern(
+                query, use_regex, ignore_case, multiline, binary=True
+            )
+        except ValueError:
+            # No bytes form (e.g. \N{...} escapes); search the decoded text
+            pattern = None
+    if pattern is None and not needle:
+        pattern = compile_pattern(query, use_regex, ignore_case, multiline)
+        buf = bytes(data).decode("utf-8", errors="replace")
+        newline = "\n"
+        # Offsets into decoded text are not byte offsets
+        line_index = None
+
+    results: list[LineMatch] = []
+    spans: list[tuple[int, int]] = []
+    size = len(buf)
+    ends_with_newline = size > 0 and buf[-1:] == newline
+    pos = 0
+    line_number = 1
+    counted_to = 0
+
+    while pos <= size:
+        if pattern is not None:
+            found = pattern.search(buf, pos)  # type: ignore[arg-type]
+            if found is None:
+                break
+            start, end = found.span()
+        else:
+            start = buf.find(needle, pos)  # type: ignore[arg-type]
+            if start < 0:
+                break
+            end = start + len(needle)
+
+        line_start = buf.rfind(newline, 0, start) + 1  # type: ignore[arg-type]
+        if line_start == size and (size == 0 or ends_with_newline):
+            # Past the final line terminator: there is no further line
+            break
+        # A multiline match ends on the line holding its last character
+        last = max(end - 1, start) if multiline else start
+        line_end = buf.find(newline, last)  # type: ignore[arg-type]
+        if line_end < 0:
+            line_end = size
+
+        if end > line_end and multiline:
+            # Only a trailing line terminator lies past the spanned lines
+            end = line_end
+        elif end > line_end:
+            if pattern is None:
+                # A literal containing a newline can never match one line
+                pos = line_end + 1
+                continue
+            # The match spilled into the next line; retry within this line only
+            found = pattern.search(buf, line_start, line_end)  # type: ignore[arg-type]
+            if found is None:
+                pos = line_end + 1
+                continue
+            start, end = found.span()
+
+        if (
+            line_index is not None
+            and isinstance(buf, mmap.mmap)
+            and line_start - counted_to > BLOCK_SIZE
+        ):
+            line_number = line_index.line_number_at(buf, line_start)  # type: ignore[arg-type]
+        else:
+            line_number += _count(buf, newline, counted_to, line_start)  # type: ignore[arg-type]
+        counted_to = line_start
+
+        line = buf[line_start:line_end]
+        if isinstance(line, bytes):
+            content = line.decode("utf-8", errors="replace")
+            if content.isascii():
+                match_start, match_end = start - line_start, end - line_start
+            else:
+                match_start = _char_offset(line, start - line_start)
+                match_end = _char_offset(line, end - line_start)
+        else:
+            content = line
+            match_start, match_end = start - line_start, end - line_start
+        if content.endswith("\r"):
+            content = content[:-1]
+            match_end = min(match_end, len(content))
+            match_start = min(match_start, match_end)
+        results.append((line_number, content, match_start, match_end))
+        spans.append((line_start, line_end))
+        pos = line_end + 1
+
+    if context_before or context_after:
+        return _with_context(
+            buf, newline, results, spans, context_before, context_after
+        )
+    return results
+
+
+@contextmanager
+def open_buffer(path: Union[str, os.PathLike]) -> Iterator[Buffer]:
+    """Map a file read-only for searching.
+
+    Empty files (which cannot be mapped) yield b"".
+
+    Raises:
+        OSError: If the file cannot be opened or mapped
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def search_file(
+    path: str,
+    query: str,
+    use_regex: bool,
+    ignore_case: bool = False,
+    multiline: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+) -> Sequence[Match]:
+    """Search one file, returning no matches for binary or unreadable files."""
+    try:
+        with open_buffer(path) as data:
+            if b"\x00" in data[:BINARY_SNIFF_SIZE]:
+                return []
+            return search_buffer(
+                data,
+                query,
+                use_regex,
+                ignore_case,
+                multiline,
+                context_before=context_before,
+                context_after=context_after,
+            )
+    except OSError:
+        return []
+
+
+def _search_chunk(
+    paths: list[str],
+    query: str,
+    use_regex: bool,
+    ignore_case: bool,
+    multiline: bool,
+    context_before: int,
+    context_after: int,
+    deadline: float,
+) -> tuple[list[Sequence[Match]], bool]:
+    """Search a chunk of files; runs in a worker process.
+
+    Returns:
+        (per-file results for the files searched, whether the deadline hit);
+        on timeout the result list covers only a prefix of paths
+    """
+    results: list[Sequence[Match]] = []
+    for path in paths:
+        if time.time() > deadline:
+            return results, True
+        results.append(
+            search_file(
+                path,
+                query,
+                use_regex,
+                ignore_case,
+                multiline,
+                context_before,
+                context_after,
+            )
+        )
+    return results, False
+
+
+class SearchRun:
+    """Iterator over (relative_path, matches) for files with matches.
+
+    Files are reported in input order. timed_out is set once iteration stops
+    because the deadline passed; results yielded before that are complete.
+    """
+
+    def __init__(
+        self,
+        engine: "ParallelSearchEngine",
+        files: Iterable[tuple[str, str]],
+        query: str,
+        use_regex: bool,
+        deadline: float,
+        ignore_case: bool = False,
+        multiline: bool = False,
+        context: tuple[int, int] = (0, 0),
+    ):
+        self.timed_out = False
+        self._engine = engine
+        self._files = iter(files)
+        self._query = query
+        self._use_regex = use_regex
+        self._deadline = deadline
+        self._options = (ignore_case, multiline, *context)
+
+    def __iter__(self) -> Iterator[tuple[str, Sequence[Match]]]:
+        head = list(islice(self._files, self._engine.inline_threshold + 1))
+        if len(head) <= self._engine.inline_threshold or self._engine.workers == 1:
+            return self._run_inline(chain(head, self._files))
+        return self._run_pool(chain(head, self._files))
+
+    def _run_inline(
+        self, files: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[str, Sequence[Match]]]:
+        for abs_path, rel_path in files:
+            if time.time() > self._deadline:
+                self.timed_out = True
+                return
+            matches = search_file(
+                abs_path, self._query, self._use_regex, *self._options
+            )
+            if matches:
+                yield rel_path, matches
+
+    def _run_pool(
+        self, files: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[str, Sequence[Match]]]:
+        executor = self._engine.executor()
+        files = iter(files)
+        pending: deque[tuple[list[str], Future]] = deque()
+
+        def submit_next() -> bool:
+            chunk = list(islice(files, self._engine.chunk_size))
+            if not chunk:
+                return False
+            paths = [abs_path for abs_path, _ in chunk]
+            future = executor.submit(
+                _search_chunk,
+                paths,
+                self._query,
+                self._use_regex,
+                *self._options,
+                self._deadline,
+            )
+            pending.append(([rel for _, rel in chunk], future))
+            return True
+
+        try:
+            while len(pending) < self._engine.workers * 2 and submit_next():
+                pass
+            while pending:
+                rel_paths, future = pending.popleft()
+                remaining = self._deadline - time.time() + _RESULT_GRACE
+                try:
+                    results, chunk_timed_out = future.result(timeout=max(remaining, 0))
+                except FutureTimeoutError:
+                    self.timed_out = True
+                    return
+                for rel_path, matches in zip(rel_paths, results):
+                    if matches:
+                        yield rel_path, matches
+                if chunk_timed_out:
+                    self.timed_out = True
+                    return
+                submit_next()
+        finally:
+            # Reached on completion, timeout, or when the caller stops early
+            for _, future in pending:
+                future.cancel()
+
+
+class ParallelSearchEngine:
+    """Process-pool search engine shared by search tools.
+
+    The pool is created on first use and reused across searches.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+    ):
+        """Initialize the engine.
+
+        Args:
+            workers: Worker processes (0 = CPU count)
+            chunk_size: Files per task submitted to the pool
+            inline_threshold: File counts up to this run inline without the pool
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Return the shared process pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                # Forking a threaded server is unsafe; start workers fresh
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+                logger.info(f"Started search worker pool: {self.workers} processes")
+            return self._executor
+
+    def search(
+        self,
+        files: Iterable[tuple[str, str]],
+        query: str,
+        use_regex: bool,
+        deadline: float,
+        ignore_case: bool = False,
+        multiline: bool = False,
+        context_before: int = 0,
+        context_after: int = 0,
+    ) -> SearchRun:
+        """Search files for query.
+
+        Args:
+            files: (absolute_path, relative_path) pairs, in result order
+            query: Search text or regex pattern
+            use_regex: Whether to treat query as regex
+            deadline: Absolute time after which the search stops
+            ignore_case: Case-insensitive matching
+            multiline: Allow matches to span lines
+            context_before: Lines of context to report before each match
+            context_after: Lines of context to report after each match
+
+        Returns:
+            SearchRun yielding (relative_path, matches) in input order
+
+        Raises:
+            ValueError: If query is an invalid regex
+        """
+        compile_pattern(query, use_regex, ignore_case, multiline)
+        return SearchRun(
+            self,
+            files,
+            query,
+            use_regex,
+            deadline,
+            ignore_case,
+            multiline,
+            (context_before, context_after),
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
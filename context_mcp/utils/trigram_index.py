@@ -0,0 +1,743 @@
+"""Persistent trigram index used to narrow search_in_files candidates.
+
+The index maps every lowercase byte trigram to the list of files containing it
+and is stored as a SQLite database under the cache directory, keyed by a hash
+of PROJECT_ROOT. A query is reduced to the trigrams any match must contain, so
+only files holding all of them need to be verified by the real search engine.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from array import array
+from pathlib import Path
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from context_mcp.utils.logger import logger
+from context_mcp.utils.walker import walk_files
+
+if TYPE_CHECKING:  # pragma: no cover - type checking helper
+    from context_mcp.utils.watcher import ChangeEvent, FileWatcher
+
+INDEX_VERSION = "3"
+INDEX_FILENAME = "trigram.db"
+
+# Files above this size are not tokenized; they are always treated as candidates
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+# Number of incrementally updated files after which a full rebuild is scheduled
+COMPACT_THRESHOLD = 5000
+
+# Upper bound on alternatives produced when expanding regex branches
+MAX_ALTERNATIVES = 16
+
+# Seconds a clean per-file stat sweep is trusted when no watcher is attached
+FILE_SWEEP_INTERVAL = 2.0
+
+_INLINE_IGNORECASE = re.compile(r"\(\?[a-zA-Z]*i[a-zA-Z]*[:)]")
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory (XDG_CACHE_HOME or ~/.cache)."""
+    base = os.getenv("XDG_CACHE_HOME")
+    if base:
+        return Path(base) / "context-mcp"
+    return Path.home() / ".cache" / "context-mcp"
+
+
+def index_path_for(root_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Return the on-disk index location for a project root.
+
+    Args:
+        root_path: Absolute project root
+        cache_dir: Cache directory override (default: default_cache_dir())
+
+    Returns:
+        Path to the SQLite index file
+    """
+    digest = hashlib.sha1(str(root_path).encode("utf-8")).hexdigest()[:16]
+    return (cache_dir or default_cache_dir()) / digest / INDEX_FILENAME
+
+
+def _ancestors(rel_path: str) -> list[str]:
+    """Return every directory above a root-relative path, down to the root ("")."""
+    dirs = []
+    while rel_path:
+        rel_path = os.path.dirname(rel_path)
+        dirs.append(rel_path)
+    return dirs
+
+
+def _trigram_key(gram: bytes) -> int:
+    """Pack a 3-byte trigram into an integer key."""
+    return (gram[0] << 16) | (gram[1] << 8) | gram[2]
+
+
+def extract_trigrams(data: bytes) -> set[int]:
+    """Return the set of lowercase trigram keys contained in data."""
+    data = data.lower()
+    grams = {data[i : i + 3] for i in range(len(data) - 2)}
+    return {_trigram_key(g) for g in grams}
+
+
+def _literal_trigrams(literal: str, ascii_only: bool) -> set[int]:
+    """Return trigram keys that every occurrence of literal must contain."""
+    data = literal.encode("utf-8").lower()
+    keys = set()
+    for i in range(len(data) - 2):
+        gram = data[i : i + 3]
+        if ascii_only and max(gram) >= 0x80:
+            # Non-ASCII case folding is not reflected by bytes.lower()
+            continue
+        keys.add(_trigram_key(gram))
+    return keys
+
+
+# ============================================================================
+# Query planning
+# ============================================================================
+
+# A plan is a list of alternatives; each alternative is a set of literal
+# strings that must all appear. None means the query cannot be narrowed.
+_Plan = Optional[list[set[str]]]
+
+
+def _and_plans(left: _Plan, right: _Plan) -> _Plan:
+    """Combine two plans that must both hold."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if len(left) * len(right) > MAX_ALTERNATIVES:
+        # Keep the side with fewer alternatives; dropping constraints is safe
+        return left if len(left) <= len(right) else right
+    return [a | b for a in left for b in right]
+
+
+def _plan_sequence(items) -> _Plan:
+    """Plan a parsed regex sequence (implicit concatenation)."""
+    plan: _Plan = None
+    run: list[str] = []
+
+    def flush() -> None:
+        nonlocal plan
+        if run:
+            plan = _and_plans(plan, [{"".join(run)}])
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            plan = _and_plans(plan, _plan_sequence(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            min_count, _max_count, sub = av
+            if min_count >= 1:
+                plan = _and_plans(plan, _plan_sequence(sub))
+        elif op is sre_constants.BRANCH:
+            alternatives: list[set[str]] = []
+            for branch in av[1]:
+                branch_plan = _plan_sequence(branch)
+                if branch_plan is None:
+                    alternatives = []
+                    break
+                alternatives.extend(branch_plan)
+            if alternatives and len(alternatives) <= MAX_ALTERNATIVES:
+                plan = _and_plans(plan, alternatives)
+        # Character classes, anchors, backreferences etc. break literal runs
+    flush()
+    return plan
+
+
+def plan_query(query: str, use_regex: bool) -> tuple[_Plan, bool]:
+    """Reduce a search query to required literal strings.
+
+    Args:
+        query: Search text or regex pattern
+        use_regex: Whether query is a regex
+
+    Returns:
+        Tuple of (plan, ignore_case). plan is None when the query cannot be
+        narrowed (e.g. too short or only character classes).
+    """
+    if not use_regex:
+        return [{query}], False
+
+    try:
+        parsed = sre_parser.parse(query)
+    except re.error:
+        return None, False
+
+    # Scoped flags such as (?i:...) are not tracked per literal, so treat any
+    # inline ignore-case flag as applying to the whole pattern
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE) or bool(
+        _INLINE_IGNORECASE.search(query)
+    )
+    return _plan_sequence(list(parsed)), ignore_case
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+
+class TrigramIndex:
+    """On-disk trigram index for one project root.
+
+    The database is rebuilt atomically (written to a temporary file and then
+    renamed), so readers never observe a partially written index. Between
+    rebuilds, watcher events are applied incrementally: changed files are
+    re-tokenized into an overlay table and their base postings are marked as
+    superseded, so only the touched paths are re-read.
+    """
+
+    def __init__(self, root_path: Path, cache_dir: Optional[Path] = None):
+        """Initialize index handle.
+
+        Args:
+            root_path: Absolute project root
+            cache_dir: Cache directory override
+        """
+        self.root = root_path.resolve()
+        self.db_path = index_path_for(self.root, cache_dir)
+        self._build_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: list["ChangeEvent"] = []
+        self._watcher: Optional["FileWatcher"] = None
+        self._live = False
+        self._swept_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _enumerate_files(self) -> list[str]:
+        """List files to index as root-relative POSIX paths.
+
+        Uses `rg --files` when available so the index honors the same ignore
+        rules as the ripgrep search path; otherwise walks the tree with the
+        shared walker, which applies the same .gitignore/.ignore rules.
+        """
+        rg_cmd = shutil.which("rg")
+        if rg_cmd:
+            try:
+                result = subprocess.run(
+                    [rg_cmd, "--files"],
+                    capture_output=True,
+                    text=True,
+                    cwd=str(self.root),
+                    encoding="utf-8",
+                    errors="replace",
+                )
+                if result.returncode in (0, 1):
+                    return sorted(
+                        line.replace("\\", "/")
+                        for line in result.stdout.splitlines()
+                        if line
+                    )
+            except OSError:
+                pass
+
+        return sorted(rel for _, rel in walk_files(self.root))
+
+    def _read_trigrams(self, rel_path: str) -> tuple[int, int, Optional[set[int]]]:
+        """Stat and tokenize one file.
+
+        Returns:
+            Tuple of (size, mtime_ns, trigrams). trigrams is None when the file
+            is too large or not valid UTF-8 and must always be verified.
+        """
+        abs_path = self.root / rel_path
+        st = os.stat(abs_path)
+        if st.st_size > MAX_INDEXED_FILE_SIZE:
+            return st.st_size, st.st_mtime_ns, None
+        with open(abs_path, "rb") as f:
+            data = f.read()
+        if b"\x00" in data[:1024]:
+            # Binary files are skipped by every search engine
+            return st.st_size, st.st_mtime_ns, set()
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError:
+            return st.st_size, st.st_mtime_ns, None
+        return st.st_size, st.st_mtime_ns, extract_trigrams(data)
+
+    def build(self) -> int:
+        """Build (or rebuild) the index from scratch.
+
+        Returns:
+            Number of files recorded in the index
+        """
+        with self._build_lock:
+            count = self._build()
+            if self._watcher is not None:
+                self._live = True
+        self._apply_pending()
+        return count
+
+    def _build(self) -> int:
+        """Write a new index database and atomically swap it in."""
+        start = time.time()
+        files = self._enumerate_files()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_suffix(f".tmp{os.getpid()}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        postings: dict[int, array] = {}
+        dirs: set[str] = set()
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(
+                """
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    indexed INTEGER,
+                    superseded INTEGER DEFAULT 0
+                );
+                CREATE TABLE dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER);
+                CREATE TABLE postings (trigram INTEGER PRIMARY KEY, ids BLOB);
+                CREATE TABLE overlay (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    indexed INTEGER,
+                    trigrams BLOB
+                );
+                """
+            )
+            rows = []
+            for file_id, rel_path in enumerate(files):
+                try:
+                    size, mtime_ns, grams = self._read_trigrams(rel_path)
+                except OSError:
+                    continue
+                rows.append((file_id, rel_path, size, mtime_ns, grams is not None, 0))
+                for gram in grams or ():
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array("I")
+                    posting.append(file_id)
+                dirs.update(_ancestors(rel_path))
+
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO postings VALUES (?, ?)",
+                ((gram, ids.tobytes()) for gram, ids in postings.items()),
+            )
+            dir_rows = []
+            for rel_dir in dirs:
+                try:
+                    dir_rows.append((rel_dir, os.stat(self.root / rel_dir).st_mtime_ns))
+                except OSError:
+                    continue
+            conn.executemany("INSERT INTO dirs VALUES (?, ?)", dir_rows)
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("version", INDEX_VERSION),
+                    ("root", str(self.root)),
+                    ("built_at", str(time.time())),
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.db_path)
+        self._swept_at = None
+        logger.info(
+            f"Trigram index built: {len(rows)} files in {time.time() - start:.1f}s"
+        )
+        return len(rows)
+
+    def refresh(self) -> None:
+        """Build the index if it is missing or stale.
+
+        When the on-disk index is already fresh and a watcher is attached, the
+        index becomes live without rebuilding.
+        """
+        if not self.exists() or not self.is_fresh():
+            self.build()
+        elif self._watcher is not None:
+            self._live = True
+            self._apply_pending()
+
+    def is_building(self) -> bool:
+        """Check whether a build is currently in progress."""
+        return self._build_lock.locked()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    def attach(self, watcher: "FileWatcher") -> None:
+        """Subscribe to watcher events to keep the index current.
+
+        While attached and built, the index is considered fresh without the
+        per-query stat sweep.
+
+        Args:
+            watcher: Running file watcher for the same root
+        """
+        self._watcher = watcher
+        watcher.subscribe(self.apply_changes)
+
+    def is_live(self) -> bool:
+        """Whether the index is kept current by a running watcher."""
+        return self._live and self._watcher is not None and self._watcher.running
+
+    def apply_changes(self, events: list["ChangeEvent"]) -> None:
+        """Update only the files touched by a batch of watcher events.
+
+        Args:
+            events: Coalesced change events from the watcher
+        """
+        if any(event.kind == "rescan" for event in events):
+            # Events were lost; rebuild from scratch and trust stats until then
+            self._live = False
+            with self._pending_lock:
+                self._pending.clear()
+            rebuild_in_background(self)
+            return
+
+        with self._pending_lock:
+            if self.is_building() or not self.db_path.exists():
+                self._pending.extend(events)
+                return
+            self._apply(events)
+
+    def _apply_pending(self) -> None:
+        """Apply events that arrived while a build was running."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                self._apply(pending)
+
+    def _apply(self, events: list["ChangeEvent"]) -> None:
+        """Write overlay rows for changed paths."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            touched_dirs: set[str] = set()
+            for event in events:
+                if event.is_dir:
+                    prefix = event.path.replace("%", "\\%").replace("_", "\\_") + "/%"
+                    conn.execute(
+                        "UPDATE files SET superseded=1 WHERE path LIKE ? ESCAPE '\\'",
+                        (prefix,),
+                    )
+                    conn.execute(
+                        "DELETE FROM overlay WHERE path LIKE ? ESCAPE '\\'", (prefix,)
+                    )
+                    touched_dirs.update(_ancestors(event.path))
+                    continue
+
+                conn.execute(
+                    "UPDATE files SET superseded=1 WHERE path=?", (event.path,)
+                )
+                conn.execute("DELETE FROM overlay WHERE path=?", (event.path,))
+                touched_dirs.update(_ancestors(event.path))
+                if event.kind == "deleted":
+                    continue
+                try:
+                    size, mtime_ns, grams = self._read_trigrams(event.path)
+                except OSError:
+                    continue  # Removed again before we got to it
+                blob = array("I", sorted(grams)).tobytes() if grams is not None else b""
+                conn.execute(
+                    "INSERT INTO overlay VALUES (?, ?, ?, ?, ?)",
+                    (event.path, size, mtime_ns, grams is not None, blob),
+                )
+
+            for rel_dir in touched_dirs:
+                try:
+                    mtime_ns = os.stat(self.root / rel_dir).st_mtime_ns
+                except OSError:
+                    conn.execute("DELETE FROM dirs WHERE path=?", (rel_dir,))
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs VALUES (?, ?)", (rel_dir, mtime_ns)
+                )
+            conn.commit()
+            overlay_size = conn.execute("SELECT COUNT(*) FROM overlay").fetchone()[0]
+        finally:
+            conn.close()
+
+        if overlay_size > COMPACT_THRESHOLD:
+            rebuild_in_background(self)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the index read-only, or return None if it is unusable."""
+        if not self.db_path.exists():
+            return None
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        except sqlite3.Error:
+            return None
+        if not row or row[0] != INDEX_VERSION:
+            conn.close()
+            return None
+        return conn
+
+    def exists(self) -> bool:
+        """Check whether a compatible index is present on disk."""
+        conn = self._connect()
+        if conn is None:
+            return False
+        conn.close()
+        return True
+
+    def is_fresh(self) -> bool:
+        """Check that no indexed file or directory changed since the build.
+
+        A live (watcher-maintained) index is fresh by construction. Otherwise
+        the mtimes of every directory holding indexed files catch created and
+        deleted entries on each call. In-place edits are caught by comparing
+        file size/mtime, one stat() per indexed path; a clean sweep is trusted
+        for FILE_SWEEP_INTERVAL seconds so back-to-back queries stay O(dirs).
+        """
+        if self.is_live():
+            return True
+
+        conn = self._connect()
+        if conn is None:
+            return False
+        try:
+            for rel_dir, mtime_ns in conn.execute("SELECT path, mtime_ns FROM dirs"):
+                try:
+                    if os.stat(self.root / rel_dir).st_mtime_ns != mtime_ns:
+                        return False
+                except OSError:
+                    return False
+            swept_at = self._swept_at
+            if (
+                swept_at is not None
+                and time.monotonic() - swept_at < FILE_SWEEP_INTERVAL
+            ):
+                return True
+            for rel_path, size, mtime_ns in conn.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE superseded=0 "
+                "UNION ALL SELECT path, size, mtime_ns FROM overlay"
+            ):
+                try:
+                    st = os.stat(self.root / rel_path)
+                except OSError:
+                    return False
+                if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                    return False
+            self._swept_at = time.monotonic()
+            return True
+        finally:
+            conn.close()
+
+    def candidates(
+        self, query: str, use_regex: bool, ignore_case: bool = False
+    ) -> Optional[list[str]]:
+        """Return files that may contain a match for query.
+
+        Args:
+            query: Search text or regex pattern
+            use_regex: Whether query is a regex
+            ignore_case: Whether the search is case-insensitive
+
+        Returns:
+            Sorted root-relative paths, or None if the index cannot narrow the
+            query (the caller should search every file) or is unavailable.
+        """
+        plan, inline_ignore_case = plan_query(query, use_regex)
+        if plan is None:
+            return None
+        ignore_case = ignore_case or inline_ignore_case
+
+        required_sets = []
+        for alternative in plan:
+            keys: set[int] = set()
+            for literal in alternative:
+                keys |= _literal_trigrams(literal, ascii_only=ignore_case)
+            if not keys:
+                return None
+            required_sets.append(keys)
+
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            matched_ids: set[int] = set()
+            for keys in required_sets:
+                matched_ids |= self._intersect(conn, keys)
+            matched_ids.difference_update(
+                row[0]
+                for row in conn.execute("SELECT id FROM files WHERE superseded=1")
+            )
+            matched_ids.update(
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM files WHERE indexed=0 AND superseded=0"
+                )
+            )
+            paths = self._paths_for(conn, matched_ids)
+            paths.extend(self._overlay_candidates(conn, required_sets))
+        finally:
+            conn.close()
+        return sorted(paths)
+
+    @staticmethod
+    def _overlay_candidates(
+        conn: sqlite3.Connection, required_sets: list[set[int]]
+    ) -> list[str]:
+        """Match incrementally indexed files against the required trigrams."""
+        paths = []
+        for rel_path, indexed, blob in conn.execute(
+            "SELECT path, indexed, trigrams FROM overlay"
+        ):
+            if not indexed:
+                paths.append(rel_path)
+                continue
+            grams = array("I")
+            grams.frombytes(blob)
+            gram_set = set(grams)
+            if any(keys <= gram_set for keys in required_sets):
+                paths.append(rel_path)
+        return paths
+
+    @staticmethod
+    def _intersect(conn: sqlite3.Connection, keys: Iterable[int]) -> set[int]:
+        """Intersect posting lists for all trigram keys."""
+        lists = []
+        for key in keys:
+            row = conn.execute(
+                "SELECT ids FROM postings WHERE trigram=?", (key,)
+            ).fetchone()
+            if row is None:
+                return set()
+            ids = array("I")
+            ids.frombytes(row[0])
+            lists.append(ids)
+        lists.sort(key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _paths_for(conn: sqlite3.Connection, ids: set[int]) -> list[str]:
+        """Map file ids back to relative paths."""
+        paths: list[str] = []
+        id_list = list(ids)
+        for i in range(0, len(id_list), 500):
+            chunk = id_list[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            paths.extend(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT path FROM files WHERE id IN ({placeholders})", chunk
+                )
+            )
+        return paths
+
+    def stats(self) -> dict:
+        """Return index health metrics.
+
+        Returns:
+            dict with keys: path, present, building, live, files, overlay_files
+        """
+        stats = {
+            "path": str(self.db_path),
+            "present": False,
+            "building": self.is_building(),
+            "live": self.is_live(),
+            "files": 0,
+            "overlay_files": 0,
+        }
+        conn = self._connect()
+        if conn is None:
+            return stats
+        try:
+            stats["present"] = True
+            stats["files"] = conn.execute(
+                "SELECT COUNT(*) FROM files WHERE superseded=0"
+            ).fetchone()[0]
+            stats["overlay_files"] = conn.execute(
+                "SELECT COUNT(*) FROM overlay"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        return stats
+
+
+def ensure_index(index: TrigramIndex) -> None:
+    """Build the index if it is missing or stale.
+
+    Args:
+        index: Index handle to check and (re)build
+    """
+    try:
+        index.refresh()
+    except Exception as e:  # pragma: no cover - background thread safety net
+        logger.warning(f"Trigram index build failed: {e}")
+
+
+def _rebuild(index: TrigramIndex) -> None:
+    """Unconditionally rebuild the index (background thread target)."""
+    try:
+        index.build()
+    except Exception as e:  # pragma: no cover - background thread safety net
+        logger.warning(f"Trigram index rebuild failed: {e}")
+
+
+def _start_background(
+    index: TrigramIndex, target: Callable[[TrigramIndex], None]
+) -> bool:
+    """Run target on a daemon thread unless a build is already running."""
+    if index.is_building():
+        return False
+    thread = threading.Thread(
+        target=target, args=(index,), name="trigram-index", daemon=True
+    )
+    thread.start()
+    return True
+
+
+def ensure_index_in_background(index: TrigramIndex) -> bool:
+    """Run ensure_index on a daemon thread unless a build is already running.
+
+    Args:
+        index: Index handle to check and (re)build
+
+    Returns:
+        True if a background check was started
+    """
+    return _start_background(index, ensure_index)
+
+
+def rebuild_in_background(index: TrigramIndex) -> bool:
+    """Rebuild the index on a daemon thread unless a build is already running.
+
+    Args:
+        index: Index handle to rebuild
+
+    Returns:
+        True if a background rebuild was started
+    """
+    return _start_background(index, _rebuild)
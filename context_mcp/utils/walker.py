@@ -0,0 +1,190 @@
+"""Shared file-tree walker for the Python fallbacks.
+
+walk_files enumerates the files under a directory with os.scandir, pruning
+version-control directories and, unless disabled, everything excluded by
+.gitignore/.ignore files (see IgnoreMatcher), so ignored directories such as
+node_modules or .venv are never descended into. Hidden files and directories
+(names starting with ".") are skipped as ripgrep and fd skip them, though the
+ignore files among them are still read. Symlinked directories are not
+followed.
+
+Inside a git work tree the walk can take the tracked files from the git index
+(see TrackedFiles). When untracked files are excluded no directory is listed
+at all; otherwise the disk is walked as usual, but tracked files and the
+directories holding them are never dropped by ignore rules, as in git.
+"""
+
+import os
+import stat
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+from context_mcp.utils.gitignore import VCS_DIRS, IGNORE_FILES, IgnoreMatcher, RuleChain
+
+if TYPE_CHECKING:
+    from context_mcp.utils.git_index import TrackedFiles
+
+
+def rel_dir_prefix(abs_path: Path, root_path: Path) -> str:
+    """Root-relative POSIX prefix ("" or "dir/") for paths under abs_path."""
+    try:
+        rel = abs_path.relative_to(root_path).as_posix()
+    except ValueError:
+        return ""
+    return "" if rel == "." else rel + "/"
+
+
+class IndexedFile:
+    """Tracked file from the git index, standing in for an os.DirEntry.
+
+    Attributes:
+        path: Absolute path
+        name: Basename
+    """
+
+    __slots__ = ("path", "name", "_stat")
+
+    def __init__(self, path: str, name: str, st: os.stat_result):
+        self.path = path
+        self.name = name
+        self._stat = st
+
+    def stat(self) -> os.stat_result:
+        """Stat result taken when the file was enumerated."""
+        return self._stat
+
+    def is_file(self) -> bool:
+        """Always True: only regular files are enumerated."""
+        return True
+
+
+def is_hidden(rel_path: str) -> bool:
+    """Whether a relative path has a hidden component (name starting with ".")."""
+    return rel_path.startswith(".") or "/." in rel_path
+
+
+def _tracked_files(
+    root: Path, prefix: str, tracked: "TrackedFiles", sort: bool, hidden: bool
+) -> Iterator[tuple[IndexedFile, str]]:
+    """Yield the tracked files under prefix that exist as regular files."""
+    cut = len(prefix)
+    paths = [
+        rel
+        for rel in tracked.paths()
+        if rel.startswith(prefix) and (hidden or not is_hidden(rel[cut:]))
+    ]
+    if sort:
+        # The index is in byte order; walk order compares component by component
+        paths.sort(key=lambda rel: rel.split("/"))
+    base = str(root)
+    for rel in paths:
+        path = os.path.join(base, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # Deleted but not yet staged
+        if stat.S_ISREG(st.st_mode):
+            yield IndexedFile(path, rel[rel.rfind("/") + 1 :], st), rel
+
+
+def walk_files(
+    root: Path,
+    start: Optional[Path] = None,
+    respect_ignore: bool = True,
+    sort: bool = False,
+    tracked: Optional["TrackedFiles"] = None,
+    hidden: bool = False,
+) -> Iterator[tuple[Union[os.DirEntry, IndexedFile], str]]:
+    """Yield the files under a directory.
+
+    The start directory itself is never treated as ignored (like a path given
+    to ripgrep explicitly); its contents are matched against the ignore files
+    of the start directory, its ancestors up to root, and its descendants.
+
+    Args:
+        root: Absolute project root; yielded paths are relative to it
+        start: Directory to walk (default: root)
+        respect_ignore: Whether to skip paths excluded by ignore files
+        sort: Yield in component-wise path order (like `rg --sort path`)
+            instead of directory order
+        tracked: Tracked files of the git work tree rooted at root; used only
+            when respect_ignore is set
+        hidden: Also yield hidden files and enter hidden directories below
+            start (version-control directories are pruned regardless)
+
+    Yields:
+        (DirEntry or IndexedFile, root-relative POSIX path) for each regular
+        file (or symlink to one); nothing if start lies outside root
+    """
+    start = start or root
+    try:
+        start.relative_to(root)
+    except ValueError:
+        return  # Nothing outside the root has a root-relative path
+    prefix = rel_dir_prefix(start, root)
+    if not respect_ignore:
+        tracked = None
+    if tracked is not None and not tracked.include_untracked:
+        yield from _tracked_files(root, prefix, tracked, sort, hidden)
+        return
+    # Tracked paths stay visible whatever the ignore files say
+    tracked_files = tracked.entries() if tracked is not None else {}
+    tracked_dirs = tracked.dirs() if tracked is not None else frozenset()
+    matcher = IgnoreMatcher(root) if respect_ignore else None
+    chain: RuleChain = matcher.chain_for(prefix) if matcher is not None else ()
+
+    # Depth-first, with one pending-entry iterator per open directory; a None
+    # chain marks an ignored directory entered only for its tracked files
+    stack: list[tuple[Iterator[os.DirEntry], str, Optional[RuleChain]]] = []
+
+    def open_dir(
+        dir_path: str,
+        rel_prefix: str,
+        parent_chain: Optional[RuleChain],
+        is_start: bool,
+    ) -> None:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return
+        dir_chain = parent_chain
+        if (
+            matcher is not None
+            and parent_chain is not None
+            and not is_start
+            and any(entry.name in IGNORE_FILES for entry in entries)
+        ):
+            dir_chain = matcher.extend(parent_chain, dir_path, rel_prefix)
+        if sort:
+            entries.sort(key=lambda entry: entry.name)
+        stack.append((iter(entries), rel_prefix, dir_chain))
+
+    # chain_for already holds the start directory's own rules
+    open_dir(str(start), prefix, chain, is_start=True)
+    while stack:
+        entries, rel_prefix, dir_chain = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        if not hidden and entry.name.startswith("."):
+            continue
+        rel = rel_prefix + entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir and entry.name in VCS_DIRS:
+                continue
+            child_chain = dir_chain
+            if matcher is not None and (
+                dir_chain is None or matcher.ignored(dir_chain, rel, entry.name, is_dir)
+            ):
+                if rel not in (tracked_dirs if is_dir else tracked_files):
+                    continue
+                child_chain = None
+            if is_dir:
+                open_dir(entry.path, rel + "/", child_chain, is_start=False)
+            elif entry.is_file():
+                yield entry, rel
+        except OSError:
+            continue
@@ -0,0 +1,540 @@
+"""Filesystem watcher: emits change events for files under PROJECT_ROOT.
+
+Uses inotify on Linux (through ctypes, no extra dependency) and falls back to
+periodic mtime/size snapshots elsewhere or when inotify is exhausted. Events
+are queued by a producer thread and delivered in coalesced batches to
+subscribers (caches and indexes) by a dispatcher thread, so consumers only
+update the touched paths instead of rebuilding.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import platform
+import queue
+import select
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Literal, Optional
+
+from context_mcp.utils.gitignore import VCS_DIRS
+from context_mcp.utils.logger import logger
+from context_mcp.utils.metrics import (
+    register_metrics_provider,
+    unregister_metrics_provider,
+)
+
+# Version control metadata and hidden directories: the walker, ripgrep and the
+# consumers never list them. Directories the walker does list (node_modules,
+# build output) must stay watched, or the catalog and the index would keep
+# serving stale entries for them. Entries are fnmatch patterns matched against
+# the directory name.
+DEFAULT_IGNORED_DIRS = VCS_DIRS | frozenset({".*"})
+
+# Maximum number of queued events before the watcher declares an overflow
+MAX_QUEUE_SIZE = 100_000
+
+# Window used to compute the events/sec rate
+RATE_WINDOW_SECONDS = 10
+
+EventKind = Literal["created", "modified", "deleted", "rescan"]
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """Single filesystem change.
+
+    Attributes:
+        path: Root-relative POSIX path ("" for rescan events)
+        kind: created, modified, deleted, or rescan (consumers must resync)
+        is_dir: Whether the path is a directory
+    """
+
+    path: str
+    kind: EventKind
+    is_dir: bool = False
+
+
+Subscriber = Callable[[list[ChangeEvent]], None]
+Emit = Callable[[ChangeEvent], None]
+
+
+def _rel(root: Path, path: str) -> str:
+    """Convert an absolute path string into a root-relative POSIX path."""
+    rel = os.path.relpath(path, root)
+    return "" if rel == "." else rel.replace(os.sep, "/")
+
+
+def _is_ignored_dir(name: str, ignored_dirs: frozenset[str]) -> bool:
+    """Check a directory name against the ignored directory patterns."""
+    return name in ignored_dirs or any(
+        fnmatch.fnmatchcase(name, pattern) for pattern in ignored_dirs
+    )
+
+
+def _walk_dirs(root: Path, ignored_dirs: frozenset[str]):
+    """Yield (dirpath, filenames) for every non-ignored directory under root."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not _is_ignored_dir(d, ignored_dirs)]
+        yield dirpath, filenames
+
+
+# ============================================================================
+# Backends
+# ============================================================================
+
+
+class PollingBackend:
+    """Detects changes by diffing periodic (mtime_ns, size) snapshots."""
+
+    name = "poll"
+
+    def __init__(self, root: Path, ignored_dirs: frozenset[str], interval: float):
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.interval = interval
+        self.watched_count = 0
+        self.on_rescan: Callable[[], None] = lambda: None
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        """Stat every file under root."""
+        snapshot = {}
+        for dirpath, filenames in _walk_dirs(self.root, self.ignored_dirs):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                snapshot[_rel(self.root, full)] = (st.st_mtime_ns, st.st_size)
+        self.watched_count = len(snapshot)
+        self.on_rescan()
+        return snapshot
+
+    def run(self, emit: Emit, stop: threading.Event) -> None:
+        """Poll until stop is set."""
+        previous = self._snapshot()
+        while not stop.wait(self.interval):
+            current = self._snapshot()
+            for path, state in current.items():
+                old = previous.get(path)
+                if old is None:
+                    emit(ChangeEvent(path, "created"))
+                elif old != state:
+                    emit(ChangeEvent(path, "modified"))
+            for path in previous.keys() - current.keys():
+                emit(ChangeEvent(path, "deleted"))
+            previous = current
+
+
+class InotifyBackend:
+    """Linux inotify backend with one watch per directory."""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (
+        IN_MODIFY
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+        | IN_ONLYDIR
+    )
+
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, root: Path, ignored_dirs: frozenset[str]):
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.on_rescan: Callable[[], None] = lambda: None
+        self._wd_to_dir: dict[int, str] = {}
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    @property
+    def watched_count(self) -> int:
+        """Number of directories currently watched."""
+        return len(self._wd_to_dir)
+
+    def _add_watch(self, dirpath: str) -> None:
+        """Add a watch for one directory.
+
+        Raises:
+            OSError: If the kernel watch limit is exhausted
+        """
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(dirpath), ctypes.c_uint32(self.WATCH_MASK)
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if errno == 28:  # ENOSPC: fs.inotify.max_user_watches reached
+                raise OSError(errno, "inotify watch limit reached")
+            return  # Directory vanished or is unreadable
+        self._wd_to_dir[wd] = dirpath
+
+    def _add_tree(self, top: str, emit: Optional[Emit] = None) -> None:
+        """Watch top and all its subdirectories, optionally emitting files."""
+        for dirpath, filenames in _walk_dirs(Path(top), self.ignored_dirs):
+            self._add_watch(dirpath)
+            if emit is not None:
+                for name in filenames:
+                    emit(
+                        ChangeEvent(
+                            _rel(self.root, os.path.join(dirpath, name)), "created"
+                        )
+                    )
+
+    def close(self) -> None:
+        """Release the inotify file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def run(self, emit: Emit, stop: threading.Event) -> None:
+        """Read inotify events until stop is set."""
+        try:
+            self._add_tree(str(self.root))
+            self.on_rescan()
+            while not stop.is_set():
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    buffer = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._dispatch(buffer, emit)
+        finally:
+            self.close()
+
+    def _dispatch(self, buffer: bytes, emit: Emit) -> None:
+        """Decode a buffer of raw inotify events."""
+        offset = 0
+        header_size = self._EVENT_HEADER.size
+        while offset + header_size <= len(buffer):
+            wd, mask, _cookie, length = self._EVENT_HEADER.unpack_from(buffer, offset)
+            raw_name = buffer[offset + header_size : offset + header_size + length]
+            offset += header_size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                emit(ChangeEvent("", "rescan"))
+                continue
+
+            dirpath = self._wd_to_dir.get(wd)
+            if dirpath is None:
+                continue
+            if mask & self.IN_IGNORED:
+                self._wd_to_dir.pop(wd, None)
+                continue
+            if mask & self.IN_DELETE_SELF:
+                continue  # Reported through the parent's IN_DELETE
+
+            name = os.fsdecode(raw_name.rstrip(b"\x00"))
+            if not name:
+                continue
+            full = os.path.join(dirpath, name)
+            rel = _rel(self.root, full)
+            is_dir = bool(mask & self.IN_ISDIR)
+
+            if is_dir and _is_ignored_dir(name, self.ignored_dirs):
+                continue
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                if is_dir:
+                    self._add_tree(full, emit)
+                else:
+                    emit(ChangeEvent(rel, "created"))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                emit(ChangeEvent(rel, "deleted", is_dir=is_dir))
+            elif mask & (self.IN_MODIFY | self.IN_CLOSE_WRITE) and not is_dir:
+                emit(ChangeEvent(rel, "modified"))
+
+
+# ============================================================================
+# Watcher
+# ============================================================================
+
+
+class FileWatcher:
+    """Background watcher that fans out change events to subscribers."""
+
+    def __init__(
+        self,
+        root_path: Path,
+        mode: str = "auto",
+        poll_interval: float = 2.0,
+        ignored_dirs: frozenset[str] = DEFAULT_IGNORED_DIRS,
+    ):
+        """Initialize watcher (call start() to begin watching).
+
+        Args:
+            root_path: Absolute project root
+            mode: auto, inotify, or poll
+            poll_interval: Seconds between snapshots in polling mode
+            ignored_dirs: Directory name patterns that are never watched
+        """
+        self.root = root_path.resolve()
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.ignored_dirs = ignored_dirs
+
+        self._queue: queue.Queue[ChangeEvent] = queue.Queue(maxsize=MAX_QUEUE_SIZE)
+        self._subscribers: list[Subscriber] = []
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._backend: Optional[PollingBackend | InotifyBackend] = None
+        self._lock = threading.Lock()
+
+        self._events_total = 0
+        self._dropped = 0
+        self._overflowed = False
+        self._full_rescans = 0
+        self._last_full_rescan: Optional[float] = None
+        self._rate_buckets: deque[list[float]] = deque()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _create_backend(self) -> PollingBackend | InotifyBackend:
+        """Pick the backend for the configured mode."""
+        if self.mode in ("auto", "inotify") and platform.system() == "Linux":
+            try:
+                return InotifyBackend(self.root, self.ignored_dirs)
+            except (OSError, AttributeError) as e:
+                if self.mode == "inotify":
+                    raise
+                logger.warning(f"inotify unavailable ({e}), using polling watcher")
+        return PollingBackend(self.root, self.ignored_dirs, self.poll_interval)
+
+    def start(self) -> None:
+        """Start producer and dispatcher threads."""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._backend = self._create_backend()
+        self._backend.on_rescan = self._record_rescan
+
+        producer = threading.Thread(
+            target=self._produce, name="watcher-producer", daemon=True
+        )
+        dispatcher = threading.Thread(
+            target=self._dispatch, name="watcher-dispatch", daemon=True
+        )
+        self._threads = [producer, dispatcher]
+        producer.start()
+        dispatcher.start()
+        logger.info(f"File watcher started ({self._backend.name}) on {self.root}")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the watcher and wait for its threads to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the watcher threads are alive."""
+        return bool(self._threads) and all(t.is_alive() for t in self._threads)
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        """Name of the active backend, if started."""
+        return self._backend.name if self._backend else None
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Register a callback receiving batches of coalesced events."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """Remove a previously registered callback."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Threads
+    # ------------------------------------------------------------------
+
+    def _produce(self) -> None:
+        """Run the backend, switching to polling if inotify runs out of watches."""
+        assert self._backend is not None
+        try:
+            self._backend.run(self._emit, self._stop)
+        except OSError as e:
+            if isinstance(self._backend, PollingBackend) or self._stop.is_set():
+                logger.error(f"File watcher stopped: {e}")
+                return
+            logger.warning(f"inotify failed ({e}), switching to polling watcher")
+            self._backend = PollingBackend(
+                self.root, self.ignored_dirs, self.poll_interval
+            )
+            self._backend.on_rescan = self._record_rescan
+            self._emit(ChangeEvent("", "rescan"))
+            self._backend.run(self._emit, self._stop)
+
+    def _emit(self, event: ChangeEvent) -> None:
+        """Queue one event, flagging an overflow when the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._dropped += 1
+            self._overflowed = True
+
+    def _dispatch(self) -> None:
+        """Deliver coalesced event batches to subscribers."""
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < 4096:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._overflowed:
+                self._overflowed = False
+                batch.append(ChangeEvent("", "rescan"))
+            self._deliver(self._coalesce(batch))
+
+    @staticmethod
+    def _coalesce(batch: list[ChangeEvent]) -> list[ChangeEvent]:
+        """Keep only the latest event per path (rescans collapse to one)."""
+        latest: dict[tuple[str, bool], ChangeEvent] = {}
+        rescan = False
+        for event in batch:
+            if event.kind == "rescan":
+                rescan = True
+                continue
+            key = (event.path, event.is_dir)
+            latest.pop(key, None)
+            latest[key] = event
+        events = list(latest.values())
+        if rescan:
+            events.append(ChangeEvent("", "rescan"))
+        return events
+
+    def _deliver(self, events: list[ChangeEvent]) -> None:
+        """Invoke every subscriber, isolating their failures."""
+        self._record_events(len(events))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(events)
+            except Exception as e:
+                logger.warning(f"Watcher subscriber failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    def _record_rescan(self) -> None:
+        self._full_rescans += 1
+        self._last_full_rescan = time.time()
+
+    def _record_events(self, count: int) -> None:
+        now = time.time()
+        second = float(int(now))
+        self._events_total += count
+        if self._rate_buckets and self._rate_buckets[-1][0] == second:
+            self._rate_buckets[-1][1] += count
+        else:
+            self._rate_buckets.append([second, float(count)])
+        while (
+            self._rate_buckets and self._rate_buckets[0][0] <= now - RATE_WINDOW_SECONDS
+        ):
+            self._rate_buckets.popleft()
+
+    def stats(self) -> dict:
+        """Return watcher health metrics.
+
+        Returns:
+            dict with keys: backend, running, queue_depth, events_total,
+            events_per_sec, dropped_events, watched, full_rescans,
+            last_full_rescan (epoch seconds or None)
+        """
+        cutoff = time.time() - RATE_WINDOW_SECONDS
+        recent = sum(count for second, count in self._rate_buckets if second > cutoff)
+        return {
+            "backend": self.backend_name,
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "events_total": self._events_total,
+            "events_per_sec": round(recent / RATE_WINDOW_SECONDS, 2),
+            "dropped_events": self._dropped,
+            "watched": self._backend.watched_count if self._backend else 0,
+            "full_rescans": self._full_rescans,
+            "last_full_rescan": self._last_full_rescan,
+        }
+
+
+# ============================================================================
+# Process-wide watcher
+# ============================================================================
+
+_active_watcher: Optional[FileWatcher] = None
+
+
+def start_watcher(
+    root_path: Path, mode: str = "auto", poll_interval: float = 2.0
+) -> FileWatcher:
+    """Start the process-wide watcher (idempotent).
+
+    Args:
+        root_path: Absolute project root
+        mode: auto, inotify, or poll
+        poll_interval: Seconds between snapshots in polling mode
+
+    Returns:
+        The running FileWatcher
+    """
+    global _active_watcher
+    if _active_watcher is None:
+        _active_watcher = FileWatcher(root_path, mode=mode, poll_interval=poll_interval)
+        _active_watcher.start()
+        register_metrics_provider("watcher", _active_watcher.stats)
+    return _active_watcher
+
+
+def get_watcher() -> Optional[FileWatcher]:
+    """Return the process-wide watcher, if one was started."""
+    return _active_watcher
+
+
+def stop_watcher() -> None:
+    """Stop and discard the process-wide watcher."""
+    global _active_watcher
+    if _active_watcher is not None:
+        _active_watcher.stop()
+        unregister_metrics_provider("watcher")
+        _active_watcher = None
@@ -4,6 +4,9 @@ These tests verify that the MCP tool implementations conform to the contract
 specifications defined in contracts/navigation_tools.json and read_project_context.json.
 """
 
+import shutil
+import subprocess
+
 import pytest
 from context_mcp.tools.navigation import list_directory, show_tree, read_project_context
 
@@ -148,6 +151,57 @@ class TestListDirectoryContract:
             names = [e["name"] for e in result["entries"]]
             assert names == sorted(names)
 
+    @pytest.fixture
+    def listing_project(self, tmp_path, monkeypatch):
+        """Directory with files of distinct sizes, a subdirectory and a broken link."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        for i, name in enumerate(["c.txt", "a.txt", "e.txt", "b.txt", "d.txt"]):
+            (docs / name).write_text("x" * (10 * (i + 1)), encoding="utf-8")
+        (docs / "sub").mkdir()
+        (docs / "dangling").symlink_to(docs / "missing")
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.validator", PathValidator(tmp_path)
+        )
+        return docs
+
+    @pytest.mark.parametrize(
+        "sort_by,order",
+        [
+            ("name", "asc"),
+            ("name", "desc"),
+            ("size", "asc"),
+            ("size", "desc"),
+            ("time", "desc"),
+        ],
+    )
+    def test_limit_matches_full_sort(self, listing_project, sort_by, order):
+        """Test that a limited listing is the prefix of the full sorted listing."""
+        full = list_directory(path="docs", sort_by=sort_by, order=order)
+        limited = list_directory(path="docs", sort_by=sort_by, order=order, limit=3)
+
+        assert full["total"] == limited["total"] == 7
+        assert limited["truncated"] is True
+        assert limited["entries"] == full["entries"][:3]
+
+    def test_entry_types_sizes_and_paths(self, listing_project):
+        """Test entry metadata, including a broken symlink listed as a file."""
+        result = list_directory(path="docs", sort_by="size", order="desc", limit=2)
+        entries = {e["name"]: e for e in list_directory(path="docs")["entries"]}
+
+        assert [e["name"] for e in result["entries"]] == ["d.txt", "b.txt"]
+        assert entries["sub"]["type"] == "dir"
+        assert entries["sub"]["size"] == 0
+        assert entries["a.txt"]["size"] == 20
+        assert entries["a.txt"]["path"] == "docs/a.txt"
+        assert entries["dangling"]["type"] == "file"
+
 
 class TestShowTreeContract:
     """Contract tests for show_tree tool."""
@@ -199,6 +253,131 @@ class TestShowTreeContract:
         if "children" in tree:
             assert isinstance(tree["children"], list)
 
+    @pytest.fixture
+    def tree_project(self, tmp_path, monkeypatch):
+        """Project with a wide directory, nested directories and ignored dirs."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        wide = tmp_path / "wide"
+        wide.mkdir()
+        for i in range(10):
+            (wide / f"f{i}.txt").write_text("x", encoding="utf-8")
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        (tmp_path / "src" / "pkg" / "mod.py").write_text("x", encoding="utf-8")
+        (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.validator", PathValidator(tmp_path)
+        )
+        return tmp_path
+
+    def test_children_per_dir_truncated(self, tree_project):
+        """Test that wide directories show the first children and count the rest."""
+        result = show_tree(path="wide", max_children_per_dir=3)
+
+        assert [c["name"] for c in result["tree"]["children"]] == [
+            "f0.txt",
+            "f1.txt",
+            "f2.txt",
+        ]
+        assert result["tree"]["truncated"] is True
+        assert result["tree"]["omitted"] == 7
+        assert result["truncated"] is True
+        assert result["total_entries"] == 3
+
+    def test_ignored_directories_pruned(self, tree_project):
+        """Test that ignored directories are listed but not expanded."""
+        tree = show_tree(path=".")["tree"]
+        children = {c["name"]: c for c in tree["children"]}
+
+        assert children["node_modules"]["pruned"] is True
+        assert "children" not in children["node_modules"]
+        assert children["src"]["children"][0]["name"] == "pkg"
+
+        expanded = show_tree(path=".", ignore_patterns=[])["tree"]
+        node_modules = [c for c in expanded["children"] if c["name"] == "node_modules"][
+            0
+        ]
+        assert node_modules["children"][0]["name"] == "dep"
+
+    def test_entry_budget_stops_walk(self, tree_project):
+        """Test that the walk stops once max_entries nodes are produced."""
+        result = show_tree(path=".", max_entries=3, max_depth=5)
+        children = {c["name"]: c for c in result["tree"]["children"]}
+
+        # The top level fills the budget first; deeper levels are not scanned
+        assert result["total_entries"] == 3
+        assert result["truncated"] is True
+        assert children["src"]["truncated"] is True
+        assert "children" not in children["src"]
+
+    def test_gitignored_entries_hidden(self, tree_project, monkeypatch):
+        """Test that show_tree and list_directory leave out gitignored entries."""
+        from context_mcp.config import ProjectConfig
+
+        (tree_project / ".gitignore").write_text("wide/\n*.py\n", encoding="utf-8")
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.config", ProjectConfig(root_path=tree_project)
+        )
+
+        tree = show_tree(path=".")["tree"]
+        names = [c["name"] for c in tree["children"]]
+        src = [c for c in tree["children"] if c["name"] == "src"][0]
+        listing = list_directory(path=".")
+        everything = list_directory(path=".", respect_gitignore=False)
+
+        assert "wide" not in names
+        assert "children" not in src["children"][0]
+        assert [e["name"] for e in listing["entries"]] == [
+            ".gitignore",
+            "node_modules",
+            "src",
+        ]
+        assert everything["total"] == 4
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+    @pytest.mark.parametrize("include_untracked", [True, False])
+    def test_git_tracked_entries(self, tree_project, monkeypatch, include_untracked):
+        """Test that tracked files survive ignore rules and untracked ones can be hidden."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.utils.git_index import TrackedFiles
+
+        (tree_project / ".gitignore").write_text("wide/\n", encoding="utf-8")
+        subprocess.run(["git", "init", "-q"], cwd=tree_project, check=True)
+        subprocess.run(
+            ["git", "add", "-f", ".gitignore", "wide/f1.txt"],
+            cwd=tree_project,
+            check=True,
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.config", ProjectConfig(root_path=tree_project)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.navigation.tracked_files",
+            TrackedFiles(
+                tree_project, tree_project, tree_project / ".git", include_untracked
+            ),
+        )
+
+        tree = show_tree(path=".")["tree"]
+        names = [c["name"] for c in tree["children"]]
+        wide = [c for c in tree["children"] if c["name"] == "wide"][0]
+        listing = list_directory(path=".")
+
+        # An ignored directory shows its tracked files only
+        assert [c["name"] for c in wide["children"]] == ["f1.txt"]
+        if include_untracked:
+            assert names == [".git", ".gitignore", "node_modules", "src", "wide"]
+        else:
+            assert names == [".gitignore", "wide"]
+        assert [e["name"] for e in listing["entries"]] == names
+
+    def test_limits_validated(self, tree_project):
+        """Test that limits below 1 are rejected."""
+        with pytest.raises(ValueError, match="max_entries"):
+            show_tree(path=".", max_entries=0)
+        with pytest.raises(ValueError, match="max_children_per_dir"):
+            show_tree(path=".", max_children_per_dir=0)
+
     def test_output_schema_recursive_structure(self):
         """Test that children nodes have same structure as parent."""
         result = show_tree(path=".", max_depth=2)
@@ -1,12 +1,13 @@
 """Contract tests for read tools.
 
-Tests for: read_entire_file, read_file_lines, read_file_tail, read_files
+Tests for: read_entire_file, read_file_lines, read_file_ranges, read_file_tail, read_files
 """
 
 import pytest
 from context_mcp.tools.read import (
     read_entire_file,
     read_file_lines,
+    read_file_ranges,
     read_file_tail,
     read_files,
 )
@@ -37,6 +38,28 @@ class TestReadEntireFileContract:
         assert isinstance(result["line_count"], int)
         assert isinstance(result["file_path"], str)
 
+    def test_encoding_detection_reported(self, tmp_path, monkeypatch):
+        """Test that the response reports which detection path was taken."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        (tmp_path / "ascii.txt").write_bytes(b"plain\n")
+        (tmp_path / "latin1.txt").write_bytes("déjà vu, café\n".encode("latin-1") * 20)
+
+        result = read_entire_file(file_path="ascii.txt")
+        assert result["encoding"] == "utf-8"
+        assert result["encoding_detection"] == "ascii"
+
+        result = read_entire_file(file_path="latin1.txt")
+        assert result["encoding_detection"] == "chardet"
+        assert result["content"].startswith("déjà vu, café")
+
+        monkeypatch.setattr("context_mcp.tools.read.encoding_detection", "fixed")
+        monkeypatch.setattr("context_mcp.tools.read.default_encoding", "latin-1")
+        result = read_entire_file(file_path="latin1.txt")
+        assert result["encoding"] == "latin-1"
+        assert result["encoding_detection"] == "fixed"
+
     def test_error_path_security_error(self):
         """Test PATH_SECURITY_ERROR for paths outside root."""
         with pytest.raises(Exception) as exc_info:
@@ -56,6 +79,100 @@ class TestReadEntireFileContract:
         )
 
 
+class TestReadEntireFileLimits:
+    """Tests for byte and line budgets of read_entire_file."""
+
+    @pytest.fixture
+    def root(self, tmp_path, monkeypatch):
+        """Project root with the read validator pointed at it."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        return tmp_path
+
+    def test_untruncated_response(self, root):
+        """Test that small files are returned whole with continuation fields unset."""
+        (root / "small.txt").write_text("a\nb\n", encoding="utf-8")
+
+        result = read_entire_file(file_path="small.txt")
+        assert result["content"] == "a\nb\n"
+        assert result["truncated"] is False
+        assert result["total_bytes"] == 4
+        assert result["next_offset"] is None
+        assert result["next_line"] is None
+
+    def test_max_bytes_ends_on_line_break(self, root):
+        """Test that a byte-limited read stops after the last whole line."""
+        (root / "log.txt").write_text("alpha\nbeta\ngamma\n", encoding="utf-8")
+
+        result = read_entire_file(file_path="log.txt", max_bytes=13)
+        assert result["content"] == "alpha\nbeta\n"
+        assert result["truncated"] is True
+        assert result["total_bytes"] == 17
+        assert result["next_offset"] == 11
+        assert result["next_line"] == 3
+
+        rest = read_entire_file(file_path="log.txt", offset=result["next_offset"])
+        assert rest["content"] == "gamma\n"
+        assert rest["truncated"] is False
+
+    def test_max_lines(self, root):
+        """Test that max_lines limits the number of returned lines."""
+        (root / "many.txt").write_text(
+            "".join(f"line {i}\n" for i in range(1, 100001)), encoding="utf-8"
+        )
+
+        result = read_entire_file(file_path="many.txt", max_lines=2)
+        assert result["content"] == "line 1\nline 2\n"
+        assert result["line_count"] == 2
+        assert result["next_line"] == 3
+
+        result = read_entire_file(
+            file_path="many.txt", max_lines=2, offset=result["next_offset"]
+        )
+        assert result["content"] == "line 3\nline 4\n"
+        assert result["next_line"] == 5
+
+    def test_server_cap_applies(self, root, monkeypatch):
+        """Test that the server-wide cap bounds explicit and default limits."""
+        monkeypatch.setattr("context_mcp.tools.read.read_max_bytes", 8)
+        (root / "log.txt").write_text("1234\n5678\n90\n", encoding="utf-8")
+
+        assert read_entire_file(file_path="log.txt")["content"] == "1234\n"
+        assert (
+            read_entire_file(file_path="log.txt", max_bytes=100)["content"] == "1234\n"
+        )
+
+    def test_long_line_cut_at_character_boundary(self, root):
+        """Test that a line longer than the limit is not split inside a character."""
+        (root / "wide.txt").write_text("ééééé\n", encoding="utf-8")
+
+        result = read_entire_file(file_path="wide.txt", max_bytes=5)
+        assert result["content"] == "éé"
+        assert result["next_offset"] == 4
+        assert result["next_line"] == 1
+
+    def test_utf16_truncation(self, root):
+        """Test truncation of UTF-16 text respects code units and the BOM."""
+        (root / "wide.txt").write_text("one\ntwo\nthree\n", encoding="utf-16")
+
+        result = read_entire_file(file_path="wide.txt", max_lines=1)
+        assert result["content"] == "one\n"
+        rest = read_entire_file(file_path="wide.txt", offset=result["next_offset"])
+        assert rest["content"] == "two\nthree\n"
+
+    def test_invalid_limits(self, root):
+        """Test that non-positive limits and offsets past the end are rejected."""
+        (root / "a.txt").write_text("a\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="max_bytes"):
+            read_entire_file(file_path="a.txt", max_bytes=0)
+        with pytest.raises(ValueError, match="max_lines"):
+            read_entire_file(file_path="a.txt", max_lines=0)
+        with pytest.raises(ValueError, match="INVALID_OFFSET"):
+            read_entire_file(file_path="a.txt", offset=10)
+
+
 class TestReadFileLinesContract:
     """Contract tests for read_file_lines tool."""
 
@@ -162,6 +279,113 @@ class TestReadFileLinesContract:
         assert result["is_partial"] is True
         assert result["total_lines"] == 10
 
+    def test_range_deep_in_large_file(self, tmp_path, monkeypatch):
+        """Test a range far into a multi-block file, with CRLF line endings."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        test_file = tmp_path / "big.log"
+        test_file.write_bytes(b"".join(b"entry %d\r\n" % i for i in range(1, 50001)))
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+
+        result = read_file_lines(file_path="big.log", start_line=40000, end_line=40002)
+        assert result["content"] == "entry 40000\nentry 40001\nentry 40002\n"
+        assert result["line_count"] == 3
+        assert result["total_lines"] == 50000
+
+
+class TestReadFileRangesContract:
+    """Contract tests for read_file_ranges tool."""
+
+    @pytest.fixture
+    def root(self, tmp_path, monkeypatch):
+        """Project root with numbered-line files."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        (tmp_path / "a.txt").write_text(
+            "".join(f"a{i}\n" for i in range(1, 101)), encoding="utf-8"
+        )
+        (tmp_path / "b.txt").write_text("b1\nb2\nb3\n", encoding="utf-8")
+        return tmp_path
+
+    def test_windows_grouped_and_merged(self, root):
+        """Test that overlapping and adjacent windows of a file are merged."""
+        result = read_file_ranges(
+            ranges=[
+                {"file_path": "a.txt", "start_line": 50, "end_line": 52},
+                {"file_path": "b.txt", "start_line": 2, "end_line": 2},
+                {"file_path": "a.txt", "start_line": 10, "end_line": 12},
+                {"file_path": "a.txt", "start_line": 51, "end_line": 55},
+                {"file_path": "a.txt", "start_line": 13, "end_line": 13},
+            ]
+        )
+
+        assert result["success_count"] == 2
+        assert result["error_count"] == 0
+        a, b = result["files"]
+        assert a["file_path"] == "a.txt"
+        assert a["total_lines"] == 100
+        assert [(r["start_line"], r["end_line"]) for r in a["ranges"]] == [
+            (10, 13),
+            (50, 55),
+        ]
+        assert a["ranges"][0]["content"] == "a10\na11\na12\na13\n"
+        assert a["ranges"][1]["line_count"] == 6
+        assert b["ranges"] == [
+            {"start_line": 2, "end_line": 2, "line_count": 1, "content": "b2\n"}
+        ]
+
+    def test_windows_clamped_to_file(self, root):
+        """Test that windows are clamped and windows past the end are empty."""
+        result = read_file_ranges(
+            ranges=[
+                {"file_path": "b.txt", "start_line": 2, "end_line": 10},
+                {"file_path": "b.txt", "start_line": 20, "end_line": 30},
+            ]
+        )
+
+        ranges = result["files"][0]["ranges"]
+        assert ranges[0] == {
+            "start_line": 2,
+            "end_line": 3,
+            "line_count": 2,
+            "content": "b2\nb3\n",
+        }
+        assert ranges[1]["line_count"] == 0
+        assert ranges[1]["content"] == ""
+
+    def test_file_errors_reported_per_file(self, root):
+        """Test that a missing file does not fail the other files."""
+        result = read_file_ranges(
+            ranges=[
+                {"file_path": "missing.txt", "start_line": 1, "end_line": 2},
+                {"file_path": "b.txt", "start_line": 1, "end_line": 1},
+            ]
+        )
+
+        assert result["files"][0]["error"]["code"] == "FILE_NOT_FOUND"
+        assert result["files"][1]["ranges"][0]["content"] == "b1\n"
+        assert result["success_count"] == 1
+        assert result["error_count"] == 1
+
+    def test_utf16_windows(self, root):
+        """Test windows of a UTF-16 file, which has no line-offset index."""
+        (root / "wide.txt").write_text("one\ntwo\nthree\n", encoding="utf-16")
+
+        result = read_file_ranges(
+            ranges=[{"file_path": "wide.txt", "start_line": 2, "end_line": 3}]
+        )
+        assert result["files"][0]["ranges"][0]["content"] == "two\nthree\n"
+
+    def test_invalid_ranges_rejected(self, root):
+        """Test that malformed windows fail the whole call."""
+        with pytest.raises(ValueError, match="INVALID_RANGE"):
+            read_file_ranges(ranges=[{"file_path": "a.txt", "start_line": 1}])
+        with pytest.raises(ValueError, match="INVALID_LINE_RANGE"):
+            read_file_ranges(
+                ranges=[{"file_path": "a.txt", "start_line": 5, "end_line": 2}]
+            )
+
 
 class TestReadFileTailContract:
     """Contract tests for read_file_tail tool."""
@@ -257,6 +481,103 @@ class TestReadFileTailContract:
         assert result["total_lines"] == 8
 
 
+class TestReadFileTailLargeFiles:
+    """Tests for backward-reading read_file_tail."""
+
+    @pytest.fixture
+    def root(self, tmp_path, monkeypatch):
+        """Project root with the read validator pointed at it."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        return tmp_path
+
+    def test_tail_of_multi_block_file(self, root):
+        """Test tail reads the right lines from a file larger than one block."""
+        (root / "big.log").write_bytes(
+            b"".join(b"entry %d\n" % i for i in range(1, 50001))
+        )
+
+        result = read_file_tail(file_path="big.log", num_lines=3)
+        assert result["content"] == "entry 49998\nentry 49999\nentry 50000\n"
+        assert result["is_partial"] is True
+        assert result["total_lines"] == 50000
+
+    def test_count_lines_false_skips_total(self, root):
+        """Test total_lines is None when not counted and not cached."""
+        (root / "app.log").write_text("a\nb\nc", encoding="utf-8")
+
+        result = read_file_tail(file_path="app.log", num_lines=2, count_lines=False)
+        assert result["content"] == "b\nc"
+        assert result["total_lines"] is None
+
+    def test_tail_of_utf16_file(self, root):
+        """Test UTF-16 files with a BOM are read as text, not rejected as binary."""
+        (root / "wide.txt").write_text("one\ntwo\nthree\n", encoding="utf-16")
+
+        result = read_file_tail(file_path="wide.txt", num_lines=2)
+        assert result["content"] == "two\nthree\n"
+        assert result["total_lines"] == 3
+
+
+class TestReadLineEndings:
+    """Tests for files with "\r" and mixed line endings, read as text mode does."""
+
+    @pytest.fixture
+    def root(self, tmp_path, monkeypatch):
+        """Project root with the read validator pointed at it."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        (tmp_path / "mac.txt").write_bytes(b"a\rb\rc\r")
+        (tmp_path / "mixed.txt").write_bytes(b"one\ntwo\rthree\r\nfour")
+        return tmp_path
+
+    def test_lines_of_cr_file(self, root):
+        """Test that a bare "\r" ends a line for read_file_lines."""
+        result = read_file_lines(file_path="mac.txt", start_line=2, end_line=3)
+        assert result["content"] == "b\nc\n"
+        assert result["total_lines"] == 3
+
+    def test_lines_of_mixed_file(self, root):
+        """Test that "\n", "\r" and "\r\n" all end lines."""
+        result = read_file_lines(file_path="mixed.txt", start_line=2, end_line=3)
+        assert result["content"] == "two\nthree\n"
+        assert result["total_lines"] == 4
+        ranges = read_file_ranges(
+            [{"file_path": "mixed.txt", "start_line": 4, "end_line": 9}]
+        )
+        assert ranges["files"][0]["ranges"][0]["content"] == "four"
+
+    @pytest.mark.parametrize(
+        "name,expected,total",
+        [("mac.txt", "b\nc\n", 3), ("mixed.txt", "three\nfour", 4)],
+    )
+    def test_tail(self, root, name, expected, total):
+        """Test that tail counts "\r" line ends."""
+        result = read_file_tail(file_path=name, num_lines=2)
+        assert result["content"] == expected
+        assert result["total_lines"] == total
+        assert result["is_partial"] is True
+
+    def test_entire_file_max_lines(self, root):
+        """Test that max_lines and next_line count "\r" line ends."""
+        result = read_entire_file(file_path="mixed.txt", max_lines=2)
+        assert result["content"] == "one\ntwo\n"
+        assert result["next_line"] == 3
+        rest = read_entire_file(
+            file_path="mixed.txt", max_lines=1, offset=result["next_offset"]
+        )
+        assert rest["content"] == "three\n"
+        assert rest["next_line"] == 4
+
+    def test_crlf_not_split_at_byte_limit(self, root):
+        """Test that a byte limit falling inside "\r\n" cuts before it."""
+        result = read_entire_file(file_path="mixed.txt", max_bytes=14)
+        assert result["content"] == "one\ntwo\n"
+        assert result["next_offset"] == 8
+
+
 class TestReadFilesContract:
     """Contract tests for read_files tool (batch operation)."""
 
@@ -372,3 +693,68 @@ class TestReadFilesContract:
         assert result["error_count"] == 0
         # Performance: should complete in <5 seconds
         assert elapsed < 5.0, f"Batch read took {elapsed:.2f}s, expected <5s"
+
+    def test_concurrent_batch_preserves_order(self, tmp_path, monkeypatch):
+        """Test that results follow input order when reads finish out of order."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        monkeypatch.setattr("context_mcp.tools.read.read_workers", 4)
+        file_paths = []
+        for i in range(20):
+            (tmp_path / f"f{i}.txt").write_text(f"{i}\n" * (1000 if i % 2 else 1))
+            file_paths.append(f"f{i}.txt")
+        file_paths.insert(5, "missing.txt")
+
+        result = read_files(file_paths=file_paths)
+
+        assert [entry["file_path"] for entry in result["files"]] == file_paths
+        assert result["files"][5]["error"]["code"] == "FILE_NOT_FOUND"
+        assert result["files"][6]["content"] == "5\n" * 1000
+        assert result["success_count"] == 20
+
+    def test_batch_limits(self, tmp_path, monkeypatch):
+        """Test the file count limit and the byte budget shared by the batch."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        monkeypatch.setattr("context_mcp.tools.read.validator", PathValidator(tmp_path))
+        for i in range(5):
+            (tmp_path / f"f{i}.txt").write_text("x" * 99 + "\n")
+        file_paths = [f"f{i}.txt" for i in range(5)]
+
+        monkeypatch.setattr("context_mcp.tools.read.read_batch_max_files", 3)
+        result = read_files(file_paths=file_paths)
+        codes = [entry.get("error", {}).get("code") for entry in result["files"]]
+        assert codes == [
+            None,
+            None,
+            None,
+            "BATCH_LIMIT_EXCEEDED",
+            "BATCH_LIMIT_EXCEEDED",
+        ]
+
+        monkeypatch.setattr("context_mcp.tools.read.read_batch_max_files", 500)
+        monkeypatch.setattr("context_mcp.tools.read.read_batch_max_bytes", 250)
+        result = read_files(file_paths=file_paths)
+        codes = [entry.get("error", {}).get("code") for entry in result["files"]]
+        assert codes == [
+            None,
+            None,
+            None,
+            "BATCH_LIMIT_EXCEEDED",
+            "BATCH_LIMIT_EXCEEDED",
+        ]
+        assert [entry["truncated"] for entry in result["files"][:3]] == [
+            False,
+            False,
+            True,
+        ]
+        assert result["files"][2]["content"] == "x" * 50
+        assert result["files"][2]["next_offset"] == 50
+        assert result["success_count"] == 3
+        assert result["error_count"] == 2
+
+        # An explicit budget below the server limit applies too
+        result = read_files(file_paths=file_paths, max_bytes=100)
+        assert result["files"][0]["truncated"] is False
+        assert result["files"][1]["error"]["code"] == "BATCH_LIMIT_EXCEEDED"
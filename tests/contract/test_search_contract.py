@@ -1,14 +1,19 @@
 """Contract tests for search tools.
 
-Tests for: search_in_file, search_in_files, find_files_by_name, find_recently_modified_files
+Tests for: search_in_file, search_in_files, find_files_by_name, fuzzy_find_files,
+find_recently_modified_files, find_changed_files
 """
 
+import shutil
+
 import pytest
 from context_mcp.tools.search import (
     search_in_file,
     search_in_files,
     find_files_by_name,
+    fuzzy_find_files,
     find_recently_modified_files,
+    find_changed_files,
 )
 
 
@@ -103,6 +108,70 @@ class TestSearchInFileContract:
         assert result["total_matches"] == 1
         assert "test[0-9]+" in result["matches"][0]["line_content"]
 
+    def test_invalid_regex_rejected_up_front(self):
+        """Test INVALID_REGEX is raised before the file is read."""
+        with pytest.raises(ValueError, match="INVALID_REGEX"):
+            search_in_file(query="(unclosed", file_path="README.md", use_regex=True)
+
+    def test_ignore_case_and_multiline(self, tmp_path, monkeypatch):
+        """Test ignore_case and multiline options."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / "test.txt").write_text("Alpha\nbeta\nALPHA\n", encoding="utf-8")
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+
+        folded = search_in_file(query="alpha", file_path="test.txt", ignore_case=True)
+        spanning = search_in_file(
+            query=r"a\nb", file_path="test.txt", use_regex=True, multiline=True
+        )
+
+        assert [m["line_number"] for m in folded["matches"]] == [1, 3]
+        assert spanning["matches"][0]["line_content"] == "Alpha\nbeta"
+
+    def test_match_offsets(self, tmp_path, monkeypatch):
+        """Test match_start/match_end give character offsets of the first match."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / "test.txt").write_text("héllo wörld wörld\n", encoding="utf-8")
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+
+        literal = search_in_file(query="wörld", file_path="test.txt")["matches"][0]
+        regex = search_in_file(query=r"w\w+d", file_path="test.txt", use_regex=True)[
+            "matches"
+        ][0]
+
+        for match in (literal, regex):
+            assert (match["match_start"], match["match_end"]) == (6, 11)
+            assert match["line_content"][6:11] == "wörld"
+
+    def test_context_lines(self, tmp_path, monkeypatch):
+        """Test context_before/context_after extend matches without repeating lines."""
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / "test.txt").write_text("a\nhit\nb\nhit\nc\nd\n", encoding="utf-8")
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+
+        plain = search_in_file(query="hit", file_path="test.txt")["matches"]
+        result = search_in_file(
+            query="hit", file_path="test.txt", context_before=1, context_after=1
+        )
+
+        assert "context_before" not in plain[0]
+        assert [
+            (m["context_before"], m["context_after"]) for m in result["matches"]
+        ] == [
+            (["a"], ["b"]),
+            ([], ["c"]),
+        ]
+        with pytest.raises(ValueError, match="context_after"):
+            search_in_file(query="hit", file_path="test.txt", context_after=-1)
+
 
 class TestSearchInFilesContract:
     """Contract tests for search_in_files tool."""
@@ -222,6 +291,152 @@ class TestSearchInFilesContract:
                 assert match["file_path"].startswith("subdir")
 
 
+class TestSearchInFilesPaginationContract:
+    """Contract tests for search_in_files pagination."""
+
+    @pytest.fixture
+    def paged_project(self, tmp_path, monkeypatch):
+        """Project with matches spread across files and directories."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / "a.txt").write_text("hit 1\nmiss\nhit 2\n", encoding="utf-8")
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "c.txt").write_text("hit 3\nhit 4\n", encoding="utf-8")
+        (tmp_path / "b.txt").write_text("hit 5\n", encoding="utf-8")
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.search_index", None)
+        return tmp_path
+
+    @staticmethod
+    def _collect_pages(max_results, **kwargs):
+        pages = []
+        cursor = ""
+        while True:
+            result = search_in_files(
+                query="hit", max_results=max_results, cursor=cursor, **kwargs
+            )
+            pages.append(result)
+            if not result["has_more"]:
+                return pages
+            cursor = result["next_cursor"]
+
+    def test_output_schema_pagination_fields(self, paged_project):
+        """Test that output reports has_more and next_cursor."""
+        result = search_in_files(query="hit")
+        assert result["has_more"] is False
+        assert result["next_cursor"] is None
+        assert result["total_matches"] == 5
+
+    @pytest.mark.parametrize("engine", ["grep", "python"])
+    def test_pages_cover_all_matches_in_order(self, paged_project, monkeypatch, engine):
+        """Test that walking the cursor yields every match exactly once, sorted."""
+        if engine == "python":
+            monkeypatch.setattr(
+                "context_mcp.tools.search.shutil.which", lambda cmd: None
+            )
+        pages = self._collect_pages(2)
+
+        assert [p["total_matches"] for p in pages] == [2, 2, 1]
+        found = [
+            (m["file_path"], m["line_number"]) for p in pages for m in p["matches"]
+        ]
+        assert found == [
+            ("a.txt", 1),
+            ("a.txt", 3),
+            ("b/c.txt", 1),
+            ("b/c.txt", 2),
+            ("b.txt", 1),
+        ]
+
+    @pytest.mark.parametrize("engine", ["grep", "python"])
+    def test_ignore_case(self, paged_project, monkeypatch, engine):
+        """Test ignore_case across engines."""
+        if engine == "python":
+            monkeypatch.setattr(
+                "context_mcp.tools.search.shutil.which", lambda cmd: None
+            )
+        result = search_in_files(query="HIT", ignore_case=True)
+        assert result["total_matches"] == 5
+
+    @pytest.mark.parametrize("engine", ["grep", "python"])
+    def test_context_lines(self, paged_project, monkeypatch, engine):
+        """Test that engines attach the same merged context to matches."""
+        if engine == "python":
+            monkeypatch.setattr(
+                "context_mcp.tools.search.shutil.which", lambda cmd: None
+            )
+        result = search_in_files(query="hit", context_before=1, context_after=1)
+
+        context = [
+            (m["file_path"], m["line_number"], m["context_before"], m["context_after"])
+            for m in result["matches"]
+        ]
+        assert context == [
+            ("a.txt", 1, [], ["miss"]),
+            ("a.txt", 3, [], []),
+            ("b/c.txt", 1, [], []),
+            ("b/c.txt", 2, [], []),
+            ("b.txt", 1, [], []),
+        ]
+
+    def test_ripgrep_context_events(self):
+        """Test that ripgrep context events split into after and before context."""
+        import json
+
+        from context_mcp.tools.search import _rg_records
+
+        def event(kind, line, text):
+            return json.dumps(
+                {
+                    "type": kind,
+                    "data": {
+                        "line_number": line,
+                        "lines": {"text": text + "\n"},
+                        "submatches": [{"start": 0, "end": 3}]
+                        if kind == "match"
+                        else [],
+                    },
+                }
+            )
+
+        stream = [
+            json.dumps({"type": "begin", "data": {"path": {"text": "f.txt"}}}),
+            event("match", 1, "hit"),
+            event("context", 2, "x"),
+            event("context", 3, "y"),
+            event("context", 4, "z"),
+            event("match", 5, "hit"),
+            json.dumps({"type": "end", "data": {}}),
+        ]
+
+        assert list(_rg_records(stream, context_after=1)) == [
+            ("f.txt", 1, "hit", 0, 3, [], ["x"]),
+            ("f.txt", 5, "hit", 0, 3, ["y", "z"], []),
+        ]
+
+    def test_invalid_cursor(self, paged_project):
+        """Test INVALID_CURSOR for malformed tokens."""
+        with pytest.raises(ValueError, match="INVALID_CURSOR"):
+            search_in_files(query="hit", cursor="not-a-cursor")
+
+    def test_cursor_from_other_search_rejected(self, paged_project):
+        """Test that a cursor cannot be replayed against another query."""
+        cursor = search_in_files(query="hit", max_results=1)["next_cursor"]
+        with pytest.raises(ValueError, match="INVALID_CURSOR"):
+            search_in_files(query="miss", cursor=cursor)
+
+    def test_max_results_minimum(self, paged_project):
+        """Test that max_results below 1 is rejected."""
+        with pytest.raises(ValueError):
+            search_in_files(query="hit", max_results=0)
+
+
 class TestFindFilesByNameContract:
     """Contract tests for find_files_by_name tool."""
 
@@ -309,6 +524,135 @@ class TestFindFilesByNameContract:
             for file_path in result["files"]:
                 assert file_path.startswith("context_mcp")
 
+    def test_python_fallbacks_respect_gitignore(self, tmp_path, monkeypatch):
+        """Test that Python fallbacks skip paths excluded by .gitignore."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / ".gitignore").write_text("node_modules/\n", encoding="utf-8")
+        (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+        (tmp_path / "node_modules" / "dep" / "index.js").write_text(
+            "hit\n", encoding="utf-8"
+        )
+        (tmp_path / "app.js").write_text("hit\n", encoding="utf-8")
+
+        mock_config = ProjectConfig(root_path=tmp_path)
+        monkeypatch.setattr("context_mcp.tools.search.config", mock_config)
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.search_index", None)
+        monkeypatch.setattr("context_mcp.tools.search._tool_detector._fd_path", None)
+        monkeypatch.setattr("context_mcp.tools.search.shutil.which", lambda cmd: None)
+
+        assert find_files_by_name(name_pattern="*.js")["files"] == ["app.js"]
+        recent = find_recently_modified_files(hours_ago=1, file_pattern="*.js")
+        assert [f["path"] for f in recent["files"]] == ["app.js"]
+        found = search_in_files(query="hit")
+        assert [m["file_path"] for m in found["matches"]] == ["app.js"]
+
+    def test_served_from_file_catalog(self, tmp_path, monkeypatch):
+        """Test that a built catalog answers without the subprocess chain."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.utils.file_catalog import FileCatalog
+        from context_mcp.validators.path_validator import PathValidator
+
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("\n", encoding="utf-8")
+        (tmp_path / "setup.py").write_text("\n", encoding="utf-8")
+        catalog = FileCatalog(tmp_path)
+        catalog.build()
+
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.file_catalog", catalog)
+
+        def no_subprocess(*args, **kwargs):
+            raise AssertionError("subprocess used")
+
+        monkeypatch.setattr("context_mcp.tools.search.subprocess.run", no_subprocess)
+
+        assert find_files_by_name(name_pattern="*.py") == {
+            "files": ["setup.py", "src/app.py"],
+            "total_found": 2,
+        }
+        assert find_files_by_name(name_pattern="*.py", path="src")["files"] == [
+            "src/app.py"
+        ]
+
+
+class TestFuzzyFindFilesContract:
+    """Contract tests for fuzzy_find_files tool."""
+
+    @pytest.fixture
+    def fuzzy_project(self, tmp_path, monkeypatch):
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        for rel in [
+            "src/services/user_service.py",
+            "src/user.py",
+            "tests/services/test_user_service.py",
+            "vendor/user_service_test.py",
+        ]:
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("\n", encoding="utf-8")
+        (tmp_path / ".gitignore").write_text("vendor/\n", encoding="utf-8")
+
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.file_catalog", None)
+        return tmp_path
+
+    def test_output_schema(self, fuzzy_project):
+        """Test that matches carry path and score, best first."""
+        result = fuzzy_find_files(query="user service test")
+        assert result["total_matched"] == 1
+        assert result["matches"][0]["path"] == "tests/services/test_user_service.py"
+        assert isinstance(result["matches"][0]["score"], int)
+
+    def test_ranking_and_limit(self, fuzzy_project):
+        """Test that max_results keeps the best matches."""
+        result = fuzzy_find_files(query="user", max_results=2)
+        assert result["total_matched"] == 3
+        assert [m["path"] for m in result["matches"]] == [
+            "src/user.py",
+            "src/services/user_service.py",
+        ]
+
+    def test_path_restricts_search(self, fuzzy_project):
+        """Test that path limits matches to a subdirectory."""
+        result = fuzzy_find_files(query="user", path="tests")
+        assert [m["path"] for m in result["matches"]] == [
+            "tests/services/test_user_service.py"
+        ]
+
+    def test_catalog_matches_walk(self, fuzzy_project, monkeypatch):
+        """Test that catalog-served results equal the walk fallback."""
+        from context_mcp.utils.file_catalog import FileCatalog
+
+        walked = fuzzy_find_files(query="usr svc")
+        catalog = FileCatalog(fuzzy_project)
+        catalog.build()
+        monkeypatch.setattr("context_mcp.tools.search.file_catalog", catalog)
+        assert fuzzy_find_files(query="usr svc") == walked
+        assert catalog.stats()["queries"] == 1
+
+    def test_invalid_arguments(self, fuzzy_project):
+        """Test that empty queries and max_results < 1 are rejected."""
+        with pytest.raises(ValueError, match="INVALID_QUERY"):
+            fuzzy_find_files(query=" ")
+        with pytest.raises(ValueError, match="max_results"):
+            fuzzy_find_files(query="user", max_results=0)
+
 
 class TestFindRecentlyModifiedFilesContract:
     """Contract tests for find_recently_modified_files tool."""
@@ -411,3 +755,154 @@ class TestFindRecentlyModifiedFilesContract:
         if result["total_found"] > 0:
             for file_entry in result["files"]:
                 assert file_entry["path"].startswith("specs")
+
+    @pytest.fixture
+    def aged_project(self, tmp_path, monkeypatch):
+        import os
+        import time
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        now = time.time()
+        for rel, age in [("a.py", 60), ("b.py", 600), ("c.py", 1800), ("old.py", 7200)]:
+            path = tmp_path / rel
+            path.write_text("\n", encoding="utf-8")
+            os.utime(path, (now - age, now - age))
+
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.file_catalog", None)
+        monkeypatch.setattr("context_mcp.tools.search._tool_detector._fd_path", None)
+        return tmp_path
+
+    def test_minutes_granularity(self, aged_project):
+        """Test that fractional hours_ago selects by minutes."""
+        result = find_recently_modified_files(hours_ago=0.25)
+        assert [f["path"] for f in result["files"]] == ["a.py", "b.py"]
+        assert result["truncated"] is False
+
+    def test_max_results_keeps_newest(self, aged_project):
+        """Test that max_results returns the newest files and the full count."""
+        result = find_recently_modified_files(hours_ago=1, max_results=2)
+        assert [f["path"] for f in result["files"]] == ["a.py", "b.py"]
+        assert result["total_found"] == 3
+        assert result["truncated"] is True
+
+    def test_invalid_arguments(self, aged_project):
+        """Test that non-positive hours_ago and max_results < 1 are rejected."""
+        with pytest.raises(ValueError, match="hours_ago"):
+            find_recently_modified_files(hours_ago=0)
+        with pytest.raises(ValueError, match="max_results"):
+            find_recently_modified_files(hours_ago=1, max_results=0)
+
+
+class TestFindChangedFilesContract:
+    """Contract tests for find_changed_files tool."""
+
+    @pytest.fixture
+    def git_project(self, tmp_path, monkeypatch):
+        import subprocess
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        if shutil.which("git") is None:
+            pytest.skip("git is not installed")
+
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                cwd=tmp_path,
+                check=True,
+                capture_output=True,
+            )
+
+        (tmp_path / "src").mkdir()
+        (tmp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+        (tmp_path / "src" / "app.py").write_text("v1\n", encoding="utf-8")
+        (tmp_path / "src" / "gone.py").write_text("x\n", encoding="utf-8")
+        git("init", "-q", "-b", "main")
+        git("add", ".")
+        git("commit", "-q", "-m", "base")
+        git("checkout", "-q", "-b", "work")
+        (tmp_path / "src" / "app.py").write_text("v2\n", encoding="utf-8")
+        (tmp_path / "src" / "gone.py").unlink()
+        (tmp_path / "src" / "added.py").write_text("new\n", encoding="utf-8")
+        git("add", "-A")
+        git("commit", "-q", "-m", "work")
+        (tmp_path / "notes.md").write_text("draft\n", encoding="utf-8")
+        (tmp_path / "debug.log").write_text("noise\n", encoding="utf-8")
+
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=tmp_path)
+        )
+        monkeypatch.setattr(
+            "context_mcp.tools.search.validator", PathValidator(tmp_path)
+        )
+        return tmp_path
+
+    def test_changes_since_branch(self, git_project):
+        """Test that files changed since a branch are listed with their change type."""
+        result = find_changed_files(ref="main")
+        assert result["ref"] == "main"
+        assert len(result["commit"]) == 40
+        assert result["files"] == [
+            {"path": "src/added.py", "change": "added"},
+            {"path": "src/app.py", "change": "modified"},
+            {"path": "src/gone.py", "change": "deleted"},
+        ]
+        assert result["total_found"] == 3
+        assert find_changed_files(ref="HEAD")["files"] == []
+
+    def test_untracked_and_path(self, git_project):
+        """Test that untracked, non-ignored files are opt-in and path restricts results."""
+        result = find_changed_files(ref="main", include_untracked=True)
+        assert [f["path"] for f in result["files"]] == [
+            "notes.md",
+            "src/added.py",
+            "src/app.py",
+            "src/gone.py",
+        ]
+        assert result["files"][0]["change"] == "untracked"
+        assert find_changed_files(ref="HEAD~1", path="src")["total_found"] == 3
+
+    def test_hidden_untracked_files(self, git_project):
+        """Test that untracked hidden files are listed, as by git ls-files -o."""
+        import subprocess
+
+        (git_project / ".env.local").write_text("KEY=1\n", encoding="utf-8")
+        (git_project / ".github").mkdir()
+        (git_project / ".github" / "ci.yml").write_text("on: push\n", encoding="utf-8")
+        result = find_changed_files(ref="HEAD", include_untracked=True)
+        listed = subprocess.run(
+            ["git", "ls-files", "-o", "--exclude-standard"],
+            cwd=git_project,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        assert [f["path"] for f in result["files"]] == sorted(listed)
+        assert [f["path"] for f in result["files"]] == [
+            ".env.local",
+            ".github/ci.yml",
+            "notes.md",
+        ]
+
+    def test_errors(self, git_project, tmp_path_factory, monkeypatch):
+        """Test INVALID_REF for unknown revisions and NOT_A_GIT_REPOSITORY outside git."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+
+        with pytest.raises(ValueError, match="INVALID_REF"):
+            find_changed_files(ref="no-such-branch")
+
+        plain = tmp_path_factory.mktemp("plain")
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=plain)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.validator", PathValidator(plain))
+        with pytest.raises(ValueError, match="NOT_A_GIT_REPOSITORY"):
+            find_changed_files(ref="main")
@@ -1,9 +1,37 @@
 """Integration tests for tool fallback logic."""
 
+import io
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 
 
+def _rg_json(path, lines):
+    """Build ripgrep --json output for one file.
+
+    Args:
+        path: File path as reported by ripgrep
+        lines: (line_number, text, byte_start, byte_end) tuples
+    """
+    events = [{"type": "begin", "data": {"path": {"text": path}}}]
+    for line_number, text, start, end in lines:
+        events.append(
+            {
+                "type": "match",
+                "data": {
+                    "path": {"text": path},
+                    "lines": {"text": text},
+                    "line_number": line_number,
+                    "submatches": [
+                        {"match": {"text": text[:1]}, "start": start, "end": end}
+                    ],
+                },
+            }
+        )
+    events.append({"type": "end", "data": {"path": {"text": path}}})
+    return "".join(json.dumps(e) + "\n" for e in events)
+
+
 @pytest.fixture
 def mock_config(tmp_path):
     """Mock config with test project root."""
@@ -33,9 +61,9 @@ class TestSearchInFilesRipgrep:
     """Test search_in_files with ripgrep."""
 
     @patch("context_mcp.tools.search.shutil.which")
-    @patch("context_mcp.tools.search.subprocess.run")
+    @patch("context_mcp.tools.search.subprocess.Popen")
     def test_uses_ripgrep_when_available(
-        self, mock_run, mock_which, mock_config, test_files
+        self, mock_popen, mock_which, mock_config, test_files
     ):
         """Test that ripgrep is used when available."""
         from context_mcp.tools.search import search_in_files
@@ -43,18 +71,127 @@ class TestSearchInFilesRipgrep:
         # Mock ripgrep available
         mock_which.return_value = "/usr/bin/rg"
 
-        # Mock ripgrep output
-        mock_result = MagicMock()
-        mock_result.stdout = "test1.txt:1:Hello world\ntest1.txt:2:Test content\n"
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+        # Mock ripgrep streaming output
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(
+            _rg_json(
+                "test1.txt",
+                [(1, "Hello world\n", 0, 5), (2, "Test content\n", 0, 4)],
+            )
+        )
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
 
         result = search_in_files(query="Hello", path=".")
 
-        # Verify ripgrep was called
-        mock_run.assert_called_once()
-        assert "rg" in mock_run.call_args[0][0][0]
-        assert result["total_matches"] >= 0  # Should get results
+        # A complete first page is searched once, without single-threaded sorting
+        mock_popen.assert_called_once()
+        cmd = mock_popen.call_args[0][0]
+        assert "rg" in cmd[0]
+        assert "--sort" not in cmd
+        assert "--json" in cmd
+        assert result["total_matches"] == 2
+        assert result["matches"][0]["file_path"] == "test1.txt"
+        assert result["matches"][0]["match_start"] == 0
+        assert result["matches"][0]["match_end"] == 5
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_ripgrep_offsets_converted_to_characters(
+        self, mock_popen, mock_which, mock_config, test_files
+    ):
+        """Test that rg byte offsets become character offsets, including base64 lines."""
+        import base64
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.return_value = "/usr/bin/rg"
+        text_line = "héllo wörld\n"
+        byte_start = text_line.encode("utf-8").index("wörld".encode("utf-8"))
+        raw_line = b"\xff Hello\n"
+        events = _rg_json("test1.txt", [(1, text_line, byte_start, byte_start + 6)])
+        events += (
+            json.dumps(
+                {
+                    "type": "match",
+                    "data": {
+                        "path": {"text": "test1.txt"},
+                        "lines": {"bytes": base64.b64encode(raw_line).decode("ascii")},
+                        "line_number": 2,
+                        "submatches": [
+                            {"match": {"text": "Hello"}, "start": 2, "end": 7}
+                        ],
+                    },
+                }
+            )
+            + "\n"
+        )
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(events)
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        matches = search_in_files(query="w", path=".")["matches"]
+
+        assert matches[0]["line_content"] == "héllo wörld"
+        assert (matches[0]["match_start"], matches[0]["match_end"]) == (6, 11)
+        assert matches[1]["line_content"] == "\ufffd Hello"
+        assert (matches[1]["match_start"], matches[1]["match_end"]) == (2, 7)
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_ripgrep_stops_when_page_full(
+        self, mock_popen, mock_which, mock_config, test_files
+    ):
+        """Test that ripgrep output is not consumed past one page."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.return_value = "/usr/bin/rg"
+        lines = [(i, f"Hello {i}\n", 0, 5) for i in range(1, 100)]
+        procs = []
+        for path in ("test2.py", "test1.txt"):
+            proc = MagicMock()
+            proc.stdout = io.StringIO(_rg_json(path, lines))
+            proc.poll.return_value = None
+            procs.append(proc)
+        mock_popen.side_effect = procs
+
+        result = search_in_files(query="Hello", path=".", max_results=3)
+
+        assert result["total_matches"] == 3
+        assert result["has_more"] is True
+        assert result["next_cursor"]
+        for proc in procs:
+            proc.kill.assert_called()
+        # The truncated unordered page is searched again in path order
+        first, second = (call[0][0] for call in mock_popen.call_args_list)
+        assert "--sort" not in first
+        assert second[second.index("--sort") + 1] == "path"
+        assert result["matches"][0]["file_path"] == "test1.txt"
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_ripgrep_unordered_page_sorted(
+        self, mock_popen, mock_which, mock_config, test_files
+    ):
+        """Test that a complete unsorted first page is returned in path order."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.return_value = "/usr/bin/rg"
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(
+            _rg_json("test2.py", [(1, "def test():\n", 4, 8)])
+            + _rg_json("subdir/test3.txt", [(1, "Nested file\n", 7, 11)])
+        )
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        result = search_in_files(query="t", path=".")
+
+        assert [m["file_path"] for m in result["matches"]] == [
+            "subdir/test3.txt",
+            "test2.py",
+        ]
+        assert result["has_more"] is False
 
 
 class TestSearchInFilesFallback:
@@ -91,6 +228,111 @@ class TestSearchInFilesFallback:
         assert isinstance(result, dict)
         assert "total_matches" in result
 
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.run")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_grep_batches_files_into_one_process(
+        self, mock_popen, mock_run, mock_which, mock_config, test_files
+    ):
+        """Test that grep is spawned per batch of files, not per file."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.side_effect = lambda cmd: "/usr/bin/grep" if cmd == "grep" else None
+        first = str(test_files / "subdir" / "test3.txt")
+        second = str(test_files / "test1.txt")
+        third = str(test_files / "test2.py")
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout=f"{third}\0{second}\0{first}\0"
+        )
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(
+            f"{first}\x001:Nested file\n{second}\x001:Hello world\n"
+        )
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        result = search_in_files(query="e", path=".")
+
+        mock_popen.assert_called_once()
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[0] == "grep"
+        assert "--null" in cmd
+        # Every enumerated file is passed to the single grep invocation, sorted
+        assert cmd[cmd.index("--") + 1 :] == [first, second, third]
+        assert [m["file_path"] for m in result["matches"]] == [
+            "subdir/test3.txt",
+            "test1.txt",
+        ]
+        assert result["matches"][0]["match_start"] == 1
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.run")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_grep_literal_ignore_case_offsets(
+        self, mock_popen, mock_run, mock_which, mock_config, test_files
+    ):
+        """Test that literal ignore_case matches are located case-insensitively."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.side_effect = lambda cmd: "/usr/bin/grep" if cmd == "grep" else None
+        listed = str(test_files / "test1.txt")
+        mock_run.return_value = MagicMock(returncode=0, stdout=f"{listed}\0")
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(f"{listed}\x001:Foo foo\n")
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        result = search_in_files(query="foo", path=".", ignore_case=True)
+
+        assert "-i" in mock_popen.call_args[0][0]
+        match = result["matches"][0]
+        assert (match["match_start"], match["match_end"]) == (0, 3)
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.run")
+    @patch("context_mcp.tools.search.subprocess.Popen")
+    def test_grep_searches_files_listed_before_find_error(
+        self, mock_popen, mock_run, mock_which, mock_config, test_files
+    ):
+        """Test that a find error does not drop the files it did list."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.side_effect = lambda cmd: "/usr/bin/grep" if cmd == "grep" else None
+        listed = str(test_files / "test1.txt")
+        mock_run.return_value = MagicMock(
+            returncode=1,
+            stdout=f"{listed}\0",
+            stderr="find: 'locked': Permission denied\n",
+        )
+        mock_proc = MagicMock()
+        mock_proc.stdout = io.StringIO(f"{listed}\x001:Hello world\n")
+        mock_proc.poll.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        result = search_in_files(query="Hello", path=".")
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[cmd.index("--") + 1 :] == [listed]
+        assert [m["file_path"] for m in result["matches"]] == ["test1.txt"]
+
+    @patch("context_mcp.tools.search.shutil.which")
+    @patch("context_mcp.tools.search.subprocess.run")
+    def test_failed_find_falls_back_to_python(
+        self, mock_run, mock_which, mock_config, test_files
+    ):
+        """Test that find failing outright hands the search to Python."""
+        from context_mcp.tools.search import search_in_files
+
+        mock_which.side_effect = lambda cmd: "/usr/bin/grep" if cmd == "grep" else None
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout="", stderr="find: error\n"
+        )
+
+        result = search_in_files(query="Hello", path=".")
+
+        assert [m["file_path"] for m in result["matches"]] == ["test1.txt"]
+        assert result["timed_out"] is False
+
     @patch("context_mcp.tools.search.shutil.which")
     def test_fallback_to_python_when_all_tools_unavailable(
         self, mock_which, mock_config, test_files
@@ -4,7 +4,7 @@ from context_mcp.server import mcp
 
 @pytest.mark.asyncio
 async def test_all_tools_documentation():
-    """Scenario: Get complete documentation for all 12 tools"""
+    """Scenario: Get complete documentation for all 16 tools"""
     from context_mcp.tools.guide import get_tool_usage_guide
 
     response = await get_tool_usage_guide(mcp)
@@ -26,7 +26,7 @@ async def test_all_tools_documentation():
         or "## guide Tools" in response["content"]
     )
 
-    # Verify all 12 tools mentioned
+    # Verify all 16 tools mentioned
     all_tools = [
         "list_directory",
         "show_tree",
@@ -34,19 +34,23 @@ async def test_all_tools_documentation():
         "search_in_file",
         "search_in_files",
         "find_files_by_name",
+        "fuzzy_find_files",
         "find_recently_modified_files",
+        "find_changed_files",
         "read_entire_file",
         "read_file_lines",
+        "read_file_ranges",
         "read_file_tail",
         "read_files",
+        "get_server_metrics",
         "get_tool_usage_guide",
     ]
     for tool in all_tools:
         assert f"### {tool}" in response["content"]
 
     # Verify metadata
-    assert response["metadata"]["total_tools"] == 12
-    assert response["metadata"]["filtered_count"] == 12
+    assert response["metadata"]["total_tools"] == 16
+    assert response["metadata"]["filtered_count"] == 16
     assert len(response.get("warnings", [])) == 0
 
 
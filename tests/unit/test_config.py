@@ -179,3 +179,109 @@ class TestLoadConfig:
             load_config()
 
         assert "LOG_LEVEL must be one of" in str(exc_info.value)
+
+    def test_load_config_with_search_index_env(self, tmp_path, monkeypatch):
+        """Test loading SEARCH_INDEX and CACHE_DIR from environment variables."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("SEARCH_INDEX", "true")
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+
+        config = load_config()
+
+        assert config.search_index is True
+        assert config.cache_dir == tmp_path / "cache"
+
+    def test_load_config_search_index_disabled_by_default(self, tmp_path, monkeypatch):
+        """Test that the search index is opt-in."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.delenv("SEARCH_INDEX", raising=False)
+        monkeypatch.delenv("CACHE_DIR", raising=False)
+
+        config = load_config()
+
+        assert config.search_index is False
+        assert config.cache_dir is None
+
+    def test_load_config_with_invalid_search_workers(self, tmp_path, monkeypatch):
+        """Test that non-integer SEARCH_WORKERS is rejected."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("SEARCH_WORKERS", "many")
+
+        with pytest.raises(ValueError, match="SEARCH_WORKERS"):
+            load_config()
+
+    def test_load_config_with_encoding_detection_env(self, tmp_path, monkeypatch):
+        """Test loading ENCODING_DETECTION and DEFAULT_ENCODING."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("ENCODING_DETECTION", "FIXED")
+        monkeypatch.setenv("DEFAULT_ENCODING", "latin-1")
+
+        config = load_config()
+
+        assert config.encoding_detection == "fixed"
+        assert config.default_encoding == "latin-1"
+
+    def test_load_config_with_invalid_encoding_settings(self, tmp_path, monkeypatch):
+        """Test that unknown detection modes and codecs are rejected."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("ENCODING_DETECTION", "guess")
+        with pytest.raises(ValueError, match="encoding_detection"):
+            load_config()
+
+        monkeypatch.setenv("ENCODING_DETECTION", "fast")
+        monkeypatch.setenv("DEFAULT_ENCODING", "no-such-codec")
+        with pytest.raises(ValueError, match="default_encoding"):
+            load_config()
+
+    def test_load_config_with_read_batch_env(self, tmp_path, monkeypatch):
+        """Test loading read limits and read_files concurrency."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("READ_WORKERS", "4")
+        monkeypatch.setenv("READ_BATCH_MAX_FILES", "50")
+        monkeypatch.setenv("READ_BATCH_MAX_BYTES", "1048576")
+        monkeypatch.setenv("READ_MAX_BYTES", "65536")
+
+        config = load_config()
+
+        assert config.read_max_bytes == 65536
+
+        assert config.read_workers == 4
+        assert config.read_batch_max_files == 50
+        assert config.read_batch_max_bytes == 1048576
+
+    def test_load_config_with_invalid_read_workers(self, tmp_path, monkeypatch):
+        """Test that non-integer or zero READ_WORKERS is rejected."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.setenv("READ_WORKERS", "lots")
+        with pytest.raises(ValueError, match="READ_WORKERS"):
+            load_config()
+
+        monkeypatch.setenv("READ_WORKERS", "0")
+        with pytest.raises(ValueError, match="read_workers"):
+            load_config()
+
+    def test_load_config_file_catalog(self, tmp_path, monkeypatch):
+        """Test that the file catalog is on by default and can be disabled."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.delenv("FILE_CATALOG", raising=False)
+        assert load_config().file_catalog is True
+
+        monkeypatch.setenv("FILE_CATALOG", "false")
+        assert load_config().file_catalog is False
+
+    def test_load_config_git_index(self, tmp_path, monkeypatch):
+        """Test git index settings: defaults, overrides, and validation."""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        monkeypatch.delenv("GIT_INDEX", raising=False)
+        monkeypatch.delenv("GIT_UNTRACKED", raising=False)
+        config = load_config()
+        assert (config.git_index, config.git_untracked) == (True, "include")
+
+        monkeypatch.setenv("GIT_INDEX", "false")
+        monkeypatch.setenv("GIT_UNTRACKED", "EXCLUDE")
+        config = load_config()
+        assert (config.git_index, config.git_untracked) == (False, "exclude")
+
+        monkeypatch.setenv("GIT_UNTRACKED", "ignore")
+        with pytest.raises(ValueError, match="git_untracked"):
+            load_config()
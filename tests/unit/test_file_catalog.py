@@ -0,0 +1,216 @@
+"""Unit tests for the resident file catalog."""
+
+import os
+import time
+
+import pytest
+
+from context_mcp.utils.file_catalog import FileCatalog
+from context_mcp.utils.fuzzy import FuzzyQuery
+from context_mcp.utils.watcher import ChangeEvent
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Built catalog over a small tree."""
+    for rel in [
+        ".gitignore",
+        "README.md",
+        "setup.py",
+        "src/app.py",
+        "src/util.py",
+        "src/data.json",
+        "src/pkg/setup.py",
+        "docs/guide.md",
+        "build/out.py",
+    ]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("build/\n", encoding="utf-8")
+    catalog = FileCatalog(tmp_path)
+    catalog.build()
+    return catalog
+
+
+class TestBuildAndGlob:
+    """Tests for build() and glob()."""
+
+    def test_build_skips_ignored_paths(self, catalog):
+        """Ignored directories and hidden files are not cataloged."""
+        assert catalog.stats()["files"] == 7
+        assert catalog.glob(".gitignore") == []
+        assert catalog.glob("out.py") == []
+
+    def test_exact_name(self, catalog):
+        """Literal patterns are answered from the basename index."""
+        assert catalog.glob("setup.py") == ["setup.py", "src/pkg/setup.py"]
+
+    def test_extension(self, catalog):
+        """Patterns with a literal extension use the extension index."""
+        assert catalog.glob("*.py") == [
+            "setup.py",
+            "src/app.py",
+            "src/pkg/setup.py",
+            "src/util.py",
+        ]
+        assert catalog.glob("*.md") == ["README.md", "docs/guide.md"]
+
+    def test_full_scan(self, catalog):
+        """Patterns without an indexable suffix scan all paths."""
+        assert catalog.glob("*til*") == ["src/util.py"]
+        assert catalog.glob("[ad]*") == ["src/app.py", "src/data.json"]
+
+    def test_path_pattern(self, catalog):
+        """Patterns with "/" match trailing path components."""
+        assert catalog.glob("pkg/*.py") == ["src/pkg/setup.py"]
+
+    def test_prefix(self, catalog):
+        """A directory prefix restricts matches to that subtree."""
+        assert catalog.glob("*.py", "src/") == [
+            "src/app.py",
+            "src/pkg/setup.py",
+            "src/util.py",
+        ]
+        assert catalog.glob("*", "src/pkg/") == ["src/pkg/setup.py"]
+        assert catalog.glob("*", "missing/") == []
+
+    def test_not_ready_returns_none(self, tmp_path):
+        """An unbuilt catalog declines and starts a background build."""
+        (tmp_path / "a.py").write_text("", encoding="utf-8")
+        catalog = FileCatalog(tmp_path)
+        assert catalog.glob("*.py") is None
+        assert catalog.stats()["fallbacks"] == 1
+        for _ in range(100):
+            if catalog.is_ready():
+                break
+            time.sleep(0.05)
+        assert catalog.glob("*.py") == ["a.py"]
+
+    def test_expires_without_watcher(self, catalog):
+        """Without a running watcher a build is trusted for rescan_interval only."""
+        catalog.rescan_interval = 0
+        assert catalog.is_ready() is False
+
+
+class TestApplyChanges:
+    """Tests for apply_changes()."""
+
+    def test_created_and_deleted_files(self, catalog):
+        """Created files are added and deleted files removed."""
+        (catalog.root / "src" / "new.py").write_text("", encoding="utf-8")
+        (catalog.root / "build" / "gen.py").write_text("", encoding="utf-8")
+        (catalog.root / ".env").write_text("", encoding="utf-8")
+        catalog.apply_changes(
+            [
+                ChangeEvent("src/new.py", "created"),
+                ChangeEvent("src/app.py", "deleted"),
+                ChangeEvent("build/gen.py", "created"),
+                ChangeEvent(".env", "created"),
+            ]
+        )
+        assert catalog.glob("*.py", "src/") == [
+            "src/new.py",
+            "src/pkg/setup.py",
+            "src/util.py",
+        ]
+        assert catalog.glob("gen.py") == []
+        assert catalog.glob(".env") == []
+
+    def test_deleted_directory(self, catalog):
+        """Deleting a directory removes its whole subtree."""
+        catalog.apply_changes([ChangeEvent("src", "deleted", is_dir=True)])
+        assert catalog.glob("*", "src/") == []
+        assert catalog.glob("setup.py") == ["setup.py"]
+
+    @pytest.mark.parametrize(
+        "event",
+        [ChangeEvent("", "rescan"), ChangeEvent("src/.gitignore", "modified")],
+    )
+    def test_rescan_or_rules_change_marks_stale(self, catalog, event):
+        """Lost events and ignore-file changes force a rebuild."""
+        catalog.apply_changes([event])
+        assert catalog.is_ready() is False
+
+    def test_events_during_build_are_applied(self, catalog):
+        """Events queued while building are applied to the new contents."""
+        (catalog.root / "late.py").write_text("", encoding="utf-8")
+        catalog._building = True
+        catalog.apply_changes([ChangeEvent("late.py", "created")])
+        catalog.build()
+        assert "late.py" in catalog.glob("*.py")
+
+    def test_fuzzy_follows_changes(self, catalog):
+        """Fuzzy queries see files created and deleted after indexing."""
+        query = FuzzyQuery("util")
+        assert catalog.fuzzy(query, 5)[0][0][0] == "src/util.py"
+        (catalog.root / "lib").mkdir()
+        (catalog.root / "lib" / "utils.py").write_text("", encoding="utf-8")
+        catalog.apply_changes(
+            [
+                ChangeEvent("src/util.py", "deleted"),
+                ChangeEvent("lib/utils.py", "created"),
+            ]
+        )
+        best, total = catalog.fuzzy(query, 5, "lib/")
+        assert (best[0][0], total) == ("lib/utils.py", 1)
+
+
+class _Watcher:
+    """Running watcher stand-in."""
+
+    running = True
+
+    def subscribe(self, callback):
+        self.callback = callback
+
+
+class TestModifiedSince:
+    """Tests for modified_since()."""
+
+    def _touch(self, catalog, rel, mtime):
+        path = catalog.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        os.utime(path, (mtime, mtime))
+
+    def test_requires_live_watcher(self, catalog):
+        """Without a running watcher the caller's fallback is used."""
+        assert catalog.modified_since(0) is None
+
+    def test_range_query_newest_first(self, catalog):
+        """Files at or after the cutoff are returned newest first."""
+        now = time.time()
+        for path in catalog.root.rglob("*"):
+            if path.is_file():
+                os.utime(path, (now - 86400, now - 86400))
+        self._touch(catalog, "src/app.py", now - 60)
+        self._touch(catalog, "docs/guide.md", now - 10)
+        catalog.build()
+        catalog.attach(_Watcher())
+
+        found, total = catalog.modified_since(now - 3600)
+        assert ([rel for rel, _ in found], total) == (
+            ["docs/guide.md", "src/app.py"],
+            2,
+        )
+
+        # A modification event moves a file within the mtime order
+        self._touch(catalog, "src/util.py", now)
+        catalog.apply_changes([ChangeEvent("src/util.py", "modified")])
+        found, total = catalog.modified_since(now - 3600, pattern="*.py", limit=1)
+        assert (found, total) == ([("src/util.py", now)], 2)
+        assert catalog.modified_since(now - 3600, prefix="docs/")[1] == 1
+
+    def test_deleted_files_leave_the_index(self, catalog):
+        """Deleted files and directories are dropped from the mtime order."""
+        catalog.attach(_Watcher())
+        catalog.apply_changes(
+            [
+                ChangeEvent("README.md", "deleted"),
+                ChangeEvent("src", "deleted", is_dir=True),
+            ]
+        )
+        found, total = catalog.modified_since(0)
+        assert total == 2
+        assert {rel for rel, _ in found} == {"setup.py", "docs/guide.md"}
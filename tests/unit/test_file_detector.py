@@ -1,10 +1,13 @@
 """Unit tests for binary file detector."""
 
+import codecs
+
 import pytest
 from context_mcp.utils.file_detector import (
     is_binary_file,
     assert_text_file,
     BinaryFileError,
+    preflight_file,
 )
 
 
@@ -94,3 +97,112 @@ class TestBinaryFileDetector:
 
         # Should return False (not binary) and let actual read operation fail
         assert not is_binary_file(nonexistent)
+
+
+class TestPreflightFile:
+    """Unit tests for single-read preflight."""
+
+    def test_ascii_file(self, tmp_path):
+        """Test that a text prefix is reused, valid UTF-8 and not binary."""
+        path = tmp_path / "plain.txt"
+        path.write_bytes(b"hello\nworld\n")
+
+        with open(path, "rb") as f:
+            result = preflight_file(f)
+            assert f.tell() == len(result.prefix)
+
+        assert result.prefix == b"hello\nworld\n"
+        assert not result.is_binary
+        assert result.bom_encoding is None
+        assert result.utf8_valid
+
+    def test_binary_file(self, tmp_path):
+        """Test that NULL bytes without a BOM mark the file as binary."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x89PNG\x00\x01\x02")
+
+        with open(path, "rb") as f:
+            assert preflight_file(f).is_binary
+
+    def test_utf16_bom_is_text(self, tmp_path):
+        """Test that UTF-16 text with a BOM is not mistaken for binary."""
+        path = tmp_path / "wide.txt"
+        path.write_text("hello\n", encoding="utf-16")
+
+        with open(path, "rb") as f:
+            result = preflight_file(f)
+
+        assert not result.is_binary
+        assert result.bom_encoding == "utf-16"
+        assert result.encoding == "utf-16"
+        assert not result.utf8_valid
+
+    def test_utf8_sequence_cut_at_prefix_end(self, tmp_path):
+        """Test that a multi-byte character split by the sample size is valid."""
+        path = tmp_path / "cut.txt"
+        path.write_bytes("é".encode("utf-8") * 10)
+
+        with open(path, "rb") as f:
+            result = preflight_file(f, sample_size=5)
+
+        assert result.prefix == "éé".encode("utf-8") + b"\xc3"
+        assert result.utf8_valid
+
+    def test_invalid_utf8(self, tmp_path):
+        """Test that Latin-1 bytes are reported as invalid UTF-8."""
+        path = tmp_path / "latin1.txt"
+        path.write_bytes("café au lait\n".encode("latin-1"))
+
+        with open(path, "rb") as f:
+            assert not preflight_file(f).utf8_valid
+
+    def test_fast_mode_skips_chardet_for_utf8(self, tmp_path, monkeypatch):
+        """Test that ASCII and UTF-8 prefixes are accepted without chardet."""
+        monkeypatch.setattr(
+            "context_mcp.utils.file_detector.chardet.detect",
+            lambda data: pytest.fail("chardet should not run"),
+        )
+        ascii_file = tmp_path / "ascii.txt"
+        ascii_file.write_bytes(b"plain text\n")
+        utf8_file = tmp_path / "utf8.txt"
+        utf8_file.write_bytes("naïve café\n".encode("utf-8"))
+
+        with open(ascii_file, "rb") as f:
+            result = preflight_file(f)
+        assert (result.encoding, result.detection) == ("utf-8", "ascii")
+
+        with open(utf8_file, "rb") as f:
+            result = preflight_file(f)
+        assert (result.encoding, result.detection) == ("utf-8", "utf-8")
+
+    def test_fast_mode_falls_back_to_chardet(self, tmp_path):
+        """Test that invalid UTF-8 is handed to chardet."""
+        path = tmp_path / "latin1.txt"
+        path.write_bytes("café au lait, déjà vu\n".encode("latin-1") * 20)
+
+        with open(path, "rb") as f:
+            result = preflight_file(f)
+
+        assert result.detection == "chardet"
+        assert result.encoding.lower() != "utf-8"
+
+    def test_accurate_and_fixed_modes(self, tmp_path):
+        """Test that accurate always runs chardet and fixed never inspects."""
+        path = tmp_path / "ascii.txt"
+        path.write_bytes(b"plain text\n")
+
+        with open(path, "rb") as f:
+            assert preflight_file(f, mode="accurate").detection == "chardet"
+
+        with open(path, "rb") as f:
+            result = preflight_file(f, mode="fixed", default_encoding="cp1252")
+        assert (result.encoding, result.detection) == ("cp1252", "fixed")
+
+    def test_bom_wins_over_fixed_mode(self, tmp_path):
+        """Test that a byte-order mark determines the encoding in every mode."""
+        path = tmp_path / "bom.txt"
+        path.write_bytes(codecs.BOM_UTF8 + b"text\n")
+
+        with open(path, "rb") as f:
+            result = preflight_file(f, mode="fixed", default_encoding="cp1252")
+        assert (result.encoding, result.detection) == ("utf-8-sig", "bom")
@@ -0,0 +1,134 @@
+"""Unit tests for the shared file metadata cache."""
+
+import os
+
+import pytest
+
+from context_mcp.utils.file_detector import cached_preflight, is_binary_file
+from context_mcp.utils.file_metadata import FileMetadataCache, file_metadata_cache
+from context_mcp.utils.line_index import BLOCK_SIZE
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A file spanning several line-index blocks."""
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 20001)), encoding="utf-8")
+    assert path.stat().st_size > BLOCK_SIZE
+    return path
+
+
+class TestFileMetadataCache:
+    """Tests for FileMetadataCache."""
+
+    def test_line_index_reused_until_file_changes(self, log_file):
+        """Indexes are cached and rebuilt after the file changes."""
+        cache = FileMetadataCache()
+        with open(log_file, "rb") as f:
+            first = cache.line_index(log_file, f)
+            assert cache.line_index(log_file, f) is first
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("appended\n")
+        with open(log_file, "rb") as f:
+            rebuilt = cache.line_index(log_file, f)
+
+        assert rebuilt is not first
+        assert rebuilt.total_lines == 20001
+        assert cache.stats()["misses"] == 2
+
+    def test_peek_validates_with_stat(self, log_file):
+        """Entries are returned only while device, inode, size and mtime match."""
+        cache = FileMetadataCache()
+        st = log_file.stat()
+        assert cache.peek(log_file, st) is None
+
+        cache.update(log_file, st, has_nul=False)
+        assert cache.peek(log_file, st).has_nul is False
+
+        os.utime(log_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        assert cache.peek(log_file, log_file.stat()) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_update_merges_fields(self, log_file):
+        """Facts computed by different tools accumulate in one entry."""
+        cache = FileMetadataCache()
+        st = log_file.stat()
+        cache.update(log_file, st, has_nul=False)
+        with open(log_file, "rb") as f:
+            index = cache.line_index(log_file, f)
+
+        entry = cache.peek(log_file, st)
+        assert entry.has_nul is False
+        assert entry.line_index is index
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        """Entries beyond the memory budget are evicted oldest first."""
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("x\n")
+            paths.append(path)
+        cache = FileMetadataCache(max_bytes=1100)
+
+        cache.update(paths[0], paths[0].stat(), has_nul=False)
+        cache.update(paths[1], paths[1].stat(), has_nul=False)
+        assert cache.peek(paths[0], paths[0].stat()) is not None
+        cache.update(paths[2], paths[2].stat(), has_nul=False)
+
+        assert cache.peek(paths[1], paths[1].stat()) is None
+        assert cache.peek(paths[0], paths[0].stat()) is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+
+    def test_hit_rate(self, log_file):
+        """Hit rate is the share of lookups served from the cache."""
+        cache = FileMetadataCache()
+        st = log_file.stat()
+        assert cache.peek(log_file, st) is None
+        cache.update(log_file, st, has_nul=False)
+        cache.peek(log_file, st)
+        cache.peek(log_file, st)
+        assert cache.stats()["hit_rate"] == pytest.approx(2 / 3)
+
+
+class TestDetectorCaching:
+    """Tests for file_detector results kept in the shared cache."""
+
+    def test_cached_preflight_skips_detection(self, log_file, monkeypatch):
+        """A second preflight of the same file version reads nothing."""
+        file_metadata_cache.invalidate(log_file)
+        with open(log_file, "rb") as f:
+            first = cached_preflight(log_file, f)
+        assert first.prefix
+
+        monkeypatch.setattr(
+            "context_mcp.utils.file_detector.preflight_file",
+            lambda *args, **kwargs: pytest.fail("preflight should be cached"),
+        )
+        with open(log_file, "rb") as f:
+            second = cached_preflight(log_file, f)
+            assert f.tell() == 0
+
+        assert second.prefix == b""
+        assert (second.encoding, second.detection) == (first.encoding, first.detection)
+
+    def test_cached_preflight_respects_mode(self, log_file):
+        """Results computed under another detection mode are not reused."""
+        file_metadata_cache.invalidate(log_file)
+        with open(log_file, "rb") as f:
+            cached_preflight(log_file, f, mode="fast")
+        with open(log_file, "rb") as f:
+            assert cached_preflight(log_file, f, mode="fixed").detection == "fixed"
+
+    def test_is_binary_file_uses_preflight_result(self, tmp_path):
+        """Binary status recorded by a preflight answers is_binary_file."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x00\x01\x02")
+        with open(path, "rb") as f:
+            cached_preflight(path, f)
+
+        hits = file_metadata_cache.stats()["hits"]
+        assert is_binary_file(path)
+        assert file_metadata_cache.stats()["hits"] == hits + 1
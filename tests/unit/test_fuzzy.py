@@ -0,0 +1,125 @@
+"""Unit tests for fuzzy path matching."""
+
+import random
+
+import pytest
+
+from context_mcp.utils.fuzzy import CharIndex, FuzzyQuery, top_matches
+
+PATHS = sorted(
+    [
+        "README.md",
+        "src/services/user_service.py",
+        "src/user.py",
+        "tests/services/test_user_service.py",
+        "tests/test_order.py",
+        "docs/UserGuide.md",
+    ]
+)
+
+
+class TestFuzzyQuery:
+    """Tests for FuzzyQuery."""
+
+    def test_empty_query_rejected(self):
+        """A query without terms is rejected."""
+        with pytest.raises(ValueError, match="INVALID_QUERY"):
+            FuzzyQuery("   ")
+
+    def test_subsequence_terms_in_any_order(self):
+        """Every term must be a subsequence; term order does not matter."""
+        query = FuzzyQuery("test usrsvc")
+        assert query.score("tests/services/test_user_service.py") is not None
+        assert query.score("src/services/user_service.py") is None
+
+    def test_smart_case(self):
+        """Lowercase terms ignore case; terms with uppercase letters do not."""
+        assert FuzzyQuery("userguide").score("docs/UserGuide.md") is not None
+        assert FuzzyQuery("UG").score("docs/UserGuide.md") is not None
+        assert FuzzyQuery("Ug").score("docs/UserGuide.md") is None
+
+    def test_boundaries_and_runs_score_higher(self):
+        """Word-boundary and consecutive matches beat scattered ones."""
+        query = FuzzyQuery("user")
+        assert query.score("src/user.py") > query.score("src/u_s_e_r.py")
+        assert query.score("src/user.py") > query.score("src/auser.py")
+
+    def test_basename_preferred(self):
+        """A term placed in the basename beats the same match in a directory."""
+        query = FuzzyQuery("user")
+        assert query.score("lib/user.py") > query.score("user/lib.py")
+
+
+class TestTopMatches:
+    """Tests for top_matches and CharIndex."""
+
+    def test_ranked_with_total(self):
+        """Results are best first, limited, and report the total match count."""
+        best, total = top_matches(FuzzyQuery("user"), PATHS, 2)
+        assert total == 4
+        assert [path for path, _ in best] == ["src/user.py", "docs/UserGuide.md"]
+        assert best[0][1] >= best[1][1]
+
+    def test_ties_prefer_shorter_paths(self):
+        """Equal scores are ordered by path length."""
+        best, _ = top_matches(FuzzyQuery("a"), ["x/a", "a"], 2)
+        assert [path for path, _ in best] == ["a", "x/a"]
+
+    def test_heap_cutoff_keeps_exact_ranking(self):
+        """Pruning by score bound returns what a full sort would."""
+        rng = random.Random(7)
+        words = ["user", "svc", "test", "Handler", "io", "main", "a_b", "x9"]
+        paths = sorted(
+            "/".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + ".py"
+            for _ in range(500)
+        )
+        for text in ["u", "us", "svc test", "hn", "Ha", "a x"]:
+            query = FuzzyQuery(text)
+            scored = [(p, query.score(p)) for p in paths]
+            ranked = sorted(
+                ((p, v) for p, v in scored if v is not None),
+                key=lambda item: (-item[1], len(item[0])),
+            )
+            for limit in (1, 5, 40):
+                assert top_matches(query, paths, limit) == (ranked[:limit], len(ranked))
+
+    def test_refined_query_filters_previous_matches(self, monkeypatch):
+        """A query extending the last one does not go back to the bitsets."""
+        index = CharIndex(PATHS)
+        index.search(FuzzyQuery("us"), 10)
+
+        def fail(*args):
+            raise AssertionError("candidates() called")
+
+        monkeypatch.setattr(index, "candidates", fail)
+        for text, prefix in [("user", ""), ("user svc", ""), ("user svc", "tests/")]:
+            query = FuzzyQuery(text)
+            expected = top_matches(
+                query, [p for p in PATHS if p.startswith(prefix)], 10
+            )
+            assert index.search(query, 10, prefix) == expected
+        with pytest.raises(AssertionError):
+            index.search(FuzzyQuery("order"), 10)
+
+    def test_index_matches_plain_scan(self):
+        """CharIndex returns the same results as scoring every path."""
+        index = CharIndex(PATHS)
+        for text in ["user", "svc test", "md", "zzz", "UG"]:
+            query = FuzzyQuery(text)
+            assert index.search(query, 10) == top_matches(query, PATHS, 10)
+
+    def test_index_prefix(self):
+        """A prefix restricts the index to one subtree."""
+        best, total = CharIndex(PATHS).search(FuzzyQuery("user"), 10, "tests/")
+        assert total == 1
+        assert best[0][0] == "tests/services/test_user_service.py"
+
+    def test_index_tracks_changes(self):
+        """Paths added and removed after construction are honored."""
+        index = CharIndex(PATHS)
+        index.add("lib/user_model.py")
+        index.discard("src/user.py")
+        found = [path for path, _ in index.search(FuzzyQuery("user"), 10)[0]]
+        assert "lib/user_model.py" in found
+        assert "src/user.py" not in found
+        assert index.pending() == 2
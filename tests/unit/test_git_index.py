@@ -0,0 +1,148 @@
+"""Unit tests for the git index reader."""
+
+import shutil
+import subprocess
+
+import pytest
+
+from context_mcp.utils.git_index import (
+    GitIndexError,
+    TrackedFiles,
+    find_git_dir,
+    parse_index,
+)
+from context_mcp.utils.walker import walk_files
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("git") is None, reason="git is not installed"
+)
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Work tree with tracked, ignored-but-tracked, and untracked files."""
+    for rel in [
+        ".gitignore",
+        "README.md",
+        "src/app.py",
+        "src/pkg/util.py",
+        "src/pkg/utils.py",
+        "build/keep.txt",
+    ]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("build/\n", encoding="utf-8")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".gitignore", "README.md", "src")
+    _git(tmp_path, "add", "-f", "build/keep.txt")
+    (tmp_path / "notes.txt").write_text("untracked", encoding="utf-8")
+    (tmp_path / "build" / "out.bin").write_text("ignored", encoding="utf-8")
+    return tmp_path
+
+
+TRACKED = [
+    ".gitignore",
+    "README.md",
+    "build/keep.txt",
+    "src/app.py",
+    "src/pkg/util.py",
+    "src/pkg/utils.py",
+]
+
+
+class TestParseIndex:
+    """Tests for parse_index()."""
+
+    @pytest.mark.parametrize("version", ["2", "3", "4"])
+    def test_versions(self, repo, version):
+        """All supported index versions yield the same entries."""
+        _git(repo, "update-index", "--index-version", version)
+        entries = parse_index((repo / ".git" / "index").read_bytes())
+        assert [e.path for e in entries] == TRACKED
+        app = entries[3]
+        st = (repo / "src" / "app.py").stat()
+        assert (app.size, app.mtime_ns // 1_000_000_000, app.stage) == (
+            st.st_size,
+            int(st.st_mtime),
+            0,
+        )
+        assert app.mode == 0o100644
+        assert len(app.sha) == 40
+
+    def test_extended_flags(self, repo):
+        """skip-worktree and intent-to-add bits are decoded."""
+        (repo / "later.py").write_text("", encoding="utf-8")
+        _git(repo, "add", "-N", "later.py")
+        _git(repo, "update-index", "--skip-worktree", "README.md")
+        by_path = {
+            e.path: e for e in parse_index((repo / ".git" / "index").read_bytes())
+        }
+        assert by_path["later.py"].intent_to_add
+        assert by_path["README.md"].skip_worktree
+        assert not by_path["src/app.py"].skip_worktree
+
+    def test_rejects_other_files(self):
+        """Data that is not an index raises GitIndexError."""
+        with pytest.raises(GitIndexError):
+            parse_index(b"PACK\x00\x00\x00\x02\x00\x00\x00\x00")
+        with pytest.raises(GitIndexError):
+            parse_index(b"DIRC\x00\x00\x00\x02\x00\x00\x00\x01" + b"\x00" * 10)
+
+
+class TestTrackedFiles:
+    """Tests for TrackedFiles and the walker integration."""
+
+    def _tracked(self, root, include_untracked=True):
+        work_tree, git_dir = find_git_dir(root)
+        return TrackedFiles(root, work_tree, git_dir, include_untracked)
+
+    def test_subdirectory_root(self, repo):
+        """A root below the work tree top sees its own files, relative to it."""
+        tracked = self._tracked(repo / "src")
+        assert tracked.paths() == ["app.py", "pkg/util.py", "pkg/utils.py"]
+        assert tracked.dirs() == {"pkg"}
+        assert tracked.is_tracked("pkg", is_dir=True)
+
+    def test_rereads_changed_index(self, repo):
+        """Staging a file is picked up on the next call."""
+        tracked = self._tracked(repo)
+        assert "notes.txt" not in tracked.paths()
+        _git(repo, "add", "notes.txt")
+        assert "notes.txt" in tracked.paths()
+        assert tracked.stats()["reads"] == 2
+
+    def test_walk_tracked_only(self, repo):
+        """Excluding untracked files enumerates the index, skipping deleted files."""
+        (repo / "src" / "app.py").unlink()
+        tracked = self._tracked(repo, include_untracked=False)
+        found = [rel for _, rel in walk_files(repo, tracked=tracked, sort=True)]
+        assert found == [
+            "README.md",
+            "build/keep.txt",
+            "src/pkg/util.py",
+            "src/pkg/utils.py",
+        ]
+        entry, rel = next(walk_files(repo, repo / "src" / "pkg", tracked=tracked))
+        assert (rel, entry.name, entry.stat().st_size) == (
+            "src/pkg/util.py",
+            "util.py",
+            15,
+        )
+
+    def test_walk_with_untracked(self, repo):
+        """Untracked files are walked; tracked files beat ignore rules."""
+        tracked = self._tracked(repo)
+        found = {rel for _, rel in walk_files(repo, tracked=tracked)}
+        # Hidden files are skipped even when tracked, as by ripgrep
+        assert found == set(TRACKED) - {".gitignore"} | {"notes.txt"}
+        assert "build/keep.txt" not in {rel for _, rel in walk_files(repo)}
@@ -0,0 +1,195 @@
+"""Unit tests for the git object reader and working-tree change detection."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from context_mcp.utils.git_changes import ChangeDetector
+from context_mcp.utils.git_index import TrackedFiles
+from context_mcp.utils.git_objects import (
+    GitObjectError,
+    Repository,
+    apply_delta,
+    blob_id,
+)
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("git") is None, reason="git is not installed"
+)
+
+
+def _git(repo, *args) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def _write(repo, rel, text):
+    path = repo / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with three commits on main, a tag and a feature branch."""
+    _git(tmp_path, "init", "-q", "-b", "main")
+    body = "".join(f"line {i}\n" for i in range(200))
+    _write(tmp_path, "README.md", "readme\n")
+    _write(tmp_path, "src/app.py", body)
+    _write(tmp_path, "src/old.py", "old\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "one")
+    _git(tmp_path, "tag", "-a", "v1", "-m", "first")
+    _write(tmp_path, "src/app.py", body + "more\n")
+    _git(tmp_path, "commit", "-q", "-am", "two")
+    _git(tmp_path, "branch", "feature")
+    _write(tmp_path, "src/app.py", body + "more\nand more\n")
+    _git(tmp_path, "commit", "-q", "-am", "three")
+    return tmp_path
+
+
+def _repository(repo):
+    return Repository(repo / ".git")
+
+
+class TestObjects:
+    """Tests for reading loose and packed objects."""
+
+    def test_blob_id_matches_git(self, tmp_path):
+        """blob_id agrees with git hash-object."""
+        (tmp_path / "f").write_bytes(b"hello\n")
+        assert blob_id(b"hello\n") == _git(tmp_path, "hash-object", "f")
+
+    @pytest.mark.parametrize("packed", [False, True])
+    def test_resolve_and_flatten(self, repo, packed):
+        """Revisions resolve and trees flatten identically from loose and packed objects."""
+        if packed:
+            # Deltified packs (OFS_DELTA) with no loose objects left
+            _git(repo, "gc", "-q", "--aggressive", "--prune=now")
+            assert not any((repo / ".git" / "objects").glob("[0-9a-f][0-9a-f]"))
+        repository = _repository(repo)
+        for rev in [
+            "HEAD",
+            "main",
+            "HEAD~1",
+            "HEAD^",
+            "main~2",
+            "v1",
+            "feature",
+            "refs/heads/main",
+        ]:
+            assert repository.resolve(rev) == _git(
+                repo, "rev-parse", f"{rev}^{{commit}}"
+            )
+        head = repository.resolve("HEAD")
+        assert repository.resolve(head[:8]) == head
+
+        files = repository.flatten(repository.tree_of(head))
+        assert sorted(files) == ["README.md", "src/app.py", "src/old.py"]
+        mode, sha = files["src/app.py"]
+        assert (mode, sha) == (0o100644, _git(repo, "rev-parse", "HEAD:src/app.py"))
+        assert repository.read(sha, "blob").endswith(b"and more\n")
+        assert list(repository.flatten(repository.tree_of(head), "src/")) != []
+        assert repository.flatten(repository.tree_of(head), "missing/") == {}
+
+    def test_unknown_revision(self, repo):
+        """Unknown revisions and missing parents raise INVALID_REF."""
+        repository = _repository(repo)
+        for rev in ["nope", "HEAD~5", "../config", "ffffffff"]:
+            with pytest.raises(ValueError, match="INVALID_REF"):
+                repository.resolve(rev)
+
+    def test_apply_delta(self):
+        """Copy and insert instructions rebuild the target."""
+        base = b"0123456789"
+        # Sizes 10 -> 7; copy 4 bytes at offset 2, insert "abc"
+        delta = bytes([10, 7, 0x80 | 0x01 | 0x10, 2, 4, 3]) + b"abc"
+        assert apply_delta(base, delta) == b"2345abc"
+        with pytest.raises(GitObjectError):
+            apply_delta(b"short", delta)
+
+
+class TestChangeDetector:
+    """Tests for ChangeDetector."""
+
+    def _detector(self, repo, root=None):
+        return ChangeDetector(TrackedFiles(root or repo, repo, repo / ".git"))
+
+    def test_clean_tree_uses_stat_cache(self, repo):
+        """A clean tree reports nothing against HEAD without hashing files."""
+        # Age the index so no entry is racily clean
+        index = repo / ".git" / "index"
+        stamp = index.stat().st_mtime + 5
+        os.utime(index, (stamp, stamp))
+        detector = self._detector(repo)
+        assert detector.changes("HEAD")[1] == []
+        assert detector.hashed == 0
+        assert detector.stat_hits == 3
+
+    def test_changes_against_older_revision(self, repo):
+        """Committed, staged, unstaged, added and deleted files are all reported."""
+        _write(repo, "README.md", "edited\n")  # Unstaged
+        _write(repo, "src/new.py", "new\n")
+        _git(repo, "add", "src/new.py")  # Staged addition
+        _git(repo, "rm", "-q", "src/old.py")  # Staged deletion
+        _write(repo, "notes.txt", "untracked\n")
+        detector = self._detector(repo)
+        commit, changes = detector.changes("v1")
+        assert commit == _git(repo, "rev-parse", "v1^{commit}")
+        assert changes == [
+            ("README.md", "modified"),
+            ("src/app.py", "modified"),
+            ("src/new.py", "added"),
+            ("src/old.py", "deleted"),
+        ]
+        expected = _git(repo, "diff", "--name-status", "v1").splitlines()
+        assert [line.split("\t")[1] for line in expected] == [
+            path for path, _ in changes
+        ]
+
+    def test_reverted_edit_is_not_a_change(self, repo):
+        """A touched file with the committed contents is hashed once and matches."""
+        (repo / "README.md").write_text("readme\n", encoding="utf-8")
+        detector = self._detector(repo)
+        assert detector.changes("HEAD")[1] == []
+        hashed = detector.hashed
+        assert detector.changes("HEAD")[1] == []
+        assert detector.hashed == hashed  # Remembered with its stat data
+
+    def test_subdirectory_root_and_prefix(self, repo):
+        """Paths are relative to the project root and can be restricted."""
+        _write(repo, "README.md", "edited\n")
+        _write(repo, "src/old.py", "edited\n")
+        detector = self._detector(repo, repo / "src")
+        assert detector.changes("HEAD")[1] == [("old.py", "modified")]
+        assert self._detector(repo).changes("HEAD", "src/")[1] == [
+            ("src/old.py", "modified")
+        ]
+
+    def test_filemode_false_ignores_exec_bit(self, repo):
+        """With core.filemode false a chmod alone is not a change."""
+        os.chmod(repo / "README.md", 0o755)
+        assert self._detector(repo).changes("HEAD")[1] == [("README.md", "modified")]
+        _git(repo, "config", "core.fileMode", "false")
+        detector = self._detector(repo)
+        assert detector.filemode is False
+        assert detector.changes("HEAD")[1] == []
+
+    def test_remembered_hashes_are_bounded(self, repo):
+        """Only the most recently used hashes are kept."""
+        for rel in ["README.md", "src/app.py", "src/old.py"]:
+            (repo / rel).touch()
+            os.utime(repo / rel, (1, 1))
+        detector = ChangeDetector(
+            TrackedFiles(repo, repo, repo / ".git"), remembered_hashes=2
+        )
+        detector.changes("HEAD")
+        assert detector.stats()["remembered"] == 2
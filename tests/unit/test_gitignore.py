@@ -0,0 +1,105 @@
+"""Unit tests for ignore-file parsing and matching."""
+
+import pytest
+
+from context_mcp.utils.gitignore import (
+    IgnoreMatcher,
+    IgnoreRulesCache,
+    parse_rule,
+    parse_rules,
+)
+
+
+def _matches(pattern: str, path: str, is_dir: bool = False) -> bool:
+    """Whether a single root-level pattern ignores path."""
+    rule = parse_rule(pattern)
+    assert rule is not None
+    name = path.rsplit("/", 1)[-1]
+    if rule.dir_only and not is_dir:
+        return False
+    return rule.regex.fullmatch(path if rule.anchored else name) is not None
+
+
+class TestParseRule:
+    """Tests for translating gitignore patterns."""
+
+    @pytest.mark.parametrize(
+        "pattern,path,is_dir,expected",
+        [
+            ("*.log", "a/b/app.log", False, True),
+            ("*.log", "a/app.log.txt", False, False),
+            ("build/", "build", True, True),
+            ("build/", "build", False, False),
+            ("/root.txt", "root.txt", False, True),
+            ("/root.txt", "sub/root.txt", False, False),
+            ("doc/*.md", "doc/a.md", False, True),
+            ("doc/*.md", "doc/sub/a.md", False, False),
+            ("**/cache", "a/b/cache", True, True),
+            ("a/**/b", "a/b", False, True),
+            ("a/**/b", "a/x/y/b", False, True),
+            ("out/**", "out/x/y", False, True),
+            ("out/**", "out", True, False),
+            ("file?.[ch]", "file1.c", False, True),
+            ("file[!0-9].c", "file1.c", False, False),
+            ("\\#hash", "#hash", False, True),
+            ("trailing   ", "trailing", False, True),
+        ],
+    )
+    def test_pattern_semantics(self, pattern, path, is_dir, expected):
+        """Patterns follow gitignore(5) anchoring, globbing and ** rules."""
+        assert _matches(pattern, path, is_dir) is expected
+
+    def test_comments_blanks_and_negation(self):
+        """Comments and blank lines are skipped; ! negates."""
+        rules = parse_rules("# comment\n\n*.tmp\n!keep.tmp\n")
+        assert len(rules) == 2
+        assert rules[1].negate is True
+
+
+class TestIgnoreMatcher:
+    """Tests for nested ignore files."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("*.log\nnode_modules/\n", encoding="utf-8")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / ".gitignore").write_text(
+            "!keep.log\n/local\n", encoding="utf-8"
+        )
+        (tmp_path / "pkg" / ".ignore").write_text("generated.py\n", encoding="utf-8")
+        (tmp_path / ".git" / "info").mkdir(parents=True)
+        (tmp_path / ".git" / "info" / "exclude").write_text(
+            "secret.txt\n", encoding="utf-8"
+        )
+        return tmp_path
+
+    def test_nested_rules_take_precedence(self, project):
+        """Deeper files override shallower ones; .ignore applies alongside .gitignore."""
+        matcher = IgnoreMatcher(project, IgnoreRulesCache())
+
+        assert matcher.is_ignored("app.log")
+        assert matcher.is_ignored("pkg/other.log")
+        assert not matcher.is_ignored("pkg/keep.log")
+        assert matcher.is_ignored("pkg/local", is_dir=True)
+        assert not matcher.is_ignored("local", is_dir=True)
+        assert matcher.is_ignored("pkg/generated.py")
+        assert matcher.is_ignored("secret.txt")
+        assert not matcher.is_ignored("pkg/main.py")
+
+    def test_ignored_parent_directory(self, project):
+        """Paths inside an ignored directory are ignored."""
+        matcher = IgnoreMatcher(project, IgnoreRulesCache())
+        assert matcher.is_ignored("node_modules/dep/index.js")
+        assert matcher.is_ignored(".git/config")
+
+    def test_rules_cached_until_file_changes(self, project):
+        """Compiled rules are reused per directory and recompiled on change."""
+        cache = IgnoreRulesCache()
+        matcher = IgnoreMatcher(project, cache)
+        matcher.is_ignored("pkg/a.py")
+        matcher.is_ignored("pkg/b.py")
+        assert cache.stats()["hits"] == 2
+
+        (project / "pkg" / ".ignore").write_text("a.py\n", encoding="utf-8")
+        assert matcher.is_ignored("pkg/a.py")
+        assert not matcher.is_ignored("pkg/generated.py")
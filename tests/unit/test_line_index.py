@@ -0,0 +1,81 @@
+"""Unit tests for the cached line-offset index."""
+
+import os
+
+import pytest
+
+from context_mcp.utils.line_index import (
+    BLOCK_SIZE,
+    LineIndex,
+    is_index_compatible,
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A file spanning several index blocks with variable-length lines."""
+    lines = [f"{i}:" + "x" * (i % 97) + "\n" for i in range(1, 20001)]
+    path = tmp_path / "app.log"
+    path.write_text("".join(lines), encoding="utf-8")
+    assert path.stat().st_size > 3 * BLOCK_SIZE
+    return path, lines
+
+
+def _build(path):
+    f = open(path, "rb")
+    return f, LineIndex.build(f, os.fstat(f.fileno()))
+
+
+class TestLineIndex:
+    """Tests for LineIndex."""
+
+    def test_line_offsets_match_reference(self, log_file):
+        """Every queried line starts at its true byte offset."""
+        path, lines = log_file
+        starts = [0]
+        for line in lines:
+            starts.append(starts[-1] + len(line.encode("utf-8")))
+
+        f, index = _build(path)
+        with f:
+            assert index.total_lines == len(lines)
+            for n in (1, 2, 500, 1234, 9999, 15000, 20000, 20001):
+                assert index.line_offset(f, n) == starts[n - 1]
+
+    def test_line_number_at(self, log_file):
+        """Byte offsets map back to their line numbers."""
+        path, lines = log_file
+        f, index = _build(path)
+        with f:
+            offset = index.line_offset(f, 12345)
+            assert index.line_number_at(f, offset) == 12345
+            assert index.line_number_at(f, offset + 3) == 12345
+
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            (b"", 0),
+            (b"a\nb\n", 2),
+            (b"a\nb", 2),
+            (b"\n", 1),
+            (b"a\r\nb\r\n", 2),
+            (b"a\rb\rc\r", 3),
+            (b"a\nb\rc\r\nd", 4),
+        ],
+    )
+    def test_total_lines(self, tmp_path, content, expected):
+        """A final unterminated line counts; an empty file has no lines."""
+        path = tmp_path / "f.txt"
+        path.write_bytes(content)
+        f, index = _build(path)
+        with f:
+            assert index.total_lines == expected
+            assert index.has_bare_cr == (b"\r" in content.replace(b"\r\n", b""))
+
+    def test_compatible_encodings(self):
+        """Only encodings with a one-byte newline can use byte offsets."""
+        assert is_index_compatible("utf-8")
+        assert is_index_compatible("ascii")
+        assert is_index_compatible("windows-1252")
+        assert not is_index_compatible("utf-16")
+        assert not is_index_compatible("no-such-codec")
@@ -0,0 +1,76 @@
+"""Unit tests for the compiled pattern cache."""
+
+import re
+
+import pytest
+
+from context_mcp.utils.metrics import collect_metrics
+from context_mcp.utils.pattern_cache import PatternCache, is_byte_safe
+
+
+class TestPatternCache:
+    """Tests for PatternCache."""
+
+    def test_hit_returns_same_pattern(self):
+        """Repeated lookups reuse the compiled pattern."""
+        cache = PatternCache()
+        first = cache.get("foo", use_regex=True)
+        assert cache.get("foo", use_regex=True) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_includes_mode_and_flags(self):
+        """Literal/regex mode and flags produce distinct entries."""
+        cache = PatternCache()
+        literal = cache.get("a.b", use_regex=False)
+        regex = cache.get("a.b", use_regex=True)
+        folded = cache.get("a.b", use_regex=True, ignore_case=True)
+
+        assert literal.search("axb") is None
+        assert regex.search("axb")
+        assert folded.flags & re.IGNORECASE
+        assert cache.stats()["size"] == 3
+
+    def test_lru_eviction(self):
+        """The least recently used pattern is evicted past maxsize."""
+        cache = PatternCache(maxsize=2)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        cache.get("b")
+        assert cache.misses == 4
+        assert cache.stats()["size"] == 2
+
+    def test_invalid_regex_not_cached(self):
+        """Compile errors raise INVALID_REGEX and leave no entry behind."""
+        cache = PatternCache()
+        with pytest.raises(ValueError, match="INVALID_REGEX"):
+            cache.get("(unclosed", use_regex=True)
+        assert cache.stats()["size"] == 0
+
+    def test_metrics_registered(self):
+        """The shared cache reports through server metrics."""
+        stats = collect_metrics()["pattern_cache"]
+        assert {"size", "maxsize", "hits", "misses", "hit_rate"} <= set(stats)
+
+
+class TestIsByteSafe:
+    """Tests for deciding when a bytes regex is equivalent."""
+
+    @pytest.mark.parametrize(
+        "query",
+        [r"def [a-z_]+\(", r"^import (os|sys)$", r"x{2,}", r"(?=foo)foo"],
+    )
+    def test_ascii_constructs_are_safe(self, query):
+        """ASCII literals, sets, anchors and repeats are byte safe."""
+        assert is_byte_safe(query, use_regex=True) is True
+
+    @pytest.mark.parametrize("query", [r"a.b", r"\w+", r"[^x]", r"\bfoo", "é+"])
+    def test_character_dependent_constructs_are_not(self, query):
+        """Constructs whose meaning depends on characters are not byte safe."""
+        assert is_byte_safe(query, use_regex=True) is False
+
+    def test_literals_and_case_folding(self):
+        """Literals are always safe; case-insensitive queries never are."""
+        assert is_byte_safe("wörld", use_regex=False) is True
+        assert is_byte_safe("foo", use_regex=False, ignore_case=True) is False
@@ -0,0 +1,192 @@
+"""Unit tests for the parallel pure-Python search engine."""
+
+import time
+
+import pytest
+
+from context_mcp.utils.search_engine import (
+    ParallelSearchEngine,
+    open_buffer,
+    search_buffer,
+    search_file,
+)
+
+
+class TestSearchBuffer:
+    """Tests for single-buffer matching."""
+
+    def test_literal_matches_with_line_numbers(self):
+        """Literal matches report their line and first match offsets."""
+        data = b"alpha\nbeta gamma beta\ndelta\nbeta\n"
+        assert search_buffer(data, "beta", use_regex=False) == [
+            (2, "beta gamma beta", 0, 4),
+            (4, "beta", 0, 4),
+        ]
+
+    def test_regex_confined_to_line(self):
+        """Regex matches never span a line break."""
+        data = b"foo\nbar\nfoo bar\n"
+        assert search_buffer(data, r"foo\s+bar", use_regex=True) == [
+            (3, "foo bar", 0, 7)
+        ]
+
+    def test_anchors_match_per_line(self):
+        """^ and $ anchor at line boundaries."""
+        data = b"x = 1\n  x = 2\nx\n"
+        assert [m[0] for m in search_buffer(data, r"^x", use_regex=True)] == [1, 3]
+        assert [m[0] for m in search_buffer(data, r"\d$", use_regex=True)] == [1, 2]
+
+    def test_crlf_stripped(self):
+        """Carriage returns are not part of line content."""
+        assert search_buffer(b"one\r\ntwo\r\n", "two", use_regex=False) == [
+            (2, "two", 0, 3)
+        ]
+
+    def test_crlf_and_cr_line_ends(self):
+        """$ anchors before "\r\n" and a bare "\r" ends a line, as in text mode."""
+        data = b"foo\r\nbar foo\r\nbaz\rfoo\n"
+        assert search_buffer(data, "foo$", use_regex=True) == [
+            (1, "foo", 0, 3),
+            (2, "bar foo", 4, 7),
+            (4, "foo", 0, 3),
+        ]
+        assert search_buffer(data, "o.$", use_regex=True) == [
+            (1, "foo", 1, 3),
+            (2, "bar foo", 5, 7),
+            (4, "foo", 1, 3),
+        ]
+        assert search_buffer(data, "baz", use_regex=False) == [(3, "baz", 0, 3)]
+
+    def test_empty_query_matches_every_line(self):
+        """An empty query matches each line once, without a phantom last line."""
+        assert [m[0] for m in search_buffer(b"a\nb\n", "", use_regex=False)] == [1, 2]
+        assert search_buffer(b"", "", use_regex=False) == []
+
+    def test_non_ascii_offsets_are_characters(self):
+        """Byte offsets of literal matches are converted to characters."""
+        data = "héllo wörld\n".encode("utf-8")
+        assert search_buffer(data, "wörld", use_regex=False) == [
+            (1, "héllo wörld", 6, 11)
+        ]
+
+    def test_invalid_regex(self):
+        """Invalid patterns raise INVALID_REGEX."""
+        with pytest.raises(ValueError, match="INVALID_REGEX"):
+            search_buffer(b"x\n", "(unclosed", use_regex=True)
+
+    def test_ignore_case_literal(self):
+        """Case-insensitive literals match regardless of case."""
+        data = b"Needle\nneedle\nNEEDLE\nhay\n"
+        assert [
+            m[0] for m in search_buffer(data, "needle", False, ignore_case=True)
+        ] == [
+            1,
+            2,
+            3,
+        ]
+
+    def test_multiline_match_spans_lines(self):
+        """Multiline matches report all spanned lines under the first line."""
+        data = b"def f(\n    x,\n):\n"
+        assert search_buffer(data, r"f\(\s+x", True, multiline=True) == [
+            (1, "def f(\n    x,", 4, 12)
+        ]
+        assert search_buffer(data, r"f\(\s+x", True) == []
+
+    def test_character_classes_on_non_ascii_text(self):
+        """Unicode-aware constructs match decoded characters, not bytes."""
+        data = "naïve café\nplain\n".encode("utf-8")
+        assert search_buffer(data, r"caf\w", True) == [(1, "naïve café", 6, 10)]
+        assert search_buffer(data, r"na.ve", True) == [(1, "naïve café", 0, 5)]
+
+    def test_byte_regex_offsets_on_non_ascii_text(self):
+        """Byte-safe regexes over non-ASCII buffers report character offsets."""
+        data = "ünïcode = [0-9]\nx = 42\n".encode("utf-8")
+        assert search_buffer(data, r"= [0-9]+", True) == [(2, "x = 42", 2, 6)]
+
+    def test_context_lines_merged(self):
+        """Context never repeats a line; shared lines go to the earlier match."""
+        data = b"1\n2 hit\n3\n4\n5 hit\n6 hit\n7\n8\n9\n"
+        assert search_buffer(data, "hit", False, context_before=2, context_after=1) == [
+            (2, "2 hit", 2, 5, ["1"], ["3"]),
+            (5, "5 hit", 2, 5, ["4"], []),
+            (6, "6 hit", 2, 5, [], ["7"]),
+        ]
+
+    def test_context_around_multiline_and_crlf(self):
+        """After context starts below the last spanned line; CR is stripped."""
+        data = b"a\r\nb(\r\nx\r\nc\r\n"
+        assert search_buffer(
+            data, r"b\(\s+x", True, multiline=True, context_before=1, context_after=5
+        ) == [(2, "b(\nx", 0, 4, ["a"], ["c"])]
+
+
+class TestMappedFiles:
+    """Tests for searching memory-mapped files."""
+
+    def test_search_mapped_file(self, tmp_path):
+        """Matches in a mapped file carry correct line numbers."""
+        path = tmp_path / "big.log"
+        path.write_bytes(b"".join(b"line %d\n" % i for i in range(1, 20001)))
+        assert search_file(str(path), r"^line 1999[0-9]$", True) == [
+            (19990, "line 19990", 0, 10),
+            (19991, "line 19991", 0, 10),
+            (19992, "line 19992", 0, 10),
+            (19993, "line 19993", 0, 10),
+            (19994, "line 19994", 0, 10),
+            (19995, "line 19995", 0, 10),
+            (19996, "line 19996", 0, 10),
+            (19997, "line 19997", 0, 10),
+            (19998, "line 19998", 0, 10),
+            (19999, "line 19999", 0, 10),
+        ]
+
+    def test_empty_file(self, tmp_path):
+        """Empty files cannot be mapped and yield an empty buffer."""
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        with open_buffer(path) as data:
+            assert data == b""
+        assert search_file(str(path), "", False) == []
+
+
+class TestParallelSearchEngine:
+    """Tests for pooled, ordered search."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create numbered files, some matching, plus a binary file."""
+        pairs = []
+        for i in range(12):
+            path = tmp_path / f"f{i:02d}.txt"
+            path.write_text("needle\n" if i % 3 == 0 else "hay\n")
+            pairs.append((str(path), path.name))
+        binary = tmp_path / "z.bin"
+        binary.write_bytes(b"\x00needle\n")
+        pairs.append((str(binary), binary.name))
+        return pairs
+
+    def test_pool_results_in_input_order(self, files):
+        """Results from worker processes are merged in input order."""
+        engine = ParallelSearchEngine(workers=2, chunk_size=2, inline_threshold=0)
+        try:
+            run = engine.search(files, "needle", False, time.time() + 30)
+            found = [rel for rel, _ in run]
+        finally:
+            engine.shutdown()
+
+        assert found == ["f00.txt", "f03.txt", "f06.txt", "f09.txt"]
+        assert run.timed_out is False
+
+    def test_inline_matches_pool(self, files):
+        """Small inputs are searched inline with identical results."""
+        engine = ParallelSearchEngine(workers=2)
+        run = engine.search(files, "needle", False, time.time() + 30)
+        assert [rel for rel, _ in run] == ["f00.txt", "f03.txt", "f06.txt", "f09.txt"]
+
+    def test_expired_deadline_reports_timeout(self, files):
+        """A passed deadline stops the search and flags the timeout."""
+        engine = ParallelSearchEngine(workers=1)
+        run = engine.search(files, "needle", False, time.time() - 1)
+        assert list(run) == []
+        assert run.timed_out is True
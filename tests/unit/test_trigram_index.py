@@ -0,0 +1,236 @@
+"""Unit tests for the persistent trigram search index."""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from context_mcp.utils.trigram_index import TrigramIndex, plan_query
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a small project tree and a separate cache directory."""
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "alpha.py").write_text("def handle_request():\n    pass\n")
+    (root / "beta.txt").write_text("nothing interesting here\n")
+    (root / "pkg").mkdir()
+    (root / "pkg" / "gamma.py").write_text("HANDLE_REQUEST = 1\n")
+    (root / "blob.bin").write_bytes(b"\x00\x01handle_request")
+    return root, tmp_path / "cache"
+
+
+@pytest.fixture
+def index(project):
+    """Build an index over the project without ripgrep enumeration."""
+    root, cache_dir = project
+    idx = TrigramIndex(root, cache_dir)
+    with patch("context_mcp.utils.trigram_index.shutil.which", return_value=None):
+        idx.build()
+    return idx
+
+
+class TestPlanQuery:
+    """Tests for query reduction to required literals."""
+
+    def test_literal_query(self):
+        """Literal queries require the whole string."""
+        plan, ignore_case = plan_query("handle", use_regex=False)
+        assert plan == [{"handle"}]
+        assert ignore_case is False
+
+    def test_regex_concatenation(self):
+        """Literal runs around wildcards are all required."""
+        plan, _ = plan_query(r"def \w+_request\(", use_regex=True)
+        assert plan == [{"def ", "_request("}]
+
+    def test_regex_alternation(self):
+        """Top-level alternation produces one alternative per branch."""
+        plan, _ = plan_query("foobar|bazqux", use_regex=True)
+        assert sorted(sorted(a) for a in plan) == [["bazqux"], ["foobar"]]
+
+    def test_regex_optional_part_not_required(self):
+        """Optional repeats do not contribute requirements."""
+        plan, _ = plan_query("(abc)?defg", use_regex=True)
+        assert plan == [{"defg"}]
+
+    def test_unnarrowable_regex(self):
+        """Pure character classes cannot be narrowed."""
+        plan, _ = plan_query(r"\d+", use_regex=True)
+        assert plan is None
+
+    def test_inline_ignorecase_detected(self):
+        """Inline (?i) flag is reported."""
+        _, ignore_case = plan_query("(?i)Handle", use_regex=True)
+        assert ignore_case is True
+
+
+class TestTrigramIndex:
+    """Tests for building and querying the index."""
+
+    def test_index_stored_under_cache_dir(self, project, index):
+        """Index file lives under the cache directory keyed by root."""
+        _, cache_dir = project
+        assert index.exists()
+        assert cache_dir in index.db_path.parents
+
+    def test_literal_candidates_case_insensitive_superset(self, index):
+        """Candidates include every file containing the trigrams in any case."""
+        candidates = index.candidates("handle_request", use_regex=False)
+        assert "alpha.py" in candidates
+        assert "pkg/gamma.py" in candidates
+        assert "beta.txt" not in candidates
+        assert "blob.bin" not in candidates
+
+    def test_regex_candidates(self, index):
+        """Regex queries are narrowed by their required literals."""
+        candidates = index.candidates(r"def \w+\(", use_regex=True)
+        assert candidates == ["alpha.py"]
+
+    def test_short_query_not_narrowed(self, index):
+        """Queries shorter than a trigram return None."""
+        assert index.candidates("de", use_regex=False) is None
+
+    def test_fresh_after_build(self, index):
+        """A freshly built index is fresh."""
+        assert index.is_fresh() is True
+
+    def test_stale_after_edit(self, project, index):
+        """Editing an indexed file makes the index stale."""
+        root, _ = project
+        target = root / "beta.txt"
+        target.write_text("now mentions handle_request\n")
+        st = target.stat()
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert index.is_fresh() is False
+
+    def test_stale_after_new_file(self, project, index):
+        """Creating a file changes the directory mtime and makes it stale."""
+        root, _ = project
+        st = (root / "pkg").stat()
+        (root / "pkg" / "delta.py").write_text("x = 1\n")
+        os.utime(root / "pkg", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert index.is_fresh() is False
+
+    def test_stale_after_new_sibling_directory(self, tmp_path):
+        """A file in a new directory changes an ancestor's mtime and makes it stale."""
+        root = tmp_path / "project"
+        (root / "pkg" / "sub").mkdir(parents=True)
+        (root / "pkg" / "sub" / "a.py").write_text("x = 1\n")
+        idx = TrigramIndex(root, tmp_path / "cache")
+        with patch("context_mcp.utils.trigram_index.shutil.which", return_value=None):
+            idx.build()
+        assert idx.is_fresh() is True
+        st = (root / "pkg").stat()
+        (root / "pkg" / "new").mkdir()
+        (root / "pkg" / "new" / "b.py").write_text("hello = 1\n")
+        os.utime(root / "pkg", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert idx.is_fresh() is False
+
+    def test_clean_file_sweep_is_throttled(self, project, index):
+        """Back-to-back freshness checks stat directories only."""
+        assert index.is_fresh() is True
+        with patch("context_mcp.utils.trigram_index.os.stat", wraps=os.stat) as stat:
+            assert index.is_fresh() is True
+        statted = {os.path.basename(str(call.args[0])) for call in stat.call_args_list}
+        assert statted.isdisjoint({"alpha.py", "beta.txt", "gamma.py", "blob.bin"})
+
+    def test_missing_index(self, project):
+        """An unbuilt index is neither present nor fresh."""
+        root, cache_dir = project
+        idx = TrigramIndex(root, cache_dir / "other")
+        assert idx.exists() is False
+        assert idx.is_fresh() is False
+        assert idx.candidates("handle", use_regex=False) is None
+
+
+class TestSearchInFilesWithIndex:
+    """Tests for search_in_files consulting the index."""
+
+    def test_index_used_when_fresh(self, project, index, monkeypatch):
+        """search_in_files reports index usage and verifies candidates."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+        from context_mcp.tools.search import search_in_files
+
+        root, _ = project
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=root)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.validator", PathValidator(root))
+        monkeypatch.setattr("context_mcp.tools.search.search_index", index)
+
+        result = search_in_files(query="handle_request", path=".")
+
+        assert result["index_used"] is True
+        # Case-insensitive candidates are verified with the real matcher
+        assert [m["file_path"] for m in result["matches"]] == ["alpha.py"]
+
+    def test_falls_back_when_stale(self, project, index, monkeypatch):
+        """A stale index is bypassed and the regular engines are used."""
+        from context_mcp.config import ProjectConfig
+        from context_mcp.validators.path_validator import PathValidator
+        from context_mcp.tools.search import search_in_files
+
+        root, _ = project
+        monkeypatch.setattr(
+            "context_mcp.tools.search.config", ProjectConfig(root_path=root)
+        )
+        monkeypatch.setattr("context_mcp.tools.search.validator", PathValidator(root))
+        monkeypatch.setattr("context_mcp.tools.search.search_index", index)
+        monkeypatch.setattr(index, "is_fresh", lambda: False)
+        monkeypatch.setattr(
+            "context_mcp.tools.search.ensure_index_in_background", lambda idx: False
+        )
+
+        result = search_in_files(query="handle_request", path=".")
+
+        assert result["index_used"] is False
+        assert "alpha.py" in [m["file_path"] for m in result["matches"]]
+
+
+class TestIncrementalUpdates:
+    """Tests for applying watcher events to the index."""
+
+    def test_modified_file_becomes_candidate(self, project, index):
+        """Re-tokenized files are matched through the overlay."""
+        from context_mcp.utils.watcher import ChangeEvent
+
+        root, _ = project
+        (root / "beta.txt").write_text("now mentions handle_request\n")
+        index.apply_changes([ChangeEvent("beta.txt", "modified")])
+
+        assert "beta.txt" in index.candidates("handle_request", use_regex=False)
+        assert index.stats()["overlay_files"] == 1
+
+    def test_deleted_file_removed(self, project, index):
+        """Deleted files are no longer reported as candidates."""
+        from context_mcp.utils.watcher import ChangeEvent
+
+        root, _ = project
+        (root / "alpha.py").unlink()
+        index.apply_changes([ChangeEvent("alpha.py", "deleted")])
+
+        assert "alpha.py" not in index.candidates("handle_request", use_regex=False)
+
+    def test_deleted_directory_removes_contents(self, project, index):
+        """Directory deletions supersede every file below them."""
+        import shutil
+        from context_mcp.utils.watcher import ChangeEvent
+
+        root, _ = project
+        shutil.rmtree(root / "pkg")
+        index.apply_changes([ChangeEvent("pkg", "deleted", is_dir=True)])
+
+        assert "pkg/gamma.py" not in index.candidates("handle_request", use_regex=False)
+
+    def test_fresh_after_applied_changes(self, project, index):
+        """Applying events keeps the stat-based freshness check satisfied."""
+        from context_mcp.utils.watcher import ChangeEvent
+
+        root, _ = project
+        (root / "pkg" / "delta.py").write_text("handle_request()\n")
+        index.apply_changes([ChangeEvent("pkg/delta.py", "created")])
+
+        assert index.is_fresh() is True
+        assert "pkg/delta.py" in index.candidates("handle_request", use_regex=False)
@@ -0,0 +1,65 @@
+"""Unit tests for the shared file-tree walker."""
+
+from context_mcp.utils.walker import walk_files
+
+
+def _tree(root):
+    for rel, content in {
+        ".gitignore": "node_modules/\n*.pyc\n",
+        "b.py": "",
+        "a/z.py": "",
+        "a/z.pyc": "",
+        "a/.ignore": "skip.txt\n",
+        "a/skip.txt": "",
+        "node_modules/dep/index.js": "",
+        ".git/HEAD": "",
+        ".config/settings.toml": "",
+    }.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+class TestWalkFiles:
+    """Tests for walk_files."""
+
+    def test_prunes_ignored_and_vcs_paths(self, tmp_path):
+        """Ignored files and directories, hidden entries and .git are skipped."""
+        _tree(tmp_path)
+        files = [rel for _, rel in walk_files(tmp_path, sort=True)]
+        assert files == ["a/z.py", "b.py"]
+
+    def test_hidden_entries(self, tmp_path):
+        """hidden=True yields dotfiles; a hidden start directory is always walked."""
+        _tree(tmp_path)
+        files = [rel for _, rel in walk_files(tmp_path, sort=True, hidden=True)]
+        assert files == [
+            ".config/settings.toml",
+            ".gitignore",
+            "a/.ignore",
+            "a/z.py",
+            "b.py",
+        ]
+        files = [rel for _, rel in walk_files(tmp_path, tmp_path / ".config")]
+        assert files == [".config/settings.toml"]
+
+    def test_respect_ignore_disabled(self, tmp_path):
+        """With respect_ignore=False only VCS directories are skipped."""
+        _tree(tmp_path)
+        files = {rel for _, rel in walk_files(tmp_path, respect_ignore=False)}
+        assert "node_modules/dep/index.js" in files
+        assert "a/skip.txt" in files
+        assert ".git/HEAD" not in files
+
+    def test_subdirectory_uses_ancestor_rules(self, tmp_path):
+        """Walking a subdirectory applies the root's rules and yields root-relative paths."""
+        _tree(tmp_path)
+        files = [rel for _, rel in walk_files(tmp_path, tmp_path / "a", sort=True)]
+        assert files == ["a/z.py"]
+
+    def test_start_outside_root(self, tmp_path):
+        """Nothing is yielded for directories outside the root."""
+        (tmp_path / "root").mkdir()
+        (tmp_path / "other").mkdir()
+        (tmp_path / "other" / "f.txt").write_text("", encoding="utf-8")
+        assert list(walk_files(tmp_path / "root", tmp_path / "other")) == []
@@ -0,0 +1,224 @@
+"""Unit tests for the filesystem watcher and server metrics registry."""
+
+import os
+import platform
+import threading
+import time
+import pytest
+
+from context_mcp.utils.file_catalog import FileCatalog
+from context_mcp.utils.metrics import (
+    collect_metrics,
+    register_metrics_provider,
+    unregister_metrics_provider,
+)
+from context_mcp.utils.watcher import ChangeEvent, FileWatcher
+
+
+def _collect(watcher: FileWatcher):
+    """Subscribe a collector and return (events, lock)."""
+    events: list[ChangeEvent] = []
+    lock = threading.Lock()
+
+    def on_events(batch):
+        with lock:
+            events.extend(batch)
+
+    watcher.subscribe(on_events)
+    return events, lock
+
+
+def _wait_for(predicate, timeout=5.0):
+    """Poll predicate until it is true or timeout expires."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestCoalesce:
+    """Tests for event coalescing."""
+
+    def test_latest_event_per_path_wins(self):
+        """Only the most recent event per path survives."""
+        batch = [
+            ChangeEvent("a.txt", "created"),
+            ChangeEvent("a.txt", "modified"),
+            ChangeEvent("b.txt", "deleted"),
+            ChangeEvent("a.txt", "deleted"),
+        ]
+        result = FileWatcher._coalesce(batch)
+        assert result == [
+            ChangeEvent("b.txt", "deleted"),
+            ChangeEvent("a.txt", "deleted"),
+        ]
+
+    def test_rescan_collapses(self):
+        """Multiple rescans collapse to a single trailing rescan event."""
+        batch = [
+            ChangeEvent("", "rescan"),
+            ChangeEvent("x", "created"),
+            ChangeEvent("", "rescan"),
+        ]
+        result = FileWatcher._coalesce(batch)
+        assert result == [ChangeEvent("x", "created"), ChangeEvent("", "rescan")]
+
+
+class TestPollingWatcher:
+    """Tests for the polling backend."""
+
+    def test_detects_create_modify_delete(self, tmp_path):
+        """Polling snapshots report created, modified and deleted files."""
+        (tmp_path / "existing.txt").write_text("one")
+        for name in (".git", ".venv"):
+            (tmp_path / name).mkdir()
+
+        watcher = FileWatcher(tmp_path, mode="poll", poll_interval=0.05)
+        events, lock = _collect(watcher)
+        watcher.start()
+        try:
+            assert _wait_for(lambda: watcher.stats()["full_rescans"] >= 1)
+            (tmp_path / "new.txt").write_text("new")
+            target = tmp_path / "existing.txt"
+            target.write_text("two, longer")
+            (tmp_path / ".git" / "index").write_text("ignored")
+            (tmp_path / ".venv" / "site.py").write_text("ignored")
+
+            def seen(path, kind):
+                with lock:
+                    return ChangeEvent(path, kind) in events
+
+            assert _wait_for(lambda: seen("new.txt", "created"))
+            assert _wait_for(lambda: seen("existing.txt", "modified"))
+            (tmp_path / "new.txt").unlink()
+            assert _wait_for(lambda: seen("new.txt", "deleted"))
+            with lock:
+                assert all(e.path in ("new.txt", "existing.txt") for e in events)
+        finally:
+            watcher.stop()
+
+    @pytest.mark.parametrize("mode", ["poll", "inotify"])
+    def test_build_dir_stays_current(self, tmp_path, mode):
+        """A build/ directory the walker lists is watched, so the catalog follows it."""
+        if mode == "inotify" and platform.system() != "Linux":
+            pytest.skip("inotify is Linux-only")
+        (tmp_path / "src" / "build").mkdir(parents=True)
+        (tmp_path / "src" / "build" / "gen.py").write_text("")
+        catalog = FileCatalog(tmp_path)
+        catalog.build()
+        watcher = FileWatcher(tmp_path, mode=mode, poll_interval=0.05)
+        catalog.attach(watcher)
+        watcher.start()
+        try:
+            assert _wait_for(lambda: watcher.stats()["full_rescans"] >= 1)
+            (tmp_path / "src" / "build" / "gen.py").unlink()
+            (tmp_path / "src" / "build" / "new.py").write_text("")
+            assert _wait_for(lambda: catalog.glob("*.py") == ["src/build/new.py"])
+            assert catalog.is_ready()
+        finally:
+            watcher.stop()
+
+    def test_stats_shape(self, tmp_path):
+        """Health stats expose queue depth, rate and last rescan."""
+        watcher = FileWatcher(tmp_path, mode="poll", poll_interval=0.05)
+        watcher.start()
+        try:
+            assert _wait_for(lambda: watcher.stats()["last_full_rescan"] is not None)
+            stats = watcher.stats()
+            assert stats["backend"] == "poll"
+            assert stats["running"] is True
+            assert stats["queue_depth"] >= 0
+            assert stats["events_per_sec"] >= 0
+        finally:
+            watcher.stop()
+        assert watcher.running is False
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="inotify requires Linux")
+class TestInotifyWatcher:
+    """Tests for the inotify backend."""
+
+    def test_detects_changes_in_new_directories(self, tmp_path):
+        """Files created inside newly created directories are reported."""
+        watcher = FileWatcher(tmp_path, mode="inotify")
+        events, lock = _collect(watcher)
+        watcher.start()
+        try:
+            assert _wait_for(lambda: watcher.stats()["full_rescans"] >= 1)
+            assert watcher.backend_name == "inotify"
+            (tmp_path / "sub").mkdir()
+            time.sleep(0.1)
+            (tmp_path / "sub" / "file.py").write_text("x = 1\n")
+
+            def seen_file():
+                with lock:
+                    return any(e.path == "sub/file.py" for e in events)
+
+            assert _wait_for(seen_file)
+            os.remove(tmp_path / "sub" / "file.py")
+
+            def seen_delete():
+                with lock:
+                    return ChangeEvent("sub/file.py", "deleted") in events
+
+            assert _wait_for(seen_delete)
+        finally:
+            watcher.stop()
+
+
+class TestMetricsRegistry:
+    """Tests for the server metrics registry."""
+
+    def test_collects_registered_providers(self):
+        """Registered providers appear in collected metrics."""
+        register_metrics_provider("test_provider", lambda: {"value": 1})
+        try:
+            assert collect_metrics()["test_provider"] == {"value": 1}
+        finally:
+            unregister_metrics_provider("test_provider")
+        assert "test_provider" not in collect_metrics()
+
+    def test_failing_provider_isolated(self):
+        """A failing provider reports an error instead of raising."""
+
+        def broken():
+            raise RuntimeError("boom")
+
+        register_metrics_provider("broken_provider", broken)
+        try:
+            assert collect_metrics()["broken_provider"] == {"error": "boom"}
+        finally:
+            unregister_metrics_provider("broken_provider")
+
+    def test_get_server_metrics_tool(self):
+        """The status tool wraps collected metrics."""
+        from context_mcp.tools.status import get_server_metrics
+
+        register_metrics_provider("test_provider", lambda: {"value": 2})
+        try:
+            result = get_server_metrics()
+        finally:
+            unregister_metrics_provider("test_provider")
+        assert result["metrics"]["test_provider"] == {"value": 2}
+        assert isinstance(result["generated_at"], float)
+
+
+class TestBackgroundServices:
+    """Tests for starting the watcher from the server."""
+
+    def test_watcher_not_started_without_consumers(self, monkeypatch):
+        """No watcher runs when neither the catalog nor the index is enabled."""
+        from unittest.mock import MagicMock
+
+        from context_mcp import server
+        from context_mcp.tools import search as search_module
+
+        monkeypatch.setattr(search_module, "file_catalog", None)
+        monkeypatch.setattr(search_module, "search_index", None)
+        monkeypatch.setattr(search_module, "tracked_files", None)
+        start = MagicMock()
+        monkeypatch.setattr("context_mcp.utils.watcher.start_watcher", start)
+        server._start_background_services(MagicMock(watch_mode="auto"), MagicMock())
+        start.assert_not_called()